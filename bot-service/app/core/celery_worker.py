@@ -8,7 +8,7 @@ celery_app = Celery(
     "expense_bot",
     broker=CELERY_BROKER_URL,
     backend=CELERY_RESULT_BACKEND,
-    include=['app.tasks.analytics']
+    include=['app.tasks.analytics', 'app.tasks.ingest', 'app.tasks.rollups']
 )
 
 # Celery configuration
@@ -4,14 +4,67 @@ from dotenv import load_dotenv
 load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL")
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
 
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
+GROQ_BASE_URL = os.getenv("GROQ_BASE_URL") or None
 MODEL_NAME = os.getenv("MODEL_NAME", "llama3-8b-8192")
 
+CATEGORY_RULES_ENABLED = os.getenv("CATEGORY_RULES_ENABLED", "true").lower() == "true"
+
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", "15"))
+LLM_BATCH_MAX_SIZE = int(os.getenv("LLM_BATCH_MAX_SIZE", "8"))
+LLM_BATCH_MAX_WAIT_MS = float(os.getenv("LLM_BATCH_MAX_WAIT_MS", "10"))
+
 CELERY_BROKER_URL = os.getenv("CELERY_BROKER_URL", "redis://redis:6379/0")
 CELERY_RESULT_BACKEND = os.getenv("CELERY_RESULT_BACKEND", "redis://redis:6379/0")
+CELERY_REUSE_EVENT_LOOP = os.getenv("CELERY_REUSE_EVENT_LOOP", "true").lower() == "true"
 REDIS_URL = os.getenv("REDIS_URL", "redis://redis:6379/0")
+REDIS_SOCKET_TIMEOUT = float(os.getenv("REDIS_SOCKET_TIMEOUT", "0.5"))
+REDIS_RETRY_AFTER_SECONDS = float(os.getenv("REDIS_RETRY_AFTER_SECONDS", "30"))
+REDIS_MAX_CONNECTIONS = int(os.getenv("REDIS_MAX_CONNECTIONS", "50"))
+REDIS_POOL_TIMEOUT = float(os.getenv("REDIS_POOL_TIMEOUT", "1"))
+REDIS_PIPELINE_CHUNK_SIZE = int(os.getenv("REDIS_PIPELINE_CHUNK_SIZE", "1000"))
+
+TASK_EVENTS_HEARTBEAT_SECONDS = float(os.getenv("TASK_EVENTS_HEARTBEAT_SECONDS", "15"))
+TASK_EVENTS_TIMEOUT_SECONDS = float(os.getenv("TASK_EVENTS_TIMEOUT_SECONDS", "600"))
+TASK_DEDUP_ENABLED = os.getenv("TASK_DEDUP_ENABLED", "true").lower() == "true"
+TASK_DEDUP_TTL_SECONDS = int(os.getenv("TASK_DEDUP_TTL_SECONDS", "600"))
+
+HEALTH_CHECK_INTERVAL_SECONDS = float(os.getenv("HEALTH_CHECK_INTERVAL_SECONDS", "10"))
+HEALTH_CHECK_TIMEOUT_SECONDS = float(os.getenv("HEALTH_CHECK_TIMEOUT_SECONDS", "2"))
+
+CATEGORY_CACHE_SIZE = int(os.getenv("CATEGORY_CACHE_SIZE", "10000"))
+CATEGORY_CACHE_TTL_SECONDS = int(os.getenv("CATEGORY_CACHE_TTL_SECONDS", "3600"))
+CATEGORY_CACHE_REDIS_TTL_SECONDS = int(os.getenv("CATEGORY_CACHE_REDIS_TTL_SECONDS", "86400"))
+CATEGORY_CACHE_REDIS_ENABLED = os.getenv("CATEGORY_CACHE_REDIS_ENABLED", "true").lower() == "true"
+
+ANALYTICS_USE_ROLLUPS = os.getenv("ANALYTICS_USE_ROLLUPS", "true").lower() == "true"
+ANALYTICS_CACHE_ENABLED = os.getenv("ANALYTICS_CACHE_ENABLED", "true").lower() == "true"
+ANALYTICS_CACHE_FRESH_SECONDS = float(os.getenv("ANALYTICS_CACHE_FRESH_SECONDS", "60"))
+ANALYTICS_CACHE_TTL_SECONDS = int(os.getenv("ANALYTICS_CACHE_TTL_SECONDS", "3600"))
+ANALYTICS_CACHE_LOCK_SECONDS = float(os.getenv("ANALYTICS_CACHE_LOCK_SECONDS", "10"))
+ANALYTICS_DEFAULT_ENGINE = os.getenv("ANALYTICS_DEFAULT_ENGINE", "sql")
+ANALYTICS_BULK_CHUNK_SIZE = int(os.getenv("ANALYTICS_BULK_CHUNK_SIZE", "500"))
+VECTOR_ANALYTICS_MAX_USERS = int(os.getenv("VECTOR_ANALYTICS_MAX_USERS", "64"))
+VECTOR_ANALYTICS_TTL_SECONDS = float(os.getenv("VECTOR_ANALYTICS_TTL_SECONDS", "300"))
+
+INGEST_CALLBACK_URL = os.getenv("INGEST_CALLBACK_URL") or None
+INGEST_CALLBACK_SECRET = os.getenv("INGEST_CALLBACK_SECRET") or None
+INGEST_CALLBACK_TIMEOUT_SECONDS = float(os.getenv("INGEST_CALLBACK_TIMEOUT_SECONDS", "5"))
+INGEST_MAX_RETRIES = int(os.getenv("INGEST_MAX_RETRIES", "3"))
+INGEST_CLAIM_LEASE_SECONDS = int(os.getenv("INGEST_CLAIM_LEASE_SECONDS", "300"))
+
+IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", "5000"))
+IMPORT_MAX_ERRORS = int(os.getenv("IMPORT_MAX_ERRORS", "1000"))
+IMPORT_USE_COPY = os.getenv("IMPORT_USE_COPY", "true").lower() == "true"
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "5000"))
 
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
 
@@ -4,10 +4,14 @@ from sqlalchemy.orm import sessionmaker
 from app.models.base import Base
 from app.models.user import User
 from app.models.expense import Expense
+from app.models.ingest import IngestMessage
+from app.models.rollup import ExpenseRollup
 from dotenv import load_dotenv
 from passlib.context import CryptContext
-from sqlalchemy import select
+from sqlalchemy import select, event
+from app.core.config import DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT, DB_POOL_RECYCLE, DB_POOL_PRE_PING
 from app.core.logging import get_logger
+from typing import Any, Dict
 
 load_dotenv()
 logger = get_logger(__name__)
@@ -18,7 +22,29 @@ if not DATABASE_URL:
     logger.error("❌ DATABASE_URL is not set in the environment.")
     raise ValueError("❌ DATABASE_URL is not set in the environment.")
 
-engine = create_async_engine(DATABASE_URL, echo=False)
+def engine_options(url: str) -> Dict[str, Any]:
+    """Pool settings for url. SQLite keeps SQLAlchemy's default pool."""
+    if url.startswith("sqlite"):
+        return {}
+    return {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+
+engine = create_async_engine(DATABASE_URL, echo=False, **engine_options(DATABASE_URL))
+
+_pool_counters = {"connections_opened": 0, "checkouts": 0}
+
+@event.listens_for(engine.sync_engine, "connect")
+def _count_connect(dbapi_connection, connection_record):
+    _pool_counters["connections_opened"] += 1
+
+@event.listens_for(engine.sync_engine, "checkout")
+def _count_checkout(dbapi_connection, connection_record, connection_proxy):
+    _pool_counters["checkouts"] += 1
 
 AsyncSessionLocal = sessionmaker(
     bind=engine,
@@ -71,12 +97,20 @@ async def async_session():
     async with AsyncSessionLocal() as session:
         yield session
 
-def get_new_async_session():
-    engine = create_async_engine(DATABASE_URL, echo=False)
-    AsyncSessionLocal = sessionmaker(
-        bind=engine,
-        class_=AsyncSession,
-        expire_on_commit=False
-    )
-    return AsyncSessionLocal
+def get_pool_status() -> Dict[str, Any]:
+    """Snapshot of the shared connection pool."""
+    pool = engine.pool
+    status = {
+        "pool_class": type(pool).__name__,
+        "connections_opened": _pool_counters["connections_opened"],
+        "checkouts": _pool_counters["checkouts"],
+    }
+    if hasattr(pool, "checkedout"):
+        status.update({
+            "size": pool.size(),
+            "checked_in": pool.checkedin(),
+            "checked_out": pool.checkedout(),
+            "overflow": pool.overflow(),
+        })
+    return status
 
@@ -0,0 +1,130 @@
+"""Versioned schema migrations applied on startup.
+
+Each migration runs once, in order, inside a single transaction, and is
+recorded in schema_migrations. Migrations only create what is missing
+(checkfirst), so they are safe on databases bootstrapped by init.sql or by
+an older create_all().
+
+    python -m app.core.migrations
+"""
+import asyncio
+from datetime import datetime
+from typing import Callable, List, NamedTuple
+
+from sqlalchemy import Column, Integer, MetaData, String, Table, TIMESTAMP, inspect, select, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.models.base import Base
+from app.models.user import User  # noqa: F401  (registers the tables on Base.metadata)
+from app.models.expense import Expense  # noqa: F401
+from app.models.ingest import IngestMessage  # noqa: F401
+from app.models.rollup import ExpenseRollup  # noqa: F401
+from app.repositories.rollup import rollup_backfill_statement
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Arbitrary key for pg_advisory_xact_lock, so concurrent starts don't race
+MIGRATION_LOCK_ID = 72_410_001
+
+schema_metadata = MetaData()
+
+schema_migrations = Table(
+    "schema_migrations",
+    schema_metadata,
+    Column("version", Integer, primary_key=True),
+    Column("name", String, nullable=False),
+    Column("applied_at", TIMESTAMP, nullable=False),
+)
+
+
+class Migration(NamedTuple):
+    version: int
+    name: str
+    apply: Callable[[Connection], None]
+
+
+def _create_tables(*names: str) -> Callable[[Connection], None]:
+    def apply(conn: Connection) -> None:
+        for name in names:
+            Base.metadata.tables[name].create(conn, checkfirst=True)
+    return apply
+
+
+def _create_indexes(table: str, *names: str) -> Callable[[Connection], None]:
+    def apply(conn: Connection) -> None:
+        indexes = {index.name: index for index in Base.metadata.tables[table].indexes}
+        for name in names:
+            indexes[name].create(conn, checkfirst=True)
+    return apply
+
+
+def _add_columns(table: str, *names: str) -> Callable[[Connection], None]:
+    def apply(conn: Connection) -> None:
+        existing = {column["name"] for column in inspect(conn).get_columns(table)}
+        for name in names:
+            if name in existing:
+                continue
+            column = Base.metadata.tables[table].c[name]
+            column_type = column.type.compile(dialect=conn.dialect)
+            conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {name} {column_type}"))
+    return apply
+
+
+def _backfill_rollups(conn: Connection) -> None:
+    Base.metadata.tables["expense_rollups"].create(conn, checkfirst=True)
+    conn.execute(Base.metadata.tables["expense_rollups"].delete())
+    conn.execute(rollup_backfill_statement())
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(1, "initial schema", _create_tables("users", "expenses", "ingest_messages")),
+    Migration(2, "expenses user/added_at indexes", _create_indexes(
+        "expenses", "ix_expenses_user_added_at", "ix_expenses_user_added_at_category_amount",
+    )),
+    Migration(3, "expense rollups", _backfill_rollups),
+    Migration(4, "expenses keyset pagination index", _create_indexes("expenses", "ix_expenses_added_at_id")),
+    Migration(5, "expenses category and amount listing indexes", _create_indexes(
+        "expenses", "ix_expenses_user_category_added_at", "ix_expenses_user_amount"
+    )),
+    Migration(6, "ingest messages chat_id", _add_columns("ingest_messages", "chat_id")),
+    Migration(7, "ingest messages claim lease", _add_columns("ingest_messages", "claimed_at")),
+]
+
+
+def _apply_pending(conn: Connection) -> List[int]:
+    if conn.dialect.name == "postgresql":
+        conn.execute(text("SELECT pg_advisory_xact_lock(:id)"), {"id": MIGRATION_LOCK_ID})
+    schema_migrations.create(conn, checkfirst=True)
+    applied = set(conn.execute(select(schema_migrations.c.version)).scalars())
+
+    newly_applied = []
+    for migration in MIGRATIONS:
+        if migration.version in applied:
+            continue
+        logger.info("Applying migration", version=migration.version, name=migration.name)
+        migration.apply(conn)
+        conn.execute(schema_migrations.insert().values(
+            version=migration.version, name=migration.name, applied_at=datetime.utcnow()
+        ))
+        newly_applied.append(migration.version)
+    return newly_applied
+
+
+async def run_migrations(engine: AsyncEngine) -> List[int]:
+    """Apply pending migrations. Returns the versions applied by this call."""
+    async with engine.begin() as conn:
+        newly_applied = await conn.run_sync(_apply_pending)
+    logger.info("Schema up to date", applied=newly_applied, version=MIGRATIONS[-1].version)
+    return newly_applied
+
+
+if __name__ == "__main__":
+    from app.core.db import engine
+
+    async def main():
+        await run_migrations(engine)
+        await engine.dispose()
+
+    asyncio.run(main())
@@ -0,0 +1,166 @@
+import asyncio
+import time
+import weakref
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+
+import redis.asyncio as aioredis
+from redis.exceptions import ConnectionError
+
+from app.core.config import (
+    REDIS_MAX_CONNECTIONS,
+    REDIS_PIPELINE_CHUNK_SIZE,
+    REDIS_POOL_TIMEOUT,
+    REDIS_RETRY_AFTER_SECONDS,
+    REDIS_SOCKET_TIMEOUT,
+    REDIS_URL,
+)
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+# redis.asyncio connections are bound to the loop that opened them, so keep
+# one client (and connection pool) per running loop (API loop, Celery task loops).
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, aioredis.Redis]" = weakref.WeakKeyDictionary()
+_unavailable_until = 0.0
+_pool_counters = {"connections_opened": 0, "checkouts": 0}
+
+
+class SharedConnectionPool(aioredis.BlockingConnectionPool):
+    """Bounded pool that waits up to REDIS_POOL_TIMEOUT for a free connection
+    instead of failing, and counts connections opened and checkouts.
+
+    Connects outside the pool lock: the stock get_connection connects while
+    holding it, and on a failed connect its release() waits for that same
+    lock, so with Redis down every call waits out the whole pool timeout.
+    """
+
+    def make_connection(self):
+        _pool_counters["connections_opened"] += 1
+        return super().make_connection()
+
+    async def _checkout(self):
+        async with self._condition:
+            await self._condition.wait_for(self.can_get_connection)
+            try:
+                connection = self._available_connections.pop()
+            except IndexError:
+                connection = self.make_connection()
+            self._in_use_connections.add(connection)
+            return connection
+
+    async def get_connection(self, command_name, *keys, **options):
+        _pool_counters["checkouts"] += 1
+        try:
+            connection = await asyncio.wait_for(self._checkout(), self.timeout)
+        except asyncio.TimeoutError as err:
+            raise ConnectionError("No connection available.") from err
+        try:
+            await self.ensure_connection(connection)
+        except BaseException:
+            await self.release(connection)
+            raise
+        return connection
+
+
+def _create_client() -> aioredis.Redis:
+    pool = SharedConnectionPool.from_url(
+        REDIS_URL,
+        max_connections=REDIS_MAX_CONNECTIONS,
+        timeout=REDIS_POOL_TIMEOUT,
+        socket_timeout=REDIS_SOCKET_TIMEOUT,
+        socket_connect_timeout=REDIS_SOCKET_TIMEOUT,
+    )
+    return aioredis.Redis.from_pool(pool)
+
+
+def get_redis() -> Optional[aioredis.Redis]:
+    """Return the async Redis client for the running loop.
+
+    Returns None while Redis is marked unavailable, so optional features
+    (caches) can skip it instead of paying a connection timeout per call.
+    """
+    if time.monotonic() < _unavailable_until:
+        return None
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None:
+        client = _create_client()
+        _clients[loop] = client
+    return client
+
+
+async def redis_dependency() -> Optional[aioredis.Redis]:
+    """Dependency to get the shared Redis client (None while unavailable)."""
+    return get_redis()
+
+
+def mark_redis_unavailable(error: Exception) -> None:
+    """Back off from Redis for REDIS_RETRY_AFTER_SECONDS after a failure."""
+    global _unavailable_until
+    if time.monotonic() >= _unavailable_until:
+        logger.warning("Redis unavailable, backing off", error=str(error), retry_after=REDIS_RETRY_AFTER_SECONDS)
+    _unavailable_until = time.monotonic() + REDIS_RETRY_AFTER_SECONDS
+
+
+async def init_redis() -> None:
+    """Open the running loop's pool at startup (one connection, pinged) so
+    the first requests don't pay the handshake; backs off if Redis is down."""
+    client = get_redis()
+    if client is None:
+        return
+    try:
+        await client.ping()
+        logger.info("Redis pool ready", max_connections=REDIS_MAX_CONNECTIONS)
+    except Exception as e:
+        mark_redis_unavailable(e)
+
+
+async def close_redis() -> None:
+    """Close the running loop's client and pool; call before closing the loop."""
+    client = _clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+async def get_many(client: aioredis.Redis, keys: Sequence[str],
+                   chunk_size: int = REDIS_PIPELINE_CHUNK_SIZE) -> List[Optional[bytes]]:
+    """Values of many keys in one round trip (one MGET per chunk, pipelined)."""
+    if not keys:
+        return []
+    pipe = client.pipeline(transaction=False)
+    for i in range(0, len(keys), chunk_size):
+        pipe.mget(*keys[i:i + chunk_size])
+    return [value for chunk in await pipe.execute() for value in chunk]
+
+
+async def set_many(client: aioredis.Redis, items: Mapping[str, Any], ex: Optional[int] = None,
+                   chunk_size: int = REDIS_PIPELINE_CHUNK_SIZE) -> None:
+    """SET many keys (with an optional TTL), chunk_size commands per round trip."""
+    items = list(items.items())
+    for i in range(0, len(items), chunk_size):
+        pipe = client.pipeline(transaction=False)
+        for key, value in items[i:i + chunk_size]:
+            pipe.set(key, value, ex=ex)
+        await pipe.execute()
+
+
+def get_redis_pool_status() -> Dict[str, Any]:
+    """Snapshot of the running loop's Redis pool (when called on a loop)."""
+    status: Dict[str, Any] = {
+        "max_connections": REDIS_MAX_CONNECTIONS,
+        "connections_opened": _pool_counters["connections_opened"],
+        "checkouts": _pool_counters["checkouts"],
+        "backing_off": time.monotonic() < _unavailable_until,
+        "clients": len(_clients),
+    }
+    try:
+        client = _clients.get(asyncio.get_running_loop())
+    except RuntimeError:
+        client = None
+    if client is not None:
+        pool = client.connection_pool
+        status.update({
+            "in_use": len(pool._in_use_connections),
+            "idle": len(pool._available_connections),
+        })
+    return status
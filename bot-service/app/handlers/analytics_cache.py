@@ -0,0 +1,257 @@
+import asyncio
+import json
+import time
+import weakref
+from datetime import date
+from typing import Any, Awaitable, Callable, Dict, Optional, Sequence
+
+from app.core.config import (
+    ANALYTICS_CACHE_ENABLED,
+    ANALYTICS_CACHE_FRESH_SECONDS,
+    ANALYTICS_CACHE_TTL_SECONDS,
+    ANALYTICS_CACHE_LOCK_SECONDS,
+)
+from app.core.logging import get_logger
+from app.core.redis_client import get_many, get_redis, mark_redis_unavailable, set_many
+from app.schemas.analytics import AnalyticsResult
+
+logger = get_logger(__name__)
+
+Compute = Callable[[], Awaitable[AnalyticsResult]]
+
+
+class AnalyticsCache:
+    """Redis cache of AnalyticsResult keyed by (user_id, start_date, end_date).
+
+    Every entry records the user's data version at the time it was computed;
+    expense writes bump that version (invalidate), so an entry is served only
+    while nothing changed for the user. Entries older than fresh_ttl are still
+    served (stale-while-revalidate) while one background refresh runs.
+
+    Recomputation is single-flight: concurrent misses for the same key share
+    one in-process computation, and across processes a short Redis lock lets
+    one process compute while the others wait for its result.
+    """
+
+    key_prefix = "analytics:v1:"
+    version_prefix = "analytics:version:"
+    lock_prefix = "analytics:lock:"
+    poll_interval = 0.05
+
+    def __init__(
+        self,
+        fresh_ttl: float = ANALYTICS_CACHE_FRESH_SECONDS,
+        ttl: int = ANALYTICS_CACHE_TTL_SECONDS,
+        lock_timeout: float = ANALYTICS_CACHE_LOCK_SECONDS,
+        enabled: bool = ANALYTICS_CACHE_ENABLED,
+    ):
+        self.fresh_ttl = fresh_ttl
+        self.ttl = ttl
+        self.lock_timeout = lock_timeout
+        self.enabled = enabled
+        # In-flight computations per loop, keyed by cache key
+        self._inflight: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Future]]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.computations = 0
+        self.coalesced = 0
+        self.invalidations = 0
+        self.redis_errors = 0
+
+    @classmethod
+    def cache_key(cls, user_id: str, start_date: date, end_date: date) -> str:
+        return f"{cls.key_prefix}{user_id}:{start_date.isoformat()}:{end_date.isoformat()}"
+
+    def _loop_inflight(self) -> Dict[str, asyncio.Future]:
+        loop = asyncio.get_running_loop()
+        inflight = self._inflight.get(loop)
+        if inflight is None:
+            inflight = self._inflight[loop] = {}
+        return inflight
+
+    async def get_or_compute(self, user_id: str, start_date: date, end_date: date, compute: Compute) -> AnalyticsResult:
+        """Return the cached result for the range, computing it at most once."""
+        client = get_redis() if self.enabled else None
+        if client is None:
+            return await compute()
+
+        key = self.cache_key(user_id, start_date, end_date)
+        try:
+            raw_version, raw_entry = await client.mget(self.version_prefix + user_id, key)
+        except Exception as e:
+            self.redis_errors += 1
+            mark_redis_unavailable(e)
+            return await compute()
+
+        version = int(raw_version or 0)
+        entry = json.loads(raw_entry) if raw_entry else None
+        if entry is not None and entry["version"] == version:
+            if time.time() - entry["computed_at"] < self.fresh_ttl:
+                self.hits += 1
+            else:
+                self.stale_hits += 1
+                self._single_flight(client, key, user_id, version, compute)
+            return AnalyticsResult.model_validate(entry["result"])
+
+        self.misses += 1
+        # Shielded: a caller that is cancelled must not cancel the shared
+        # computation the other coalesced callers are waiting on
+        return await asyncio.shield(self._single_flight(client, key, user_id, version, compute))
+
+    def _single_flight(self, client, key: str, user_id: str, version: int, compute: Compute) -> asyncio.Future:
+        inflight = self._loop_inflight()
+        future = inflight.get(key)
+        if future is not None:
+            self.coalesced += 1
+            return future
+
+        future = asyncio.ensure_future(self._refresh(client, key, user_id, version, compute))
+        inflight[key] = future
+        future.add_done_callback(lambda _: inflight.pop(key, None))
+        # Stale refreshes run unawaited; keep their errors out of the loop's handler
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        return future
+
+    async def _refresh(self, client, key: str, user_id: str, version: int, compute: Compute) -> AnalyticsResult:
+        lock_key = self.lock_prefix + key
+        try:
+            locked = await client.set(lock_key, "1", nx=True, px=int(self.lock_timeout * 1000))
+        except Exception as e:
+            self.redis_errors += 1
+            mark_redis_unavailable(e)
+            locked = True
+
+        if not locked:
+            result = await self._wait_for_other(client, key, user_id, version)
+            if result is not None:
+                self.coalesced += 1
+                return result
+
+        try:
+            self.computations += 1
+            result = await compute()
+            entry = {"version": version, "computed_at": time.time(), "result": result.model_dump(mode="json")}
+            try:
+                await client.set(key, json.dumps(entry), ex=self.ttl)
+            except Exception as e:
+                self.redis_errors += 1
+                mark_redis_unavailable(e)
+            return result
+        finally:
+            if locked:
+                try:
+                    await client.delete(lock_key)
+                except Exception:
+                    pass
+
+    async def _wait_for_other(self, client, key: str, user_id: str, version: int) -> Optional[AnalyticsResult]:
+        """Poll for the entry another process is computing, up to lock_timeout."""
+        deadline = time.monotonic() + self.lock_timeout
+        while time.monotonic() < deadline:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                raw = await client.get(key)
+            except Exception as e:
+                self.redis_errors += 1
+                mark_redis_unavailable(e)
+                return None
+            entry = json.loads(raw) if raw else None
+            if entry is not None and entry["version"] >= version and time.time() - entry["computed_at"] < self.fresh_ttl:
+                return AnalyticsResult.model_validate(entry["result"])
+        logger.warning("Timed out waiting for analytics computation", key=key)
+        return None
+
+    async def invalidate(self, user_id: str) -> Optional[int]:
+        """Bump the user's data version so every cached range is recomputed.
+
+        Returns the new version, or None if it could not be bumped.
+        """
+        if not self.enabled:
+            return None
+        client = get_redis()
+        if client is None:
+            return None
+        try:
+            version = await client.incr(self.version_prefix + user_id)
+            self.invalidations += 1
+            return version
+        except Exception as e:
+            self.redis_errors += 1
+            mark_redis_unavailable(e)
+            logger.warning("Could not invalidate analytics cache", user_id=user_id, error=str(e))
+            return None
+
+    async def current_version(self, user_id: str) -> Optional[int]:
+        """The user's data version, or None when it can't be known (disabled or Redis down)."""
+        if not self.enabled:
+            return None
+        client = get_redis()
+        if client is None:
+            return None
+        try:
+            return int(await client.get(self.version_prefix + user_id) or 0)
+        except Exception as e:
+            self.redis_errors += 1
+            mark_redis_unavailable(e)
+            return None
+
+    async def versions(self, user_ids: Sequence[str]) -> Optional[Dict[str, int]]:
+        """Data versions of many users in one round trip (None without Redis).
+
+        Read them before computing so results stored with store_many go
+        stale if a user writes in the meantime.
+        """
+        client = get_redis() if self.enabled else None
+        if client is None or not user_ids:
+            return None
+        try:
+            raw = await get_many(client, [self.version_prefix + user_id for user_id in user_ids])
+        except Exception as e:
+            self.redis_errors += 1
+            mark_redis_unavailable(e)
+            return None
+        return {user_id: int(value or 0) for user_id, value in zip(user_ids, raw)}
+
+    async def store_many(self, start_date: date, end_date: date, results: Dict[str, AnalyticsResult],
+                         versions: Optional[Dict[str, int]]) -> int:
+        """Cache precomputed results for one range with pipelined SETs.
+
+        Returns how many entries were written (0 without Redis or versions).
+        """
+        client = get_redis() if self.enabled else None
+        if client is None or versions is None:
+            return 0
+        computed_at = time.time()
+        try:
+            entries = {
+                self.cache_key(user_id, start_date, end_date): json.dumps(
+                    {"version": versions[user_id], "computed_at": computed_at, "result": result.model_dump(mode="json")})
+                for user_id, result in results.items()
+            }
+            await set_many(client, entries, ex=self.ttl)
+        except Exception as e:
+            self.redis_errors += 1
+            mark_redis_unavailable(e)
+            logger.warning("Could not store bulk analytics results", users=len(results), error=str(e))
+            return 0
+        self.computations += len(results)
+        return len(results)
+
+    def metrics(self) -> Dict[str, Any]:
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.hits + self.stale_hits) / lookups, 4) if lookups else 0.0,
+            "computations": self.computations,
+            "coalesced": self.coalesced,
+            "invalidations": self.invalidations,
+            "redis_errors": self.redis_errors,
+        }
+
+
+analytics_cache = AnalyticsCache()
@@ -0,0 +1,149 @@
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from app.core.config import (
+    CATEGORY_CACHE_SIZE,
+    CATEGORY_CACHE_TTL_SECONDS,
+    CATEGORY_CACHE_REDIS_TTL_SECONDS,
+    CATEGORY_CACHE_REDIS_ENABLED,
+)
+from app.core.logging import get_logger
+from app.core.redis_client import get_redis, mark_redis_unavailable
+from app.handlers.normalization import find_amounts, message_template, parse_amount
+
+logger = get_logger(__name__)
+
+AMOUNT_PLACEHOLDER = "{amount}"
+
+
+class CategorizationCache:
+    """Two-tier cache of (category, description) templates.
+
+    Tier 1 is an in-process LRU with TTL, tier 2 is Redis shared by every
+    API/worker process. Entries are keyed on the message template (normalized
+    text with the amount abstracted out), so only the category and the
+    description are cached; the amount always comes from the actual message.
+    """
+
+    key_prefix = "catcache:v1:"
+
+    def __init__(
+        self,
+        max_size: int = CATEGORY_CACHE_SIZE,
+        ttl: int = CATEGORY_CACHE_TTL_SECONDS,
+        redis_ttl: int = CATEGORY_CACHE_REDIS_TTL_SECONDS,
+        use_redis: bool = CATEGORY_CACHE_REDIS_ENABLED,
+    ):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.redis_ttl = redis_ttl
+        self.use_redis = use_redis
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, str]]]" = OrderedDict()
+        self.local_hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self.redis_errors = 0
+
+    @staticmethod
+    def _render(entry: Dict[str, str], text: str) -> Tuple[str, float, str]:
+        raw_amount = find_amounts(text)[0]
+        amount = parse_amount(raw_amount)
+        description = entry["description"].replace(AMOUNT_PLACEHOLDER, raw_amount)
+        return entry["category"], amount, description
+
+    def _get_local(self, key: str) -> Optional[Dict[str, str]]:
+        item = self._entries.get(key)
+        if item is None:
+            return None
+        expires_at, entry = item
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def _set_local(self, key: str, entry: Dict[str, str]) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl, entry)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def get(self, text: str) -> Optional[Tuple[str, float, str]]:
+        """Return (category, amount, description) for text, or None on a miss."""
+        key = message_template(text)
+        if key is None:
+            return None
+
+        entry = self._get_local(key)
+        if entry is not None:
+            self.local_hits += 1
+            return self._render(entry, text)
+
+        client = get_redis() if self.use_redis else None
+        if client is not None:
+            try:
+                raw = await client.get(self.key_prefix + key)
+            except Exception as e:
+                self.redis_errors += 1
+                mark_redis_unavailable(e)
+                raw = None
+            if raw:
+                entry = json.loads(raw)
+                self._set_local(key, entry)
+                self.redis_hits += 1
+                return self._render(entry, text)
+
+        self.misses += 1
+        return None
+
+    async def set(self, text: str, category: str, amount: float, description: str) -> None:
+        """Store the category/description template derived from text."""
+        key = message_template(text)
+        if key is None:
+            return
+
+        raw_amount = find_amounts(text)[0]
+        if parse_amount(raw_amount) != float(amount):
+            # The model read a different amount than the one in the text;
+            # the template would not round-trip, so don't cache it.
+            return
+        if raw_amount in description:
+            description = description.replace(raw_amount, AMOUNT_PLACEHOLDER)
+        entry = {"category": category, "description": description}
+
+        self._set_local(key, entry)
+        self.stores += 1
+
+        client = get_redis() if self.use_redis else None
+        if client is not None:
+            try:
+                await client.set(self.key_prefix + key, json.dumps(entry), ex=self.redis_ttl)
+            except Exception as e:
+                self.redis_errors += 1
+                mark_redis_unavailable(e)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def metrics(self) -> Dict[str, Any]:
+        hits = self.local_hits + self.redis_hits
+        lookups = hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "local_hits": self.local_hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "redis_errors": self.redis_errors,
+        }
+
+
+categorization_cache = CategorizationCache()
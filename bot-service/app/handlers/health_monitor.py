@@ -0,0 +1,150 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional
+
+from sqlalchemy import text
+
+from app.core.celery_worker import celery_app
+from app.core.config import HEALTH_CHECK_INTERVAL_SECONDS, HEALTH_CHECK_TIMEOUT_SECONDS
+from app.core.db import AsyncSessionLocal
+from app.core.logging import get_logger
+from app.core.redis_client import get_redis
+
+logger = get_logger(__name__)
+
+CHECKS = ("database", "redis", "celery")
+
+
+class HealthMonitor:
+    """Probes the database, Redis and Celery in the background and keeps
+    the latest result of each, so health endpoints answer from memory.
+
+    Probes use the async engine and Redis client with a timeout; the Celery
+    broadcast (blocking) runs in a worker thread. If the monitor isn't
+    running (or a result is older than max_age) the requested checks are
+    probed on demand, one probe at a time per check.
+    """
+
+    def __init__(self, interval: float = HEALTH_CHECK_INTERVAL_SECONDS, timeout: float = HEALTH_CHECK_TIMEOUT_SECONDS):
+        self.interval = interval
+        self.timeout = timeout
+        self.max_age = interval * 3
+        self._results: Dict[str, Dict[str, Any]] = {}
+        self._probing: Dict[str, asyncio.Future] = {}
+        self._runner: Optional[asyncio.Task] = None
+        self.probes = 0
+
+    async def _check_database(self) -> str:
+        async with AsyncSessionLocal() as session:
+            await session.execute(text("SELECT 1"))
+        return "healthy"
+
+    async def _check_redis(self) -> str:
+        client = get_redis()
+        if client is None:
+            return "unhealthy: unavailable (backing off)"
+        await client.ping()
+        return "healthy"
+
+    async def _check_celery(self) -> str:
+        replies = await asyncio.to_thread(lambda: celery_app.control.inspect(timeout=self.timeout).ping())
+        if replies:
+            return f"healthy: {len(replies)} workers"
+        return "unhealthy: no active workers"
+
+    def _probe_fn(self, name: str) -> Callable[[], Awaitable[str]]:
+        return {"database": self._check_database, "redis": self._check_redis, "celery": self._check_celery}[name]
+
+    async def _probe(self, name: str) -> Dict[str, Any]:
+        started = time.perf_counter()
+        try:
+            # The Celery broadcast already waits at most timeout for replies
+            timeout = self.timeout * 2 if name == "celery" else self.timeout
+            status = await asyncio.wait_for(self._probe_fn(name)(), timeout)
+        except asyncio.TimeoutError:
+            status = f"unhealthy: timed out after {self.timeout}s"
+        except Exception as e:
+            status = f"unhealthy: {e}"
+        result = {
+            "status": status,
+            "checked_at": time.time(),
+            "latency_ms": round((time.perf_counter() - started) * 1000, 2),
+        }
+        if not status.startswith("healthy"):
+            logger.warning("Health check failed", check=name, status=status)
+        self._results[name] = result
+        self.probes += 1
+        return result
+
+    def _probe_once(self, name: str) -> asyncio.Future:
+        future = self._probing.get(name)
+        if future is None or future.get_loop() is not asyncio.get_running_loop():
+            future = asyncio.ensure_future(self._probe(name))
+            self._probing[name] = future
+            future.add_done_callback(lambda _: self._probing.pop(name, None))
+        return future
+
+    async def probe(self, names: Iterable[str] = CHECKS) -> None:
+        """Run the given checks now (concurrently)."""
+        await asyncio.gather(*(self._probe_once(name) for name in names))
+
+    async def current(self, names: Iterable[str] = CHECKS, refresh: bool = False) -> Dict[str, Any]:
+        """Latest results of the given checks, probing the missing or stale ones."""
+        names = tuple(names)
+        now = time.time()
+        stale = [
+            name for name in names
+            if refresh or name not in self._results or now - self._results[name]["checked_at"] > self.max_age
+        ]
+        if stale:
+            await self.probe(stale)
+        return self.report(names)
+
+    def report(self, names: Iterable[str] = CHECKS) -> Dict[str, Any]:
+        """Overall status from the cached results: any failing database or
+        Redis check (or a Celery error) is unhealthy, no workers is degraded."""
+        checks = {name: self._results[name]["status"] for name in names if name in self._results}
+        status = "healthy"
+        for name, check in checks.items():
+            if check.startswith("healthy"):
+                continue
+            if name == "celery" and check == "unhealthy: no active workers":
+                status = "degraded" if status == "healthy" else status
+            else:
+                status = "unhealthy"
+        checked = [self._results[name]["checked_at"] for name in checks]
+        return {
+            "status": status,
+            "service": "bot-service",
+            "checks": checks,
+            "checked_at": min(checked) if checked else None,
+        }
+
+    async def _run(self) -> None:
+        while True:
+            await self.probe()
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        if self._runner is None or self._runner.done():
+            self._runner = asyncio.get_running_loop().create_task(self._run())
+            logger.info("Health monitor started", interval=self.interval)
+
+    async def stop(self) -> None:
+        if self._runner is not None and not self._runner.done():
+            self._runner.cancel()
+            try:
+                await self._runner
+            except asyncio.CancelledError:
+                pass
+        self._runner = None
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "running": self._runner is not None and not self._runner.done(),
+            "probes": self.probes,
+            "checks": self._results,
+        }
+
+
+health_monitor = HealthMonitor()
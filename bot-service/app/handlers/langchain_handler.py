@@ -1,12 +1,20 @@
 from groq import Groq
 from langchain_core.messages import HumanMessage
-from app.core.config import OPENAI_API_KEY
+from app.core.config import GROQ_BASE_URL, OPENAI_API_KEY
+from app.handlers.llm_engine import llm_engine
+from app.handlers.categorization_cache import categorization_cache
+from app.handlers.rule_classifier import rule_classifier
+from app.handlers.stage_stats import categorization_stats
+from app.handlers.llm_batcher import CategorizationBatcher
 import logging
 import json
 import os
+import time
+from typing import List, Optional, Tuple
 
 client = Groq(
     api_key=os.environ.get("GROQ_API_KEY"),
+    base_url=GROQ_BASE_URL,
 )
 
 logger = logging.getLogger(__name__)
@@ -16,42 +24,128 @@ CATEGORIES = [
     "Medical/Healthcare", "Savings", "Debt", "Education", "Entertainment", "Other"
 ]
 
-async def categorize_expense(text: str):
+async def _complete(prompt: str) -> str:
+    logger.info(f"LangChain prompt: {prompt}")
+    chat_completion = await llm_engine.run(
+        client.chat.completions.create,
+        messages=[
+            {
+                "role": "user",
+                "content": prompt,
+            }
+        ],
+        model=os.environ.get("MODEL_NAME"),
+        timeout=llm_engine.timeout,
+    )
+    logger.info(f"LangChain response: {chat_completion}")
+
+    logger.info(f"LangChain response: {chat_completion.choices[0].message.content}")
+    return chat_completion.choices[0].message.content
+
+
+async def _llm_categorize(text: str):
+    prompt = f"""
+You are an expense analyzer. The user wrote: "{text}".
+Extract the category (e.g. Food, Transport) from this categories "{CATEGORIES}", amount (as float), and a short description. Don't use any other words or context that the user might provide. Just expenses.
+Respond in JSON format like this: {{"category": "Food", "amount": 10.5, "description": "Pizza"}}
+"""
+    parsed = json.loads(await _complete(prompt))
+    return parsed["category"], float(parsed["amount"]), parsed["description"]
+
+
+async def _llm_categorize_batch(texts: List[str]) -> List[Optional[Tuple[str, float, str]]]:
+    """Categorize several messages with one completion.
+
+    Returns one entry per text, None for items missing or malformed in the
+    model's answer so the batcher can retry them individually.
+    """
+    messages = "\n".join(f'{i}. "{text}"' for i, text in enumerate(texts, start=1))
+    prompt = f"""
+You are an expense analyzer. The user wrote these messages:
+{messages}
+For each message extract the category (e.g. Food, Transport) from this categories "{CATEGORIES}", amount (as float), and a short description. Don't use any other words or context that the user might provide. Just expenses.
+Respond only with a JSON array with one object per message, in the same order, like this: [{{"id": 1, "category": "Food", "amount": 10.5, "description": "Pizza"}}]
+"""
+    parsed = json.loads(await _complete(prompt))
+    if isinstance(parsed, dict):
+        parsed = next((value for value in parsed.values() if isinstance(value, list)), None)
+    if not isinstance(parsed, list):
+        raise ValueError("Batched response is not a JSON array")
+
+    by_id = {}
+    for position, item in enumerate(parsed, start=1):
+        if isinstance(item, dict):
+            try:
+                # Models sometimes echo the id as a string ("1")
+                by_id.setdefault(int(item.get("id", position)), item)
+            except (TypeError, ValueError):
+                pass
+    missing = len(texts) - sum(1 for i in range(1, len(texts) + 1) if i in by_id)
+    if missing:
+        llm_batcher.id_mismatches += 1
+        if len(parsed) == len(texts):
+            logger.warning(f"Batched response ids don't match for {missing} of {len(texts)} items; using answer order")
+            by_id = {position: item for position, item in enumerate(parsed, start=1)}
+        else:
+            logger.warning(f"Batched response ids don't match for {missing} of {len(texts)} items")
+
+    results = []
+    for i in range(1, len(texts) + 1):
+        item = by_id.get(i)
+        try:
+            results.append((item["category"], float(item["amount"]), item["description"]))
+        except (TypeError, KeyError, ValueError):
+            results.append(None)
+    return results
+
+
+llm_batcher = CategorizationBatcher(_llm_categorize, _llm_categorize_batch)
+
+
+async def categorize_expense(text: str, fallback: bool = True):
+    """(category, amount, description) of a message: rules, then cache, then the LLM.
+
+    If the LLM fails, answers with "Misc" and the amount parsed locally; with
+    fallback=False the error is raised instead, so the caller can retry.
+    """
     logger.info(f"Text to categorize: {text}")
     if text is None or text.strip() == "":
         logger.warning("Empty text provided for categorization.")
+        categorization_stats.record("skipped")
         return "Misc", 0.0, "No description"
     if not any(char.isdigit() for char in text):
         logger.warning("No numbers found in text. Categorizing as Misc.")
+        categorization_stats.record("skipped")
         return "Misc", 0.0, text
     if len(text) > 50:
         text = text[:50]
         logger.warning("Text truncated to 50 characters for categorization.")
 
-    prompt = f"""
-You are an expense analyzer. The user wrote: "{text}".
-Extract the category (e.g. Food, Transport) from this categories "{CATEGORIES}", amount (as float), and a short description. Don't use any other words or context that the user might provide. Just expenses.
-Respond in JSON format like this: {{"category": "Food", "amount": 10.5, "description": "Pizza"}}
-"""
-    logger.info(f"LangChain prompt: {prompt}")
+    started = time.perf_counter()
+    ruled = rule_classifier.classify(text)
+    if ruled:
+        logger.info(f"Rule-based categorization: {ruled}")
+        categorization_stats.record("rules", time.perf_counter() - started)
+        return ruled
+
+    started = time.perf_counter()
+    cached = await categorization_cache.get(text)
+    if cached:
+        logger.info(f"Categorization cache hit: {cached}")
+        categorization_stats.record("cache", time.perf_counter() - started)
+        return cached
+
+    started = time.perf_counter()
     try:
-        chat_completion = client.chat.completions.create(
-            messages=[
-                {
-                    "role": "user",
-                    "content": prompt,
-                }
-            ],
-            model=os.environ.get("MODEL_NAME"),
-        )
-        logger.info(f"LangChain response: {chat_completion}")
-        
-        logger.info(f"LangChain response: {chat_completion.choices[0].message.content}")
-
-        parsed = json.loads(chat_completion.choices[0].message.content)
-        return parsed["category"], float(parsed["amount"]), parsed["description"]
-    
+        category, amount, description = await llm_batcher.submit(text)
+        await categorization_cache.set(text, category, amount, description)
+        categorization_stats.record("llm", time.perf_counter() - started)
+        return category, amount, description
+
     except Exception as e:
+        if not fallback:
+            logger.warning(f"LangChain error: {e}. Raising for the caller to retry.")
+            raise
         logger.warning(f"LangChain error: {e}. Using mock categorization.")
 
         words = text.lower().split()
@@ -59,4 +153,5 @@ Respond in JSON format like this: {{"category": "Food", "amount": 10.5, "descrip
         category = "Misc"
         description = text
 
+        categorization_stats.record("fallback", time.perf_counter() - started)
         return category, amount, description
\ No newline at end of file
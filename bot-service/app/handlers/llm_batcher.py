@@ -0,0 +1,135 @@
+import asyncio
+import weakref
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from app.core.config import LLM_BATCH_MAX_SIZE, LLM_BATCH_MAX_WAIT_MS
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+Categorization = Tuple[str, float, str]
+
+
+class _LoopState:
+    def __init__(self):
+        self.pending: List[Tuple[str, asyncio.Future]] = []
+        self.timer: Optional[asyncio.TimerHandle] = None
+        self.tasks: set = set()
+
+
+class CategorizationBatcher:
+    """Coalesces concurrent LLM categorizations into multi-item requests.
+
+    Callers ``await submit(text)``. Pending texts are flushed when
+    ``max_batch_size`` is reached or ``max_wait_ms`` after the first one
+    arrived. A batch of one uses ``single``; larger batches use ``batch`` and
+    fall back to ``single`` for every item that could not be parsed.
+    """
+
+    def __init__(
+        self,
+        single: Callable[[str], Awaitable[Categorization]],
+        batch: Callable[[List[str]], Awaitable[List[Optional[Categorization]]]],
+        max_batch_size: int = LLM_BATCH_MAX_SIZE,
+        max_wait_ms: float = LLM_BATCH_MAX_WAIT_MS,
+    ):
+        self.single = single
+        self.batch = batch
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait_ms / 1000
+        self._states: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _LoopState]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self.batches_sent = 0
+        self.items_batched = 0
+        self.single_calls = 0
+        self.batch_fallbacks = 0
+        # Batched answers whose ids didn't match the prompt's (set by the batch function)
+        self.id_mismatches = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_batch_size > 1
+
+    def _state(self, loop: asyncio.AbstractEventLoop) -> _LoopState:
+        state = self._states.get(loop)
+        if state is None:
+            state = _LoopState()
+            self._states[loop] = state
+        return state
+
+    async def submit(self, text: str) -> Categorization:
+        if not self.enabled:
+            self.single_calls += 1
+            return await self.single(text)
+
+        loop = asyncio.get_running_loop()
+        state = self._state(loop)
+        future = loop.create_future()
+        state.pending.append((text, future))
+
+        if len(state.pending) >= self.max_batch_size:
+            self._flush(loop, state)
+        elif state.timer is None:
+            state.timer = loop.call_later(self.max_wait, self._flush, loop, state)
+        return await future
+
+    def _flush(self, loop: asyncio.AbstractEventLoop, state: _LoopState) -> None:
+        if state.timer is not None:
+            state.timer.cancel()
+            state.timer = None
+        items, state.pending = state.pending, []
+        if not items:
+            return
+        task = loop.create_task(self._dispatch(items))
+        state.tasks.add(task)
+        task.add_done_callback(state.tasks.discard)
+
+    async def _dispatch(self, items: List[Tuple[str, asyncio.Future]]) -> None:
+        if len(items) == 1:
+            self.single_calls += 1
+            await self._resolve_single(*items[0])
+            return
+
+        self.batches_sent += 1
+        self.items_batched += len(items)
+        texts = [text for text, _ in items]
+        try:
+            results = await self.batch(texts)
+            if len(results) != len(items):
+                raise ValueError(f"expected {len(items)} results, got {len(results)}")
+        except Exception as e:
+            logger.warning("Batched categorization failed, falling back to single calls", error=str(e), size=len(items))
+            results = [None] * len(items)
+
+        retries = []
+        for (text, future), result in zip(items, results):
+            if result is None:
+                self.batch_fallbacks += 1
+                retries.append(self._resolve_single(text, future))
+            elif not future.done():
+                future.set_result(result)
+        if retries:
+            await asyncio.gather(*retries)
+
+    async def _resolve_single(self, text: str, future: asyncio.Future) -> None:
+        try:
+            result = await self.single(text)
+        except Exception as e:
+            if not future.done():
+                future.set_exception(e)
+            return
+        if not future.done():
+            future.set_result(result)
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+            "batches_sent": self.batches_sent,
+            "items_batched": self.items_batched,
+            "avg_batch_size": round(self.items_batched / self.batches_sent, 2) if self.batches_sent else 0.0,
+            "single_calls": self.single_calls,
+            "batch_fallbacks": self.batch_fallbacks,
+            "id_mismatches": self.id_mismatches,
+        }
@@ -0,0 +1,122 @@
+import asyncio
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict
+
+from app.core.config import LLM_MAX_CONCURRENCY, LLM_TIMEOUT_SECONDS
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class LLMTimeoutError(Exception):
+    """Raised when an LLM call exceeds its per-call timeout."""
+
+
+class AsyncLLMEngine:
+    """Runs blocking LLM SDK calls off the event loop.
+
+    Calls are executed on a bounded thread pool and gated by a per-loop
+    semaphore, so at most ``max_concurrency`` requests are in flight and the
+    rest wait without blocking other coroutines. A call that times out keeps
+    its slot until its thread actually returns (the SDK call can't be
+    interrupted), so the cap holds and every admitted call finds a free thread.
+    """
+
+    def __init__(self, max_concurrency: int = LLM_MAX_CONCURRENCY, timeout: float = LLM_TIMEOUT_SECONDS):
+        self.max_concurrency = max(1, max_concurrency)
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_concurrency,
+            thread_name_prefix="llm",
+        )
+        # asyncio primitives belong to a single loop; Celery tasks may run on
+        # their own loop, so keep one semaphore per loop.
+        self._semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self._in_flight = 0
+        self._waiting = 0
+        self._peak_in_flight = 0
+        self._total = 0
+        self._succeeded = 0
+        self._failed = 0
+        self._timed_out = 0
+        self._total_latency = 0.0
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphores[loop] = semaphore
+        return semaphore
+
+    async def run(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run ``func(*args, **kwargs)`` in the pool, bounded and with a timeout."""
+        timeout = self.timeout
+        loop = asyncio.get_running_loop()
+
+        self._waiting += 1
+        try:
+            semaphore = self._semaphore()
+            await semaphore.acquire()
+        finally:
+            self._waiting -= 1
+
+        self._in_flight += 1
+        self._total += 1
+        self._peak_in_flight = max(self._peak_in_flight, self._in_flight)
+        try:
+            future = self._executor.submit(partial(func, *args, **kwargs))
+        except BaseException:
+            self._finish(semaphore)
+            raise
+        future.add_done_callback(lambda _: self._release_from_thread(loop, semaphore))
+
+        started = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(asyncio.wrap_future(future, loop=loop), timeout=timeout)
+            self._succeeded += 1
+            return result
+        except asyncio.TimeoutError:
+            self._timed_out += 1
+            logger.warning("LLM call timed out", timeout=timeout)
+            raise LLMTimeoutError(f"LLM call exceeded {timeout}s")
+        except Exception:
+            self._failed += 1
+            raise
+        finally:
+            self._total_latency += time.perf_counter() - started
+
+    def _finish(self, semaphore: asyncio.Semaphore) -> None:
+        self._in_flight -= 1
+        semaphore.release()
+
+    def _release_from_thread(self, loop: asyncio.AbstractEventLoop, semaphore: asyncio.Semaphore) -> None:
+        # Runs in the worker thread (or wherever the future was cancelled)
+        try:
+            loop.call_soon_threadsafe(self._finish, semaphore)
+        except RuntimeError:
+            # The loop is closed, and its semaphore with it
+            self._in_flight -= 1
+
+    def metrics(self) -> Dict[str, Any]:
+        finished = self._succeeded + self._failed + self._timed_out
+        return {
+            "max_concurrency": self.max_concurrency,
+            "timeout_seconds": self.timeout,
+            "in_flight": self._in_flight,
+            "waiting": self._waiting,
+            "peak_in_flight": self._peak_in_flight,
+            "total": self._total,
+            "succeeded": self._succeeded,
+            "failed": self._failed,
+            "timed_out": self._timed_out,
+            "avg_latency_ms": round(self._total_latency / finished * 1000, 2) if finished else 0.0,
+        }
+
+
+llm_engine = AsyncLLMEngine()
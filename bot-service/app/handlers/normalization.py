@@ -0,0 +1,52 @@
+import re
+import unicodedata
+from typing import List, Optional
+
+AMOUNT_TOKEN = "<amount>"
+
+# A standalone number, optionally prefixed by "$" and using "." or "," as
+# decimal separator: "20", "$45", "1.2", "3,50".
+AMOUNT_PATTERN = re.compile(r"(?<![\w.,])\$?(\d+(?:[.,]\d+)?)(?![\w]|[.,]\d)")
+
+
+def find_amounts(text: str) -> List[str]:
+    """Return the raw amount tokens found in text, in order."""
+    if not text:
+        return []
+    return AMOUNT_PATTERN.findall(text)
+
+
+def parse_amount(token: str) -> float:
+    return float(token.replace(",", "."))
+
+
+def extract_amount(text: str) -> Optional[float]:
+    """Return the first amount in text, or None if there is none."""
+    amounts = find_amounts(text)
+    if not amounts:
+        return None
+    return parse_amount(amounts[0])
+
+
+def normalize_message(text: str) -> str:
+    """Lowercase, strip accents and collapse whitespace and punctuation."""
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    text = text.lower()
+    text = AMOUNT_PATTERN.sub(lambda m: f" {m.group(1)} ", text)
+    text = re.sub(r"[^\w.,<> ]+", " ", text)
+    text = re.sub(r"(?<!\d)[.,]|[.,](?!\d)", " ", text)
+    return " ".join(text.split())
+
+
+def message_template(text: str) -> Optional[str]:
+    """Normalized text with its amount abstracted out.
+
+    "Pizza 20" and "pizza  $25" both map to "pizza <amount>". Returns None when
+    the message does not contain exactly one amount, since the amount could
+    not be re-extracted unambiguously.
+    """
+    if not text or len(find_amounts(text)) != 1:
+        return None
+    normalized = normalize_message(text)
+    return AMOUNT_PATTERN.sub(AMOUNT_TOKEN, normalized)
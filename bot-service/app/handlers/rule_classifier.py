@@ -0,0 +1,123 @@
+from typing import Dict, Optional, Tuple
+
+from app.core.config import CATEGORY_RULES_ENABLED
+from app.handlers.normalization import find_amounts, normalize_message, parse_amount, AMOUNT_PATTERN
+
+# Keyword / merchant dictionary mapped onto langchain_handler.CATEGORIES.
+# Keys are normalized (lowercase, no accents); multi-word keys match phrases
+# once FILLER_WORDS are dropped.
+KEYWORDS: Dict[str, str] = {
+    # Housing
+    "alquiler": "Housing", "rent": "Housing", "expensas": "Housing", "hipoteca": "Housing",
+    "mortgage": "Housing", "abl": "Housing", "mudanza": "Housing",
+    # Transportation
+    "nafta": "Transportation", "gasolina": "Transportation", "combustible": "Transportation",
+    "fuel": "Transportation", "subte": "Transportation", "colectivo": "Transportation",
+    "bondi": "Transportation", "tren": "Transportation", "train": "Transportation",
+    "bus": "Transportation", "bus fare": "Transportation", "taxi": "Transportation",
+    "uber": "Transportation", "cabify": "Transportation", "didi": "Transportation",
+    "peaje": "Transportation", "toll": "Transportation", "estacionamiento": "Transportation",
+    "parking": "Transportation", "sube": "Transportation", "metro": "Transportation",
+    "ypf": "Transportation", "axion": "Transportation",
+    # Food
+    "cafe": "Food", "coffee": "Food", "pizza": "Food", "burger": "Food",
+    "hamburguesa": "Food", "almuerzo": "Food", "lunch": "Food", "cena": "Food",
+    "dinner": "Food", "desayuno": "Food", "breakfast": "Food", "merienda": "Food",
+    "empanadas": "Food", "empanada": "Food", "helado": "Food", "sushi": "Food",
+    "super": "Food", "supermercado": "Food", "groceries": "Food", "verduleria": "Food",
+    "carniceria": "Food", "panaderia": "Food", "facturas": "Food", "asado": "Food",
+    "restaurant": "Food", "restaurante": "Food", "comida": "Food", "food": "Food",
+    "delivery": "Food", "rappi": "Food", "pedidosya": "Food", "mcdonalds": "Food",
+    "starbucks": "Food", "carrefour": "Food", "coto": "Food", "jumbo": "Food",
+    # Utilities
+    "luz": "Utilities", "electricidad": "Utilities", "electricity": "Utilities",
+    "agua": "Utilities", "water": "Utilities", "internet": "Utilities",
+    "wifi": "Utilities", "telefono": "Utilities", "phone": "Utilities", "celular": "Utilities",
+    "edenor": "Utilities", "edesur": "Utilities", "metrogas": "Utilities", "aysa": "Utilities",
+    "fibertel": "Utilities", "movistar": "Utilities",
+    # Insurance
+    "seguro": "Insurance", "insurance": "Insurance", "seguro auto": "Insurance",
+    # Medical/Healthcare
+    "farmacia": "Medical/Healthcare", "pharmacy": "Medical/Healthcare",
+    "medico": "Medical/Healthcare", "doctor": "Medical/Healthcare",
+    "dentista": "Medical/Healthcare", "dentist": "Medical/Healthcare",
+    "remedios": "Medical/Healthcare", "medicamentos": "Medical/Healthcare",
+    "prepaga": "Medical/Healthcare", "osde": "Medical/Healthcare",
+    "obra social": "Medical/Healthcare", "consulta": "Medical/Healthcare",
+    # Savings
+    "ahorro": "Savings", "ahorros": "Savings", "savings": "Savings",
+    "plazo fijo": "Savings",
+    # Debt
+    "prestamo": "Debt", "loan": "Debt", "deuda": "Debt", "debt": "Debt",
+    "tarjeta credito": "Debt", "credit card": "Debt",
+    # Education
+    "curso": "Education", "course": "Education", "libro": "Education", "libros": "Education",
+    "book": "Education", "books": "Education", "facultad": "Education", "universidad": "Education",
+    "colegio": "Education", "school": "Education", "udemy": "Education", "matricula": "Education",
+    # Entertainment
+    "cine": "Entertainment", "cinema": "Entertainment", "movie": "Entertainment",
+    "netflix": "Entertainment", "spotify": "Entertainment", "disney": "Entertainment",
+    "teatro": "Entertainment", "recital": "Entertainment", "concierto": "Entertainment",
+    "boliche": "Entertainment", "cerveza": "Entertainment", "birra": "Entertainment",
+    "bar": "Entertainment", "juego": "Entertainment", "steam": "Entertainment",
+    "gimnasio": "Entertainment", "gym": "Entertainment",
+}
+
+# Words that carry no category signal and are ignored when judging whether
+# the message is a simple "<word(s)> <number>" pair.
+CURRENCY_WORDS = {"pesos", "peso", "ars", "usd", "$"}
+FILLER_WORDS = CURRENCY_WORDS | {
+    "de", "del", "la", "el", "los", "las", "en", "un", "una", "por", "para", "con",
+    "the", "a", "for", "on", "at", "of",
+}
+
+MAX_DESCRIPTION_WORDS = 4
+
+
+class RuleClassifier:
+    """Deterministic keyword classifier for short "<words> <amount>" messages.
+
+    Returns a result only when it is confident: exactly one amount, a short
+    description, and every matched keyword pointing at the same category.
+    Anything else is left to the LLM.
+    """
+
+    def __init__(self, keywords: Dict[str, str] = KEYWORDS, enabled: bool = CATEGORY_RULES_ENABLED):
+        self.keywords = keywords
+        self.enabled = enabled
+        self.max_phrase_words = max(len(k.split()) for k in keywords)
+
+    def classify(self, text: str) -> Optional[Tuple[str, float, str]]:
+        if not self.enabled or not text:
+            return None
+        amounts = find_amounts(text)
+        if len(amounts) != 1:
+            return None
+
+        normalized = normalize_message(text)
+        words = AMOUNT_PATTERN.sub(" ", normalized).split()
+        meaningful = [w for w in words if w not in FILLER_WORDS]
+        if not meaningful or len(meaningful) > MAX_DESCRIPTION_WORDS:
+            return None
+
+        categories = set()
+        matched_words = set()
+        for size in range(self.max_phrase_words, 0, -1):
+            for i in range(len(meaningful) - size + 1):
+                if any(j in matched_words for j in range(i, i + size)):
+                    continue
+                phrase = " ".join(meaningful[i:i + size])
+                category = self.keywords.get(phrase)
+                if category:
+                    categories.add(category)
+                    matched_words.update(range(i, i + size))
+
+        # Require one unambiguous category that explains most of the message.
+        if len(categories) != 1 or len(matched_words) * 2 < len(meaningful):
+            return None
+
+        description = " ".join(w for w in words if w not in CURRENCY_WORDS).capitalize()
+        return categories.pop(), parse_amount(amounts[0]), description
+
+
+rule_classifier = RuleClassifier()
@@ -0,0 +1,42 @@
+from typing import Any, Dict
+
+STAGES = ("skipped", "rules", "cache", "llm", "fallback")
+
+
+class CategorizationStats:
+    """Counts which stage of the categorization pipeline answered each message.
+
+    ``skipped`` covers empty/number-less messages, ``fallback`` covers LLM
+    failures answered by the local amount parser.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        self.counts = {stage: 0 for stage in STAGES}
+        self.seconds = {stage: 0.0 for stage in STAGES}
+
+    def record(self, stage: str, elapsed: float = 0.0) -> None:
+        self.counts[stage] += 1
+        self.seconds[stage] += elapsed
+
+    def metrics(self) -> Dict[str, Any]:
+        total = sum(self.counts.values())
+        answered = total - self.counts["skipped"]
+        local = self.counts["rules"] + self.counts["cache"]
+        return {
+            "total": total,
+            "stages": {
+                stage: {
+                    "count": count,
+                    "hit_rate": round(count / total, 4) if total else 0.0,
+                    "avg_latency_ms": round(self.seconds[stage] / count * 1000, 3) if count else 0.0,
+                }
+                for stage, count in self.counts.items()
+            },
+            "llm_avoided_rate": round(local / answered, 4) if answered else 0.0,
+        }
+
+
+categorization_stats = CategorizationStats()
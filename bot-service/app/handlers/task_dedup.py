@@ -0,0 +1,112 @@
+import asyncio
+import hashlib
+import json
+import uuid
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from celery.result import AsyncResult
+
+from app.core.celery_worker import celery_app
+from app.core.config import TASK_DEDUP_ENABLED, TASK_DEDUP_TTL_SECONDS
+from app.core.logging import get_logger
+from app.core.redis_client import get_redis, mark_redis_unavailable
+
+logger = get_logger(__name__)
+
+# Recorded in the result backend before a deduplicated task is sent. Celery
+# reports PENDING both for queued tasks and for ids it never saw or already
+# forgot, so PENDING alone can't tell a queued task from a lost one.
+QUEUED_STATE = "SENT"
+IN_FLIGHT_STATES = {QUEUED_STATE, "RECEIVED", "STARTED", "RETRY"}
+
+
+class TaskDeduplicator:
+    """Submission-time dedup of identical Celery tasks.
+
+    A task key (task name, canonical payload and the user's analytics data
+    version) maps in Redis to the task_id submitted for it. A duplicate
+    submission gets that task_id back while the task is queued or running,
+    or once it succeeded if the data version is known (its result is then
+    still current). Failed, expired or lost (PENDING: no record in the
+    result backend) entries are replaced by a new task. Without Redis every
+    submission is enqueued.
+    """
+
+    key_prefix = "tasks:dedup:"
+
+    def __init__(self, ttl: int = TASK_DEDUP_TTL_SECONDS, enabled: bool = TASK_DEDUP_ENABLED):
+        self.ttl = ttl
+        self.enabled = enabled
+        self.submitted = 0
+        self.deduplicated = 0
+        self.redis_errors = 0
+
+    @classmethod
+    def task_key(cls, name: str, payload: Dict[str, Any], version: Optional[int]) -> str:
+        canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+        digest = hashlib.sha256(canonical.encode()).hexdigest()[:32]
+        return f"{cls.key_prefix}{name}:{'-' if version is None else version}:{digest}"
+
+    async def submit(self, name: str, payload: Dict[str, Any], version: Optional[int],
+                     send: Callable[[str], Any]) -> Tuple[str, Optional[str]]:
+        """Enqueue with send(task_id) unless an equivalent task exists.
+
+        Returns (task_id, None) for a new task, or (existing task_id, its
+        state) for a duplicate; a queued duplicate is reported as PENDING.
+        """
+        task_id = str(uuid.uuid4())
+        client = get_redis() if self.enabled else None
+        key = self.task_key(name, payload, version)
+        registered = False
+        if client is not None:
+            # Before the key points at task_id, so a duplicate never finds it unrecorded
+            await self._mark_queued(task_id)
+            try:
+                registered = bool(await client.set(key, task_id, nx=True, ex=self.ttl))
+                if not registered:
+                    existing = await client.get(key)
+                    if existing is not None:
+                        existing = existing.decode() if isinstance(existing, bytes) else existing
+                        # Reading the state is a blocking result-backend round trip
+                        state = await asyncio.to_thread(lambda: AsyncResult(existing, app=celery_app).state)
+                        if state in IN_FLIGHT_STATES or (state == "SUCCESS" and version is not None):
+                            self.deduplicated += 1
+                            logger.info("Duplicate task submission", task=name, task_id=existing, state=state)
+                            return existing, "PENDING" if state == QUEUED_STATE else state
+                    # The previous task failed, was lost or its result is stale: take the key over
+                    await client.set(key, task_id, ex=self.ttl)
+                    registered = True
+            except Exception as e:
+                self.redis_errors += 1
+                mark_redis_unavailable(e)
+
+        try:
+            send(task_id)
+        except Exception:
+            if registered:
+                try:
+                    await client.delete(key)
+                except Exception:
+                    pass
+            raise
+        self.submitted += 1
+        return task_id, None
+
+    async def _mark_queued(self, task_id: str) -> None:
+        try:
+            await asyncio.to_thread(celery_app.backend.store_result, task_id, None, QUEUED_STATE)
+        except Exception as e:
+            # The task is still sent; until it starts, duplicates just won't reuse it
+            logger.warning("Could not record queued task", task_id=task_id, error=str(e))
+
+    def metrics(self) -> Dict[str, Any]:
+        total = self.submitted + self.deduplicated
+        return {
+            "submitted": self.submitted,
+            "deduplicated": self.deduplicated,
+            "dedup_rate": round(self.deduplicated / total, 4) if total else 0.0,
+            "redis_errors": self.redis_errors,
+        }
+
+
+task_deduplicator = TaskDeduplicator()
@@ -0,0 +1,204 @@
+import asyncio
+import json
+import time
+from typing import Any, AsyncIterator, Dict, Optional, Set
+
+import redis
+import redis.asyncio as aioredis
+from celery.result import AsyncResult
+from celery.signals import task_failure, task_prerun, task_retry, task_success
+
+from app.core.celery_worker import celery_app
+from app.core.config import (
+    REDIS_RETRY_AFTER_SECONDS,
+    REDIS_SOCKET_TIMEOUT,
+    REDIS_URL,
+    TASK_EVENTS_HEARTBEAT_SECONDS,
+    TASK_EVENTS_TIMEOUT_SECONDS,
+)
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+CHANNEL_PREFIX = "tasks:events:"
+STREAMED_TASKS = {"run_analytics_task", "run_bulk_analytics_task"}
+TERMINAL_STATES = {"SUCCESS", "FAILED", "TIMEOUT"}
+
+
+def task_state(task_id: str) -> Dict[str, Any]:
+    """Current state of a task from the result backend (one lookup).
+
+    Same shape as the published events: task_id, status and, when done,
+    result or error.
+    """
+    task_result = AsyncResult(task_id, app=celery_app)
+    state = task_result.state
+    if state == "SUCCESS":
+        return {"task_id": task_id, "status": "SUCCESS", "result": task_result.result}
+    if state == "FAILURE":
+        return {"task_id": task_id, "status": "FAILED", "error": str(task_result.result)}
+    return {"task_id": task_id, "status": state}
+
+
+# Worker side: task signals publish each state change on the task's channel
+
+_publisher: Optional[redis.Redis] = None
+
+
+def publish_task_event(task_id: str, status: str, **fields: Any) -> None:
+    global _publisher
+    if _publisher is None:
+        _publisher = redis.Redis.from_url(REDIS_URL, socket_timeout=REDIS_SOCKET_TIMEOUT,
+                                          socket_connect_timeout=REDIS_SOCKET_TIMEOUT)
+    event = {"task_id": task_id, "status": status, **fields}
+    try:
+        _publisher.publish(CHANNEL_PREFIX + task_id, json.dumps(event, default=str))
+    except Exception as e:
+        logger.warning("Could not publish task event", task_id=task_id, status=status, error=str(e))
+
+
+@task_prerun.connect
+def _on_task_prerun(task_id=None, task=None, **kwargs) -> None:
+    if task is not None and task.name in STREAMED_TASKS:
+        publish_task_event(task_id, "STARTED")
+
+
+@task_success.connect
+def _on_task_success(sender=None, result=None, **kwargs) -> None:
+    if sender is not None and sender.name in STREAMED_TASKS:
+        publish_task_event(sender.request.id, "SUCCESS", result=result)
+
+
+@task_retry.connect
+def _on_task_retry(sender=None, request=None, reason=None, **kwargs) -> None:
+    if sender is not None and sender.name in STREAMED_TASKS:
+        publish_task_event(request.id, "RETRY", error=str(reason))
+
+
+@task_failure.connect
+def _on_task_failure(sender=None, task_id=None, exception=None, **kwargs) -> None:
+    if sender is not None and sender.name in STREAMED_TASKS:
+        publish_task_event(task_id, "FAILED", error=str(exception))
+
+
+class TaskEventBroker:
+    """Fans task state changes out to in-process subscribers (API side).
+
+    One pattern subscription per process reads every task channel and hands
+    each event to the queues of whoever is waiting on that task, so a
+    thousand open dashboards cost one Redis connection, not a poll each.
+    """
+
+    def __init__(self, heartbeat: float = TASK_EVENTS_HEARTBEAT_SECONDS,
+                 timeout: float = TASK_EVENTS_TIMEOUT_SECONDS):
+        self.heartbeat = heartbeat
+        self.timeout = timeout
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+        self._reader: Optional[asyncio.Task] = None
+        self.events_received = 0
+        self.events_delivered = 0
+        self.reconnects = 0
+
+    def subscribe(self, task_id: str) -> asyncio.Queue:
+        self._ensure_reader()
+        queue: asyncio.Queue = asyncio.Queue()
+        self._subscribers.setdefault(task_id, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, task_id: str, queue: asyncio.Queue) -> None:
+        queues = self._subscribers.get(task_id)
+        if queues is not None:
+            queues.discard(queue)
+            if not queues:
+                del self._subscribers[task_id]
+
+    def dispatch(self, data: Any) -> None:
+        """Deliver one raw pub/sub payload to the task's subscribers."""
+        self.events_received += 1
+        try:
+            event = json.loads(data)
+        except ValueError:
+            logger.warning("Discarding malformed task event")
+            return
+        for queue in self._subscribers.get(event.get("task_id"), ()):
+            queue.put_nowait(event)
+            self.events_delivered += 1
+
+    def _ensure_reader(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._reader is None or self._reader.done() or self._reader.get_loop() is not loop:
+            self._reader = loop.create_task(self._read())
+
+    async def _read(self) -> None:
+        while True:
+            client = aioredis.from_url(REDIS_URL)
+            pubsub = client.pubsub()
+            try:
+                await pubsub.psubscribe(CHANNEL_PREFIX + "*")
+                async for message in pubsub.listen():
+                    if message["type"] == "pmessage":
+                        self.dispatch(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.reconnects += 1
+                logger.warning("Task event subscription lost, reconnecting", error=str(e),
+                               retry_after=REDIS_RETRY_AFTER_SECONDS)
+                await asyncio.sleep(REDIS_RETRY_AFTER_SECONDS)
+            finally:
+                try:
+                    await pubsub.aclose()
+                    await client.aclose()
+                except Exception:
+                    pass
+
+    async def stop(self) -> None:
+        if self._reader is not None and not self._reader.done():
+            self._reader.cancel()
+            try:
+                await self._reader
+            except asyncio.CancelledError:
+                pass
+        self._reader = None
+
+    async def stream(self, task_id: str) -> AsyncIterator[Optional[Dict[str, Any]]]:
+        """The task's current state, then each change until it finishes.
+
+        Yields None every heartbeat seconds without news (for keep-alives)
+        and a TIMEOUT event after timeout seconds. Subscribes before reading
+        the current state so a change in between is not missed.
+        """
+        queue = self.subscribe(task_id)
+        try:
+            current = await asyncio.to_thread(task_state, task_id)
+            yield current
+            last = current["status"]
+            deadline = time.monotonic() + self.timeout
+            while last not in TERMINAL_STATES:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    yield {"task_id": task_id, "status": "TIMEOUT"}
+                    return
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=min(self.heartbeat, remaining))
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+                if event["status"] == last and event["status"] != "RETRY":
+                    continue
+                last = event["status"]
+                yield event
+        finally:
+            self.unsubscribe(task_id, queue)
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "subscribed_tasks": len(self._subscribers),
+            "subscribers": sum(len(queues) for queues in self._subscribers.values()),
+            "events_received": self.events_received,
+            "events_delivered": self.events_delivered,
+            "reconnects": self.reconnects,
+        }
+
+
+task_event_broker = TaskEventBroker()
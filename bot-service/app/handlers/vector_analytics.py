@@ -0,0 +1,263 @@
+import asyncio
+import time
+import weakref
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from dateutil.relativedelta import relativedelta
+from sqlalchemy import BigInteger, cast, func, select
+
+from app.core.config import VECTOR_ANALYTICS_MAX_USERS, VECTOR_ANALYTICS_TTL_SECONDS
+from app.core.db import AsyncSessionLocal
+from app.core.logging import get_logger
+from app.handlers.analytics_cache import analytics_cache
+from app.models.expense import Expense
+from app.repositories.analytics import AnalyticsSnapshot, CategorySnapshot
+
+logger = get_logger(__name__)
+
+PERCENTILES = (50, 90, 99)
+ROLLING_WINDOWS = (7, 30)
+LOAD_BATCH_SIZE = 50000
+
+
+class UserColumns:
+    """One user's expenses as parallel arrays sorted by added_at.
+
+    Amounts are int64 cents so sums are exact; categories are int32 codes
+    into `categories`. About 20 bytes per expense.
+    """
+
+    def __init__(self, added_at: np.ndarray, cents: np.ndarray, codes: np.ndarray,
+                 categories: List[str], version: Optional[int]):
+        self.added_at = added_at
+        self.cents = cents
+        self.codes = codes
+        self.categories = categories
+        self.category_codes = {category: code for code, category in enumerate(categories)}
+        self.version = version
+        self.loaded_at = time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self.cents)
+
+    @property
+    def nbytes(self) -> int:
+        return self.added_at.nbytes + self.cents.nbytes + self.codes.nbytes
+
+    def append(self, added_at: datetime, category: str, cents: int) -> None:
+        code = self.category_codes.get(category)
+        if code is None:
+            code = self.category_codes[category] = len(self.categories)
+            self.categories.append(category)
+        stamp = np.datetime64(added_at, "us")
+        # New expenses are almost always the latest, making this an append
+        position = int(np.searchsorted(self.added_at, stamp, side="right"))
+        self.added_at = np.insert(self.added_at, position, stamp)
+        self.cents = np.insert(self.cents, position, cents)
+        self.codes = np.insert(self.codes, position, code)
+
+    def window(self, start: date, end: date) -> slice:
+        """Index range of the expenses from start to the end of `end` (whole day).
+
+        The SQL engine's rule: start <= added_at < end + 1 day.
+        """
+        low = np.searchsorted(self.added_at, np.datetime64(start, "us"), side="left")
+        high = np.searchsorted(self.added_at, np.datetime64(end + timedelta(days=1), "us"), side="left")
+        return slice(int(low), int(high))
+
+
+def _bound(value: date, lowest: bool) -> date:
+    # numpy datetime64 can't hold date.min/date.max through a timedelta; clamp
+    if lowest:
+        return max(value, date(1970, 1, 1))
+    return min(value, date(9000, 12, 31))
+
+
+class VectorAnalyticsEngine:
+    """In-memory, NumPy-backed alternative to the SQL analytics path.
+
+    The first request for a user loads their (added_at, category, amount)
+    columns once; later requests only slice and reduce the arrays. Inserts
+    made through ExpenseRepository are appended in place, and the user's
+    analytics data version (bumped in Redis on every write, see
+    AnalyticsCache.invalidate) tells when another process changed the data,
+    in which case the columns are reloaded. Without Redis, columns are
+    reloaded after ttl seconds.
+    """
+
+    def __init__(self, max_users: int = VECTOR_ANALYTICS_MAX_USERS, ttl: float = VECTOR_ANALYTICS_TTL_SECONDS):
+        self.max_users = max_users
+        self.ttl = ttl
+        self._users: "OrderedDict[str, UserColumns]" = OrderedDict()
+        self._loading: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Future]]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self.loads = 0
+        self.hits = 0
+        self.appends = 0
+        self.evictions = 0
+
+    async def columns(self, user_id: str) -> UserColumns:
+        """The user's columns, loading or reloading them if stale."""
+        version = await analytics_cache.current_version(user_id)
+        cached = self._users.get(user_id)
+        if cached is not None and not self._is_stale(cached, version):
+            self._users.move_to_end(user_id)
+            self.hits += 1
+            return cached
+
+        loop = asyncio.get_running_loop()
+        loading = self._loading.setdefault(loop, {})
+        future = loading.get(user_id)
+        if future is None:
+            future = asyncio.ensure_future(self._load(user_id, version))
+            loading[user_id] = future
+            future.add_done_callback(lambda _: loading.pop(user_id, None))
+        return await asyncio.shield(future)
+
+    def _is_stale(self, columns: UserColumns, version: Optional[int]) -> bool:
+        if version is not None and columns.version is not None:
+            return version != columns.version
+        return time.monotonic() - columns.loaded_at > self.ttl
+
+    async def _load(self, user_id: str, version: Optional[int]) -> UserColumns:
+        started = time.perf_counter()
+        query = (
+            select(Expense.added_at, Expense.category, cast(func.round(Expense.amount * 100), BigInteger))
+            .where(Expense.user_id == user_id)
+            .order_by(Expense.added_at)
+            .execution_options(yield_per=LOAD_BATCH_SIZE)
+        )
+        added_at: List[datetime] = []
+        categories: List[str] = []
+        cents: List[int] = []
+        async with AsyncSessionLocal() as session:
+            result = await session.stream(query)
+            async for partition in result.partitions():
+                for stamp, category, amount in partition:
+                    added_at.append(stamp)
+                    categories.append(category)
+                    cents.append(amount)
+
+        names, codes = np.unique(np.array(categories, dtype=object), return_inverse=True)
+        columns = UserColumns(
+            added_at=np.array(added_at, dtype="datetime64[us]"),
+            cents=np.array(cents, dtype=np.int64),
+            codes=codes.astype(np.int32),
+            categories=[str(name) for name in names],
+            version=version,
+        )
+        self._users[user_id] = columns
+        self._users.move_to_end(user_id)
+        while len(self._users) > self.max_users:
+            self._users.popitem(last=False)
+            self.evictions += 1
+        self.loads += 1
+        logger.info("Vector analytics columns loaded", user_id=user_id, rows=len(columns),
+                    bytes=columns.nbytes, elapsed_ms=round((time.perf_counter() - started) * 1000, 1))
+        return columns
+
+    def record_insert(self, user_id: str, added_at: datetime, category: str,
+                      amount: Any, new_version: Optional[int]) -> None:
+        """Append a just-committed expense to the user's columns, if loaded.
+
+        new_version is what AnalyticsCache.invalidate returned; if it skipped
+        a version another process wrote too, so the columns are dropped.
+        """
+        columns = self._users.get(user_id)
+        if columns is None:
+            return
+        if new_version is not None and columns.version is not None and new_version != columns.version + 1:
+            self.discard(user_id)
+            return
+        columns.append(added_at, category, int((Decimal(str(amount)) * 100).to_integral_value()))
+        if new_version is not None:
+            columns.version = new_version
+        self.appends += 1
+
+    def discard(self, user_id: str) -> None:
+        """Forget a user's columns (after updates, deletes or bulk writes)."""
+        self._users.pop(user_id, None)
+
+    def clear(self) -> None:
+        self._users.clear()
+
+    async def get_analytics_snapshot(self, user_id: str, start_date: date, end_date: date,
+                                     current_month: Optional[date] = None) -> AnalyticsSnapshot:
+        """Same result as AnalyticsRepository.get_analytics_snapshot, from the arrays."""
+        columns = await self.columns(user_id)
+        selected = columns.window(_bound(start_date, True), _bound(end_date, False))
+        size = len(columns.categories)
+        totals = np.bincount(columns.codes[selected], weights=columns.cents[selected], minlength=size)
+        counts = np.bincount(columns.codes[selected], minlength=size)
+
+        categories = []
+        for code in np.flatnonzero(counts):
+            total = Decimal(int(round(totals[code]))) / 100
+            categories.append(CategorySnapshot(columns.categories[code], total, int(counts[code]), total / int(counts[code])))
+
+        current_total = previous_total = Decimal("0")
+        if current_month:
+            next_month = current_month + relativedelta(months=1)
+            previous_month = current_month - relativedelta(months=1)
+            current = columns.window(current_month, next_month - timedelta(days=1))
+            previous = columns.window(previous_month, current_month - timedelta(days=1))
+            current_total = Decimal(int(columns.cents[current].sum())) / 100
+            previous_total = Decimal(int(columns.cents[previous].sum())) / 100
+
+        return AnalyticsSnapshot(
+            categories=categories,
+            total=sum((c.total for c in categories), Decimal("0")),
+            current_month_total=current_total,
+            previous_month_total=previous_total,
+        )
+
+    async def get_distribution(self, user_id: str, start_date: date, end_date: date) -> Tuple[Dict[str, float], Dict[str, float]]:
+        """Percentiles of single expense amounts and rolling means of daily spend.
+
+        Rolling means are the average spend per day over the N days ending
+        at the last expense in the range (days without expenses count as zero).
+        """
+        columns = await self.columns(user_id)
+        start, end = _bound(start_date, True), _bound(end_date, False)
+        selected = columns.window(start, end)
+        cents = columns.cents[selected]
+        if not len(cents):
+            return {}, {}
+
+        percentiles = {
+            f"p{p}": round(float(value) / 100, 2)
+            for p, value in zip(PERCENTILES, np.percentile(cents, PERCENTILES))
+        }
+
+        # Daily totals over the longest window, ending at the last expense
+        last_day = columns.added_at[selected][-1].astype("datetime64[D]").item()
+        first_day = max(start, last_day - timedelta(days=max(ROLLING_WINDOWS) - 1))
+        days = columns.added_at[selected].astype("datetime64[D]")
+        in_window = days >= np.datetime64(first_day)
+        offsets = (days[in_window] - np.datetime64(first_day)).astype(np.int64)
+        daily = np.bincount(offsets, weights=cents[in_window], minlength=(last_day - first_day).days + 1)
+        rolling = {
+            f"{window}d": round(float(daily[-window:].sum()) / window / 100, 2)
+            for window in ROLLING_WINDOWS
+            if len(daily) >= window
+        }
+        return percentiles, rolling
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "users": len(self._users),
+            "rows": sum(len(c) for c in self._users.values()),
+            "bytes": sum(c.nbytes for c in self._users.values()),
+            "loads": self.loads,
+            "hits": self.hits,
+            "appends": self.appends,
+            "evictions": self.evictions,
+        }
+
+
+vector_analytics = VectorAnalyticsEngine()
@@ -1,19 +1,24 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
-import asyncio
-from sqlalchemy import text
 
 from app.core.db import engine
+from app.core.migrations import run_migrations
+from app.core.redis_client import close_redis, init_redis
+from app.handlers.health_monitor import health_monitor
+from app.handlers.task_events import task_event_broker
 from app.routes import expense, analytics, health
-from app.models.base import Base
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+    await run_migrations(engine)
+    await init_redis()
+    health_monitor.start()
     yield
+    await health_monitor.stop()
+    await task_event_broker.stop()
+    await close_redis()
     await engine.dispose()
 
 
@@ -31,6 +36,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 app.include_router(health.router, prefix="/health", tags=["health"])
@@ -45,9 +51,7 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    try:
-        async with engine.begin() as conn:
-            await conn.execute(text("SELECT 1"))
+    database = (await health_monitor.current(["database"]))["checks"]["database"]
+    if database == "healthy":
         return {"status": "healthy", "database": "connected"}
-    except Exception as e:
-        return {"status": "unhealthy", "error": str(e)}
+    return {"status": "unhealthy", "error": database}
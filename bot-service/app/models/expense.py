@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, TIMESTAMP, Numeric
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, TIMESTAMP, Numeric, Index
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import declarative_base
 from app.models.base import Base
@@ -6,6 +6,17 @@ from app.models.base import Base
 
 class Expense(Base):
     __tablename__ = "expenses"
+    __table_args__ = (
+        # Listing and range filters: WHERE user_id = ? AND added_at BETWEEN ...
+        Index("ix_expenses_user_added_at", "user_id", "added_at"),
+        # Covers the analytics aggregates so they never touch the table
+        Index("ix_expenses_user_added_at_category_amount", "user_id", "added_at", "category", "amount"),
+        # Keyset pagination over every user's expenses: ORDER BY added_at, id
+        Index("ix_expenses_added_at_id", "added_at", "id"),
+        # Per-user listing filtered by category, or sorted by amount
+        Index("ix_expenses_user_category_added_at", "user_id", "category", "added_at"),
+        Index("ix_expenses_user_amount", "user_id", "amount"),
+    )
     id = Column(Integer, primary_key=True)
     user_id = Column(String, ForeignKey("users.id"), nullable=False)
     description = Column(Text, nullable=False, unique=False)
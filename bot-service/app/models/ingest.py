@@ -0,0 +1,29 @@
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, TIMESTAMP, UniqueConstraint
+from app.models.base import Base
+
+INGEST_PENDING = "pending"
+INGEST_PROCESSING = "processing"
+INGEST_DONE = "done"
+INGEST_FAILED = "failed"
+
+
+class IngestMessage(Base):
+    """Raw Telegram message accepted for background categorization."""
+    __tablename__ = "ingest_messages"
+    __table_args__ = (
+        UniqueConstraint("telegram_id", "telegram_message_id", name="uq_ingest_messages_telegram_message"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    telegram_id = Column(String, nullable=False)
+    telegram_message_id = Column(String, nullable=False)
+    text = Column(Text, nullable=False)
+    received_at = Column(TIMESTAMP, nullable=False)
+    status = Column(String, nullable=False, default=INGEST_PENDING)
+    expense_id = Column(Integer, ForeignKey("expenses.id"), nullable=True)
+    # Telegram chat to notify through the configured connector callback
+    chat_id = Column(String, nullable=True)
+    error = Column(Text, nullable=True)
+    # Start of the current worker's lease while processing
+    claimed_at = Column(TIMESTAMP, nullable=True)
+    processed_at = Column(TIMESTAMP, nullable=True)
@@ -0,0 +1,13 @@
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, Date, Numeric
+from app.models.base import Base
+
+
+class ExpenseRollup(Base):
+    """Per-user, per-day, per-category totals maintained alongside expenses."""
+    __tablename__ = "expense_rollups"
+
+    user_id = Column(String, ForeignKey("users.id"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    category = Column(Text, primary_key=True)
+    total = Column(Numeric(14, 2), nullable=False, default=0)
+    count = Column(Integer, nullable=False, default=0)
@@ -1,20 +1,239 @@
-from sqlalchemy import func, select, extract
+from sqlalchemy import Date, cast, func, select, extract, case, and_, or_, literal_column, true
 from app.models.expense import Expense
-from datetime import date, datetime
-from app.core.db import get_new_async_session
+from app.models.rollup import ExpenseRollup
+from app.models.user import User
+from datetime import date, datetime, timedelta
+from dateutil.relativedelta import relativedelta
+from app.core.db import AsyncSessionLocal
+from app.core.config import ANALYTICS_USE_ROLLUPS
 from app.core.logging import get_logger
-from typing import List, Tuple, Optional
+from typing import Dict, List, NamedTuple, Sequence, Tuple, Optional, Union
 from decimal import Decimal
 
 logger = get_logger(__name__)
 
+# A single user id, or a list of them for the bulk (grouped by user) variants
+UserScope = Union[str, Sequence[str]]
+
+
+class CategorySnapshot(NamedTuple):
+    category: str
+    total: Decimal
+    count: int
+    average: Decimal
+
+
+class AnalyticsSnapshot(NamedTuple):
+    categories: List[CategorySnapshot]
+    total: Decimal
+    current_month_total: Decimal
+    previous_month_total: Decimal
+
+
+def snapshot_from_rows(rows, current_month: Optional[date] = None) -> AnalyticsSnapshot:
+    """Fold the per-category rows of a snapshot query into an AnalyticsSnapshot."""
+    categories = [
+        CategorySnapshot(row.category, row.total, row.count, row.total / row.count)
+        for row in rows if row.count
+    ]
+    current_total = previous_total = Decimal('0')
+    if current_month:
+        current_total = sum((row.current_month or Decimal('0') for row in rows), Decimal('0'))
+        previous_total = sum((row.previous_month or Decimal('0') for row in rows), Decimal('0'))
+    return AnalyticsSnapshot(
+        categories=categories,
+        total=sum((c.total for c in categories), Decimal('0')),
+        current_month_total=current_total,
+        previous_month_total=previous_total,
+    )
+
+
+def variation_percentage(current_total: Optional[Decimal], prev_total: Optional[Decimal]) -> float:
+    """Percentage change from prev_total to current_total (0.0 without a baseline)."""
+    if not prev_total or prev_total == 0:
+        return 0.0
+    return float((((current_total or Decimal('0')) - prev_total) / prev_total) * 100)
+
+
+def _user_scope(column, user_id: UserScope):
+    """WHERE clause and extra GROUP BY columns for one user or a list of users."""
+    if isinstance(user_id, str):
+        return column == user_id, []
+    return column.in_(user_id), [column]
+
+
+def _until_end_of(column, end_date: date):
+    """column is on or before end_date, the whole day included (added_at is a
+    timestamp, so <= end_date would stop at its midnight)."""
+    if end_date == date.max:
+        return true()
+    return column < end_date + timedelta(days=1)
+
+
+def analytics_snapshot_query(user_id: UserScope, start_date: date, end_date: date, current_month: Optional[date] = None):
+    """SELECT behind AnalyticsRepository.get_analytics_snapshot.
+
+    current_month must be the first day of end_date's month (or None). Given
+    a list of user ids, rows are also grouped (and labelled) by user_id.
+    """
+    in_range = and_(Expense.added_at >= start_date, _until_end_of(Expense.added_at, end_date))
+    scope = in_range
+    columns = [
+        Expense.category,
+        func.sum(case((in_range, Expense.amount))).label("total"),
+        func.count(case((in_range, 1))).label("count"),
+    ]
+    if current_month:
+        previous_month = current_month - relativedelta(months=1)
+        next_month = current_month + relativedelta(months=1)
+        in_current = and_(Expense.added_at >= current_month, Expense.added_at < next_month)
+        in_previous = and_(Expense.added_at >= previous_month, Expense.added_at < current_month)
+        # The month windows end at end_date's month, so range and windows form
+        # one contiguous span: a single index range scan on (user_id, added_at)
+        scope = and_(
+            Expense.added_at >= min(start_date, previous_month),
+            or_(_until_end_of(Expense.added_at, end_date), Expense.added_at < next_month),
+        )
+        columns += [
+            func.sum(case((in_current, Expense.amount))).label("current_month"),
+            func.sum(case((in_previous, Expense.amount))).label("previous_month"),
+        ]
+
+    users, per_user = _user_scope(Expense.user_id, user_id)
+    return (
+        select(*per_user, *columns)
+        .where(users, scope)
+        .group_by(*per_user, Expense.category)
+    )
+
+
+def rollup_snapshot_query(user_id: UserScope, start_date: date, end_date: date, current_month: Optional[date] = None):
+    """Same result shape as analytics_snapshot_query, read from expense_rollups.
+
+    Reads one row per (day, category) instead of one per expense. Ranges are
+    whole days, so end_date is fully included.
+    """
+    in_range = and_(ExpenseRollup.day >= start_date, ExpenseRollup.day <= end_date)
+    scope = in_range
+    columns = [
+        ExpenseRollup.category,
+        func.sum(case((in_range, ExpenseRollup.total))).label("total"),
+        func.sum(case((in_range, ExpenseRollup.count), else_=0)).label("count"),
+    ]
+    if current_month:
+        previous_month = current_month - relativedelta(months=1)
+        next_month = current_month + relativedelta(months=1)
+        in_current = and_(ExpenseRollup.day >= current_month, ExpenseRollup.day < next_month)
+        in_previous = and_(ExpenseRollup.day >= previous_month, ExpenseRollup.day < current_month)
+        scope = and_(
+            ExpenseRollup.day >= min(start_date, previous_month),
+            or_(ExpenseRollup.day <= end_date, ExpenseRollup.day < next_month),
+        )
+        columns += [
+            func.sum(case((in_current, ExpenseRollup.total))).label("current_month"),
+            func.sum(case((in_previous, ExpenseRollup.total))).label("previous_month"),
+        ]
+
+    users, per_user = _user_scope(ExpenseRollup.user_id, user_id)
+    return (
+        select(*per_user, *columns)
+        .where(users, scope)
+        .group_by(*per_user, ExpenseRollup.category)
+    )
+
+
+GRANULARITIES = ("day", "week", "month")
+
+
+class PeriodTotal(NamedTuple):
+    period: date
+    category: str
+    total: Decimal
+    count: int
+
+
+def truncate_date(value: date, granularity: str) -> date:
+    """Python counterpart of period_start: first day of value's period (weeks start on Monday)."""
+    if granularity == "month":
+        return value.replace(day=1)
+    if granularity == "week":
+        return value - timedelta(days=value.weekday())
+    return value
+
+
+def next_period(value: date, granularity: str) -> date:
+    if granularity == "month":
+        return value + relativedelta(months=1)
+    if granularity == "week":
+        return value + timedelta(weeks=1)
+    return value + timedelta(days=1)
+
+
+def period_start(column, granularity: str, dialect: str):
+    """SQL expression for the first day of column's day/week/month.
+
+    PostgreSQL has date_trunc (cast to date, it returns a timestamp); SQLite
+    gets the same buckets from date() modifiers ('weekday 0' moves to
+    Sunday, so -6 days is that week's Monday).
+    """
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"Unsupported granularity: {granularity}")
+    if dialect == "sqlite":
+        if granularity == "month":
+            return func.date(column, "start of month")
+        if granularity == "week":
+            return func.date(column, "weekday 0", "-6 days")
+        return func.date(column)
+    # Inlined (granularity is validated) so SELECT and GROUP BY are the same expression
+    return cast(func.date_trunc(literal_column(f"'{granularity}'"), column), Date)
+
+
+def time_series_query(user_id: str, start_date: date, end_date: date, granularity: str,
+                      dialect: str, use_rollups: bool = False):
+    """SELECT of (period, category, total, count) for every period touching the range.
+
+    end_date is included whole. With use_rollups the buckets are built from
+    expense_rollups' days instead of individual expenses.
+    """
+    if use_rollups:
+        period = period_start(ExpenseRollup.day, granularity, dialect).label("period")
+        return (
+            select(period, ExpenseRollup.category,
+                   func.sum(ExpenseRollup.total).label("total"), func.sum(ExpenseRollup.count).label("count"))
+            .where(ExpenseRollup.user_id == user_id, ExpenseRollup.day >= start_date, ExpenseRollup.day <= end_date)
+            .group_by(period, ExpenseRollup.category)
+            .order_by(period, ExpenseRollup.category)
+        )
+    period = period_start(Expense.added_at, granularity, dialect).label("period")
+    return (
+        select(period, Expense.category, func.sum(Expense.amount).label("total"), func.count().label("count"))
+        .where(
+            Expense.user_id == user_id,
+            Expense.added_at >= start_date,
+            _until_end_of(Expense.added_at, end_date),
+        )
+        .group_by(period, Expense.category)
+        .order_by(period, Expense.category)
+    )
+
+
+def _as_date(value) -> date:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, str):
+        return date.fromisoformat(value[:10])
+    return value
+
+
 class AnalyticsRepository:
+    def __init__(self, use_rollups: bool = ANALYTICS_USE_ROLLUPS):
+        self.use_rollups = use_rollups
+
     async def get_expenses_summary(self, user_id: str, start_date: date, end_date: date) -> List[Tuple[str, Decimal]]:
         """Get expense summary by category for a user within date range"""
         logger.info("Getting expenses summary", user_id=user_id, start_date=start_date, end_date=end_date)
         
         try:
-            AsyncSessionLocal = get_new_async_session()
             async with AsyncSessionLocal() as session:
                 query = (
                     select(Expense.category, func.sum(Expense.amount).label("total"))
@@ -22,7 +241,7 @@ class AnalyticsRepository:
                         
                         Expense.user_id == user_id,
                         Expense.added_at >= start_date,
-                        Expense.added_at <= end_date
+                        _until_end_of(Expense.added_at, end_date)
                     )
                     .group_by(Expense.category)
                 )
@@ -41,14 +260,13 @@ class AnalyticsRepository:
         logger.info("Getting total expenses", user_id=user_id, start_date=start_date, end_date=end_date)
         
         try:
-            AsyncSessionLocal = get_new_async_session()
             async with AsyncSessionLocal() as session:
                 query = (
                     select(func.sum(Expense.amount))
                     .where(
                         Expense.user_id == user_id,
                         Expense.added_at >= start_date,
-                        Expense.added_at <= end_date
+                        _until_end_of(Expense.added_at, end_date)
                     )
                 )
                 result = await session.execute(query)
@@ -66,20 +284,19 @@ class AnalyticsRepository:
         logger.info("Calculating monthly variation", user_id=user_id, current_month=current_month, previous_month=previous_month)
         
         try:
-            # Get current month total
-            current_total = await self.get_total_expenses(user_id, current_month, current_month.replace(day=28))
-            
-            # Get previous month total  
-            prev_total = await self.get_total_expenses(user_id, previous_month, previous_month.replace(day=28))
-            
+            # Both whole months come out of one time series query
+            current_month, previous_month = current_month.replace(day=1), previous_month.replace(day=1)
+            last_day = next_period(max(current_month, previous_month), "month") - timedelta(days=1)
+            totals: Dict[date, Decimal] = {}
+            for row in await self.get_time_series(user_id, min(current_month, previous_month), last_day, "month"):
+                totals[row.period] = totals.get(row.period, Decimal('0')) + row.total
+
+            prev_total = totals.get(previous_month)
             if not prev_total or prev_total == 0:
                 logger.info("No previous month data for variation calculation")
                 return 0.0
                 
-            if not current_total:
-                current_total = Decimal('0')
-                
-            variation = float(((current_total - prev_total) / prev_total) * 100)
+            variation = variation_percentage(totals.get(current_month), prev_total)
             
             logger.info("Monthly variation calculated", variation=variation)
             return variation
@@ -93,7 +310,6 @@ class AnalyticsRepository:
         logger.info("Getting average by category", user_id=user_id, start_date=start_date, end_date=end_date)
         
         try:
-            AsyncSessionLocal = get_new_async_session()
             async with AsyncSessionLocal() as session:
                 query = (
                     select(
@@ -103,7 +319,7 @@ class AnalyticsRepository:
                     .where(
                         Expense.user_id == user_id,
                         Expense.added_at >= start_date,
-                        Expense.added_at <= end_date
+                        _until_end_of(Expense.added_at, end_date)
                     )
                     .group_by(Expense.category)
                 )
@@ -116,3 +332,84 @@ class AnalyticsRepository:
         except Exception as e:
             logger.error("Error getting average by category", error=str(e), user_id=user_id)
             raise
+
+    async def get_analytics_snapshot(self, user_id: str, start_date: date, end_date: date,
+                                     current_month: Optional[date] = None) -> AnalyticsSnapshot:
+        """Category sums, counts and averages, the grand total and the totals of
+        current_month and the month before it, in a single query.
+
+        Rows are read once: the date range and both month windows are
+        conditional aggregates over the same scan, grouped by category. With
+        use_rollups the scan is over expense_rollups rather than expenses.
+        """
+        logger.info("Getting analytics snapshot", user_id=user_id, start_date=start_date,
+                    end_date=end_date, current_month=current_month, use_rollups=self.use_rollups)
+
+        try:
+            build_query = rollup_snapshot_query if self.use_rollups else analytics_snapshot_query
+            query = build_query(user_id, start_date, end_date, current_month)
+            async with AsyncSessionLocal() as session:
+                rows = (await session.execute(query)).all()
+
+            snapshot = snapshot_from_rows(rows, current_month)
+            logger.info("Analytics snapshot retrieved", categories_count=len(snapshot.categories),
+                        total=float(snapshot.total))
+            return snapshot
+
+        except Exception as e:
+            logger.error("Error getting analytics snapshot", error=str(e), user_id=user_id)
+            raise
+
+    async def get_analytics_snapshots(self, user_ids: Sequence[str], start_date: date, end_date: date,
+                                      current_month: Optional[date] = None) -> Dict[str, AnalyticsSnapshot]:
+        """get_analytics_snapshot for many users with one query grouped by (user_id, category).
+
+        Every requested user gets a snapshot, empty if they have no expenses.
+        """
+        logger.info("Getting analytics snapshots", users=len(user_ids), start_date=start_date,
+                    end_date=end_date, current_month=current_month, use_rollups=self.use_rollups)
+
+        try:
+            build_query = rollup_snapshot_query if self.use_rollups else analytics_snapshot_query
+            by_user: Dict[str, list] = {user_id: [] for user_id in user_ids}
+            async with AsyncSessionLocal() as session:
+                for row in (await session.execute(build_query(list(user_ids), start_date, end_date, current_month))):
+                    by_user[row.user_id].append(row)
+
+            snapshots = {user_id: snapshot_from_rows(rows, current_month) for user_id, rows in by_user.items()}
+            logger.info("Analytics snapshots retrieved", users=len(snapshots))
+            return snapshots
+
+        except Exception as e:
+            logger.error("Error getting analytics snapshots", error=str(e), users=len(user_ids))
+            raise
+
+    async def get_user_ids(self) -> List[str]:
+        """Ids of every user, for analytics over the whole user base."""
+        async with AsyncSessionLocal() as session:
+            return list((await session.execute(select(User.id).order_by(User.id))).scalars())
+
+    async def get_time_series(self, user_id: str, start_date: date, end_date: date,
+                              granularity: str = "month") -> List[PeriodTotal]:
+        """Totals and counts per (period, category) in one GROUP BY query.
+
+        Only periods with expenses are returned; filling the gaps is left to
+        the caller. Periods are the first day of each day/week/month.
+        """
+        logger.info("Getting time series", user_id=user_id, start_date=start_date, end_date=end_date,
+                    granularity=granularity, use_rollups=self.use_rollups)
+
+        try:
+            async with AsyncSessionLocal() as session:
+                query = time_series_query(
+                    user_id, start_date, end_date, granularity, session.bind.dialect.name, self.use_rollups
+                )
+                rows = (await session.execute(query)).all()
+
+            series = [PeriodTotal(_as_date(row.period), row.category, row.total, int(row.count)) for row in rows]
+            logger.info("Time series retrieved", rows=len(series))
+            return series
+
+        except Exception as e:
+            logger.error("Error getting time series", error=str(e), user_id=user_id)
+            raise
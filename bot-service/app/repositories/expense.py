@@ -1,101 +1,301 @@
 from app.core.db import AsyncSessionLocal
 from app.models.user import User
 from app.models.expense import Expense
+from app.models.ingest import IngestMessage, INGEST_PROCESSING, INGEST_DONE
+from app.repositories.rollup import RollupRepository
 from app.handlers.langchain_handler import categorize_expense
-from sqlalchemy import select
+from app.handlers.analytics_cache import analytics_cache
+from app.handlers.vector_analytics import vector_analytics
+from app.schemas.expense import ExpenseResponse, ExpenseSort
+from app.core.pagination import InvalidCursorError, encode_cursor, decode_cursor
+from sqlalchemy import insert, select, update, tuple_
+from sqlalchemy.dialects import postgresql, sqlite
+from decimal import Decimal
+from sqlalchemy.exc import IntegrityError
 from datetime import datetime
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Set, Tuple
 from app.core.logging import get_logger
+from app.core.config import IMPORT_USE_COPY
 
 logger = get_logger(__name__)
 
+def expense_response_query():
+    """Expenses joined with their user, projected onto ExpenseResponse's fields."""
+    return (
+        select(
+            Expense.id,
+            Expense.user_id,
+            Expense.description,
+            Expense.amount,
+            Expense.category,
+            Expense.added_at,
+            User.telegram_id,
+        )
+        .join(User, User.id == Expense.user_id)
+    )
+
+def to_expense_response(row) -> ExpenseResponse:
+    return ExpenseResponse(**row._mapping)
+
+# sort name -> (sort column, descending); ties are broken by id in the same direction
+EXPENSE_SORTS = {
+    "date_asc": (Expense.added_at, False),
+    "date_desc": (Expense.added_at, True),
+    "amount_asc": (Expense.amount, False),
+    "amount_desc": (Expense.amount, True),
+}
+
+def encode_expense_cursor(sort: ExpenseSort, value, expense_id: int) -> str:
+    """Cursor pointing just after the row with this sort value and id."""
+    return encode_cursor([sort, value, expense_id])
+
+def decode_expense_cursor(cursor: str, sort: ExpenseSort):
+    cursor_sort, value, expense_id = decode_cursor(cursor, 3)
+    if cursor_sort != sort:
+        raise InvalidCursorError(f"Cursor was issued for sort={cursor_sort}, not {sort}")
+    return value, expense_id
+
+_INSERT_DIALECTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+EXPENSE_COPY_COLUMNS = ("user_id", "description", "amount", "category", "added_at")
+
 class ExpenseRepository:
-    def __init__(self):
-        pass
+    def __init__(self, use_copy: bool = IMPORT_USE_COPY):
+        self.rollups = RollupRepository()
+        self.use_copy = use_copy
 
     async def add_expense(self, user_id: int, description: str, amount: float, category: str, telegram_id: str, text: str):
         try:
-            async with AsyncSessionLocal() as session:
-                result = await session.execute(select(User).where(User.telegram_id == telegram_id))
-                user = result.scalar_one_or_none()
-                logger.info("Looking for user with telegram_id:", telegram_id=telegram_id)
-                if not user:
-                    logger.info("❌ User not found, creating new user")
-                    user = User(id=telegram_id, telegram_id=telegram_id)
-                    session.add(user)
-                    await session.commit()
-                    await session.refresh(user)
-                logger.info("User found:", user=user.id, telegram_id=user.telegram_id)
-                logger.info("Text to categorize", text=text)
-                parsed = await categorize_expense(text)
-                if not parsed or len(parsed) != 3:
-                    return None
-                logger.info("Parsed expense:", text=parsed)
-                category, amount, description = parsed
-
-                expense = Expense(
-                    user_id=user.id,
-                    description=description,
-                    amount=amount,
-                    category=category,
-                    added_at=datetime.utcnow()
-                )
-
-                session.add(expense)
-                logger.info("Committing expense to DB", expense=expense)
-                await session.commit()
+            # Categorize before touching the database so a slow model never
+            # holds a pooled connection.
+            logger.info("Text to categorize", text=text)
+            parsed = await categorize_expense(text)
+            if not parsed or len(parsed) != 3:
+                return None
+            logger.info("Parsed expense:", text=parsed)
+            category, amount, description = parsed
+
+            return await self.insert_categorized_expense(telegram_id, description, amount, category, datetime.utcnow())
+
+        except Exception as e:
+            logger.exception("Error adding expense", error=str(e), telegram_id=telegram_id)
+            return None
+
+    async def insert_categorized_expense(self, telegram_id: str, description: str, amount: float, category: str,
+                                         added_at: datetime, ingest_id: int = None,
+                                         ingest_claimed_at: datetime = None):
+        """Upsert the user and insert the expense in one short transaction.
+
+        When ingest_id is given the ingest message is marked done in the same
+        transaction, so a retried worker can never insert the expense twice.
+        With ingest_claimed_at only while that claim still holds the message,
+        so a worker whose lease expired and was reclaimed can't either.
+        """
+        for attempt in range(2):
+            try:
+                async with AsyncSessionLocal() as session:
+                    async with session.begin():
+                        user = await self._get_or_create_user(session, telegram_id)
+                        expense = Expense(
+                            user_id=user.id,
+                            description=description,
+                            amount=amount,
+                            category=category,
+                            added_at=added_at
+                        )
+                        session.add(expense)
+                        await self.rollups.apply(session, user.id, added_at, category, amount, 1)
+                        if ingest_id is not None:
+                            await session.flush()
+                            await self._complete_ingest(session, ingest_id, expense.id, ingest_claimed_at)
+                        logger.info("Committing expense to DB", expense=expense)
                 logger.info("Expense committed to DB", expense=expense)
-                await session.refresh(expense)
+                version = await analytics_cache.invalidate(user.id)
+                vector_analytics.record_insert(user.id, added_at, category, amount, version)
                 expense.telegram_id = user.telegram_id
                 return expense
+            except IntegrityError:
+                # A concurrent request created the same user; retry so the
+                # second attempt finds it.
+                if attempt:
+                    raise
+                logger.info("User created concurrently, retrying insert", telegram_id=telegram_id)
 
-        except Exception as e:
-            import traceback
-            traceback.print_exc()
-            return None
-        
-    async def get_expenses(self, user_id: str, skip: int = 0, limit: int = 10):
+    async def bulk_insert_expenses(self, rows: List[Dict[str, Any]]) -> Set[str]:
+        """Insert already categorized expenses in one transaction.
+
+        rows are dicts with telegram_id, description, amount, category and
+        added_at. Users are created in bulk, expenses go through COPY on
+        asyncpg (executemany elsewhere) and rollups are upserted once per
+        (user, day, category). Returns the ids of the users touched.
+        """
         async with AsyncSessionLocal() as session:
-            result = await session.execute(select(User).where(User.id == user_id))
-            user = result.scalar_one_or_none()
-            if not user:
-                logger.warning(f"Unauthorized access attempt by user_id={user_id}")
-                return {"message": "Unauthorized"}
+            async with session.begin():
+                user_ids = await self._get_or_create_users(session, {row["telegram_id"] for row in rows})
+                expenses = [
+                    {
+                        "user_id": user_ids[row["telegram_id"]],
+                        "description": row["description"],
+                        "amount": row["amount"],
+                        "category": row["category"],
+                        "added_at": row["added_at"],
+                    }
+                    for row in rows
+                ]
+                if self.use_copy and session.bind.dialect.driver == "asyncpg":
+                    await self._copy_expenses(session, expenses)
+                else:
+                    await session.execute(insert(Expense), expenses)
+                await self.rollups.apply_many(session, expenses)
 
-            query = select(Expense).where(Expense.user_id == user.id).offset(skip).limit(limit)
-            expenses = await session.execute(query)
-            return expenses.scalars().all()
+        touched = set(user_ids.values())
+        logger.info("Expenses bulk inserted", rows=len(expenses), users=len(touched))
+        for user_id in touched:
+            await analytics_cache.invalidate(user_id)
+            vector_analytics.discard(user_id)
+        return touched
+
+    async def _copy_expenses(self, session, expenses: List[Dict[str, Any]]) -> None:
+        # COPY through the session's own connection, inside its transaction
+        connection = await session.connection()
+        raw = await connection.get_raw_connection()
+        await raw.driver_connection.copy_records_to_table(
+            Expense.__tablename__,
+            records=[tuple(expense[column] for column in EXPENSE_COPY_COLUMNS) for expense in expenses],
+            columns=EXPENSE_COPY_COLUMNS,
+        )
+
+    async def _get_or_create_users(self, session, telegram_ids: Iterable[str]) -> Dict[str, str]:
+        """Map telegram_id -> user id, creating the missing users in one statement."""
+        telegram_ids = set(telegram_ids)
+        query = select(User.telegram_id, User.id).where(User.telegram_id.in_(telegram_ids))
+        user_ids = dict((await session.execute(query)).all())
+        missing = telegram_ids - user_ids.keys()
+        if missing:
+            logger.info("Creating users for bulk insert", count=len(missing))
+            insert_users = _INSERT_DIALECTS.get(session.bind.dialect.name, postgresql.insert)
+            await session.execute(
+                insert_users(User).on_conflict_do_nothing(),
+                [{"id": telegram_id, "telegram_id": telegram_id} for telegram_id in missing],
+            )
+            query = select(User.telegram_id, User.id).where(User.telegram_id.in_(missing))
+            user_ids.update((await session.execute(query)).all())
+        return user_ids
+
+    async def _complete_ingest(self, session, ingest_id: int, expense_id: int, claimed_at: datetime = None) -> None:
+        conditions = [IngestMessage.id == ingest_id, IngestMessage.status == INGEST_PROCESSING]
+        if claimed_at is not None:
+            conditions.append(IngestMessage.claimed_at == claimed_at)
+        result = await session.execute(
+            update(IngestMessage)
+            .where(*conditions)
+            .values(status=INGEST_DONE, expense_id=expense_id, processed_at=datetime.utcnow())
+        )
+        if result.rowcount != 1:
+            raise RuntimeError(f"Ingest message {ingest_id} is not being processed")
+
+    async def _get_or_create_user(self, session, telegram_id: str) -> User:
+        result = await session.execute(select(User).where(User.telegram_id == telegram_id))
+        user = result.scalar_one_or_none()
+        logger.info("Looking for user with telegram_id:", telegram_id=telegram_id)
+        if not user:
+            logger.info("❌ User not found, creating new user")
+            user = User(id=telegram_id, telegram_id=telegram_id)
+            session.add(user)
+            await session.flush()
+        logger.info("User found:", user=user.id, telegram_id=user.telegram_id)
+        return user
+
+    async def get_expenses(self, user_id: str, skip: int = 0, limit: int = 10) -> List[ExpenseResponse]:
+        expenses, _ = await self.list_expenses(limit=limit, skip=skip, user_id=user_id)
+        return expenses
+
+    async def get_all_expenses(self, skip=0, limit=100) -> List[ExpenseResponse]:
+        expenses, _ = await self.list_expenses(limit=limit, skip=skip)
+        return expenses
+
+    async def list_expenses(self, limit: int = 100, cursor: Optional[str] = None, skip: int = 0,
+                            user_id: Optional[str] = None, start_date: Optional[datetime] = None,
+                            end_date: Optional[datetime] = None, category: Optional[str] = None,
+                            min_amount: Optional[Decimal] = None, max_amount: Optional[Decimal] = None,
+                            sort: ExpenseSort = "date_asc") -> Tuple[List[ExpenseResponse], Optional[str]]:
+        """One page of expenses in `sort` order (ties by id), plus the cursor of the next page.
+
+        Every filter is applied in SQL. With a cursor the page starts right
+        after the row it encodes (keyset pagination); skip is only honoured
+        without one. The next cursor is None on the last page.
+        """
+        column, descending = EXPENSE_SORTS[sort]
+        query = expense_response_query()
+        if user_id is not None:
+            query = query.where(Expense.user_id == user_id)
+        if start_date is not None:
+            query = query.where(Expense.added_at >= start_date)
+        if end_date is not None:
+            query = query.where(Expense.added_at <= end_date)
+        if category is not None:
+            query = query.where(Expense.category == category)
+        if min_amount is not None:
+            query = query.where(Expense.amount >= min_amount)
+        if max_amount is not None:
+            query = query.where(Expense.amount <= max_amount)
+        if cursor:
+            value, expense_id = decode_expense_cursor(cursor, sort)
+            key, after = tuple_(column, Expense.id), tuple_(value, expense_id)
+            query = query.where(key < after if descending else key > after)
+        elif skip:
+            query = query.offset(skip)
+        if descending:
+            query = query.order_by(column.desc(), Expense.id.desc())
+        else:
+            query = query.order_by(column, Expense.id)
+        query = query.limit(limit + 1)
 
-    async def get_all_expenses(self, skip=0, limit=100):
         async with AsyncSessionLocal() as session:
-            logger.info(f"Fetching all expenses with skip={skip} and limit={limit}")
-            query = select(Expense).offset(skip).limit(limit)
-            expenses = await session.execute(query)
-            return expenses.scalars().all()
+            logger.info("Listing expenses", limit=limit, skip=skip, cursor=cursor, user_id=user_id, sort=sort)
+            rows = (await session.execute(query)).all()
+
+        expenses = [to_expense_response(row) for row in rows[:limit]]
+        next_cursor = None
+        if len(rows) > limit:
+            last = rows[limit - 1]
+            next_cursor = encode_expense_cursor(sort, getattr(last, column.key), last.id)
+        return expenses, next_cursor
         
-    async def get_expense_by_id(self, expense_id: int):
+    async def stream_expenses(self, user_id: Optional[str] = None, start_date: Optional[datetime] = None,
+                              end_date: Optional[datetime] = None, category: Optional[str] = None,
+                              batch_size: int = 1000) -> AsyncIterator[List[Any]]:
+        """Yield expense rows (expense_response_query's columns) in batches of batch_size.
+
+        Rows come from a server-side cursor, ordered by (added_at, id), so
+        memory stays bounded by one batch however many rows match. The
+        connection is held until the iteration finishes or is closed.
+        """
+        query = expense_response_query()
+        if user_id is not None:
+            query = query.where(Expense.user_id == user_id)
+        if start_date is not None:
+            query = query.where(Expense.added_at >= start_date)
+        if end_date is not None:
+            query = query.where(Expense.added_at <= end_date)
+        if category is not None:
+            query = query.where(Expense.category == category)
+        query = query.order_by(Expense.added_at, Expense.id).execution_options(yield_per=batch_size)
+
         async with AsyncSessionLocal() as session:
-            logger.info(f"Fetching expense by ID: {expense_id}")
-            result = await session.execute(select(Expense).where(Expense.id == expense_id))
-            expense = result.scalar_one_or_none()
+            logger.info("Streaming expenses", user_id=user_id, batch_size=batch_size)
+            result = await session.stream(query)
+            async for partition in result.partitions():
+                yield partition
 
-            if not expense:
-                return {"message": "Expense not found"}
-
-            # Buscar el usuario y agregar telegram_id
-            user_result = await session.execute(select(User).where(User.id == expense.user_id))
-            user = user_result.scalar_one_or_none()
-            expense_dict = {
-                "id": expense.id,
-                "user_id": expense.user_id,
-                "description": expense.description,
-                "amount": expense.amount,
-                "category": expense.category,
-                "added_at": expense.added_at,
-                "telegram_id": user.telegram_id if user else None
-            }
-            return expense_dict
+    async def get_expense_by_id(self, expense_id: int) -> Optional[ExpenseResponse]:
+        async with AsyncSessionLocal() as session:
+            logger.info(f"Fetching expense by ID: {expense_id}")
+            result = await session.execute(expense_response_query().where(Expense.id == expense_id))
+            row = result.one_or_none()
+            return to_expense_response(row) if row else None
         
-    async def delete_expense(self, expense_id: int):
+    async def delete_expense(self, expense_id: int) -> bool:
         async with AsyncSessionLocal() as session:
             logger.info("Deleting expense with ID:", expense_id=expense_id)
             result = await session.execute(select(Expense).where(Expense.id == expense_id))
@@ -103,23 +303,33 @@ class ExpenseRepository:
 
             if not expense:
                 logger.warning("Attempted to delete non-existent expense", expense_id=expense_id)
-                return {"message": "Expense not found"}
+                return False
 
             await session.delete(expense)
+            await self.rollups.apply(session, expense.user_id, expense.added_at, expense.category, -expense.amount, -1)
             logger.info("Expense deleted successfully", expense_id=expense_id)
             await session.commit()
-            return {"message": "Expense deleted successfully"}
+            await analytics_cache.invalidate(expense.user_id)
+            vector_analytics.discard(expense.user_id)
+            return True
         
-    async def update_expense(self, expense_id: int, description: str = None, amount: float = None, category: str = None):
+    async def update_expense(self, expense_id: int, description: str = None, amount: float = None,
+                             category: str = None) -> Optional[ExpenseResponse]:
         async with AsyncSessionLocal() as session:
             logger.info(f"Updating expense with ID: {expense_id}")
-            result = await session.execute(select(Expense).where(Expense.id == expense_id))
-            expense = result.scalar_one_or_none()
+            result = await session.execute(
+                select(Expense, User.telegram_id)
+                .join(User, User.id == Expense.user_id)
+                .where(Expense.id == expense_id)
+            )
+            row = result.one_or_none()
 
-            if not expense:
+            if not row:
                 logger.warning(f"Attempted to update non-existent expense: {expense_id}")
                 return None
 
+            expense, telegram_id = row
+            old_amount, old_category = expense.amount, expense.category
             if description:
                 expense.description = description
             if amount:
@@ -127,22 +337,23 @@ class ExpenseRepository:
             if category:
                 expense.category = category
 
+            if expense.amount != old_amount or expense.category != old_category:
+                await self.rollups.apply(session, expense.user_id, expense.added_at, old_category, -old_amount, -1)
+                await self.rollups.apply(session, expense.user_id, expense.added_at, expense.category, expense.amount, 1)
+
             await session.commit()
-            await session.refresh(expense)
-
-            # Buscar el usuario y agregar telegram_id
-            user_result = await session.execute(select(User).where(User.id == expense.user_id))
-            user = user_result.scalar_one_or_none()
-            expense_dict = {
-                "id": expense.id,
-                "user_id": expense.user_id,
-                "description": expense.description,
-                "amount": expense.amount,
-                "category": expense.category,
-                "added_at": expense.added_at,
-                "telegram_id": user.telegram_id if user else None
-            }
-            return expense_dict
+            await analytics_cache.invalidate(expense.user_id)
+            vector_analytics.discard(expense.user_id)
+
+            return ExpenseResponse(
+                id=expense.id,
+                user_id=expense.user_id,
+                description=expense.description,
+                amount=expense.amount,
+                category=expense.category,
+                telegram_id=telegram_id,
+                added_at=expense.added_at,
+            )
         
     async def get_expense_analytics(self, user_id: int, start_date: str, end_date: str):
         async with AsyncSessionLocal() as session:
@@ -0,0 +1,106 @@
+from app.core.db import AsyncSessionLocal
+from app.models.ingest import IngestMessage, INGEST_PENDING, INGEST_PROCESSING, INGEST_DONE, INGEST_FAILED
+from sqlalchemy import and_, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from app.core.config import INGEST_CLAIM_LEASE_SECONDS
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+def lease_expired(message: IngestMessage, now: Optional[datetime] = None) -> bool:
+    """True if a processing message's worker lease ran out (the worker died)."""
+    if message.status != INGEST_PROCESSING:
+        return False
+    now = now or datetime.utcnow()
+    return message.claimed_at is None or message.claimed_at < now - timedelta(seconds=INGEST_CLAIM_LEASE_SECONDS)
+
+
+class IngestRepository:
+    async def create_or_get(self, telegram_id: str, telegram_message_id: str, text: str,
+                            received_at: datetime, chat_id: Optional[str] = None) -> Tuple[IngestMessage, bool]:
+        """Persist a raw message, or return the existing one for the same Telegram message.
+
+        Returns (message, created).
+        """
+        try:
+            async with AsyncSessionLocal() as session:
+                async with session.begin():
+                    message = IngestMessage(
+                        telegram_id=telegram_id,
+                        telegram_message_id=telegram_message_id,
+                        text=text,
+                        received_at=received_at,
+                        status=INGEST_PENDING,
+                        chat_id=chat_id,
+                    )
+                    session.add(message)
+                logger.info("Ingest message stored", ingest_id=message.id, telegram_message_id=telegram_message_id)
+                return message, True
+        except IntegrityError:
+            existing = await self.get_by_telegram_message(telegram_id, telegram_message_id)
+            logger.info("Duplicate ingest message", ingest_id=existing.id if existing else None,
+                        telegram_message_id=telegram_message_id)
+            return existing, False
+
+    async def get(self, ingest_id: int) -> Optional[IngestMessage]:
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(select(IngestMessage).where(IngestMessage.id == ingest_id))
+            return result.scalar_one_or_none()
+
+    async def get_by_telegram_message(self, telegram_id: str, telegram_message_id: str) -> Optional[IngestMessage]:
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(
+                select(IngestMessage).where(
+                    IngestMessage.telegram_id == telegram_id,
+                    IngestMessage.telegram_message_id == telegram_message_id,
+                )
+            )
+            return result.scalar_one_or_none()
+
+    async def claim(self, ingest_id: int) -> Optional[IngestMessage]:
+        """Atomically move a pending (or failed) message to processing.
+
+        A message left processing by a worker that died (acks are early, so
+        its task is gone) is taken back once its INGEST_CLAIM_LEASE_SECONDS
+        lease expires. Returns the message, whose claimed_at fences the
+        claim, if this caller claimed it; None if another worker holds it
+        or it is finished.
+        """
+        now = datetime.utcnow()
+        expired = now - timedelta(seconds=INGEST_CLAIM_LEASE_SECONDS)
+        async with AsyncSessionLocal() as session:
+            async with session.begin():
+                result = await session.execute(
+                    update(IngestMessage)
+                    .where(
+                        IngestMessage.id == ingest_id,
+                        or_(
+                            IngestMessage.status.in_([INGEST_PENDING, INGEST_FAILED]),
+                            and_(
+                                IngestMessage.status == INGEST_PROCESSING,
+                                or_(IngestMessage.claimed_at.is_(None), IngestMessage.claimed_at < expired),
+                            ),
+                        ),
+                    )
+                    .values(status=INGEST_PROCESSING, error=None, claimed_at=now)
+                )
+                if result.rowcount != 1:
+                    return None
+                result = await session.execute(select(IngestMessage).where(IngestMessage.id == ingest_id))
+                return result.scalar_one()
+
+    async def fail(self, ingest_id: int, error: str, claimed_at: Optional[datetime] = None) -> None:
+        """Mark a message failed; with claimed_at, only if that claim still holds it."""
+        conditions = [IngestMessage.id == ingest_id, IngestMessage.status != INGEST_DONE]
+        if claimed_at is not None:
+            conditions.append(IngestMessage.claimed_at == claimed_at)
+        async with AsyncSessionLocal() as session:
+            async with session.begin():
+                await session.execute(
+                    update(IngestMessage)
+                    .where(*conditions)
+                    .values(status=INGEST_FAILED, error=error, processed_at=datetime.utcnow())
+                )
@@ -0,0 +1,102 @@
+from app.core.db import AsyncSessionLocal
+from app.models.expense import Expense
+from app.models.rollup import ExpenseRollup
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+_UPSERT_DIALECTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+def rollup_backfill_statement(user_id: Optional[str] = None):
+    """INSERT ... SELECT rebuilding rollups from expenses (optionally for one user)."""
+    day = func.date(Expense.added_at)
+    source = (
+        select(Expense.user_id, day, Expense.category, func.sum(Expense.amount), func.count(Expense.id))
+        .group_by(Expense.user_id, day, Expense.category)
+    )
+    if user_id is not None:
+        source = source.where(Expense.user_id == user_id)
+    return insert(ExpenseRollup).from_select(
+        ["user_id", "day", "category", "total", "count"], source
+    )
+
+
+def _upsert_statement(session):
+    """INSERT INTO expense_rollups ... ON CONFLICT adding total/count to the existing row."""
+    dialect = session.bind.dialect.name
+    upsert = _UPSERT_DIALECTS.get(dialect)
+    if upsert is None:
+        raise NotImplementedError(f"Rollups are not supported on {dialect}")
+    stmt = upsert(ExpenseRollup)
+    return stmt.on_conflict_do_update(
+        index_elements=[ExpenseRollup.user_id, ExpenseRollup.day, ExpenseRollup.category],
+        set_={
+            "total": ExpenseRollup.total + stmt.excluded.total,
+            "count": ExpenseRollup.count + stmt.excluded.count,
+        },
+    )
+
+
+class RollupRepository:
+    async def apply(self, session, user_id: str, added_at: Union[datetime, date], category: str,
+                    amount: Union[Decimal, float], count: int) -> None:
+        """Add amount/count to the (user_id, day, category) rollup within session's transaction.
+
+        Negative values remove an expense; rows that drop to zero expenses are deleted.
+        """
+        day = added_at.date() if isinstance(added_at, datetime) else added_at
+        amount = Decimal(str(amount))
+        stmt = _upsert_statement(session).values(
+            user_id=user_id, day=day, category=category, total=amount, count=count
+        )
+        await session.execute(stmt)
+        if count < 0:
+            await session.execute(
+                delete(ExpenseRollup).where(
+                    ExpenseRollup.user_id == user_id,
+                    ExpenseRollup.day == day,
+                    ExpenseRollup.category == category,
+                    ExpenseRollup.count <= 0,
+                )
+            )
+
+    async def apply_many(self, session, expenses: Iterable[Dict[str, Any]]) -> None:
+        """Add freshly inserted expenses (dicts with user_id, added_at, category,
+        amount) to their rollups with one executemany upsert."""
+        deltas: Dict[Tuple[str, date, str], List] = {}
+        for expense in expenses:
+            added_at = expense["added_at"]
+            day = added_at.date() if isinstance(added_at, datetime) else added_at
+            delta = deltas.setdefault((expense["user_id"], day, expense["category"]), [Decimal('0'), 0])
+            delta[0] += Decimal(str(expense["amount"]))
+            delta[1] += 1
+        if not deltas:
+            return
+        await session.execute(_upsert_statement(session), [
+            {"user_id": user_id, "day": day, "category": category, "total": total, "count": count}
+            for (user_id, day, category), (total, count) in deltas.items()
+        ])
+
+    async def backfill(self, user_id: Optional[str] = None) -> int:
+        """Rebuild rollups from the expenses table. Returns the number of rollup rows."""
+        logger.info("Backfilling expense rollups", user_id=user_id)
+        async with AsyncSessionLocal() as session:
+            async with session.begin():
+                clear = delete(ExpenseRollup)
+                if user_id is not None:
+                    clear = clear.where(ExpenseRollup.user_id == user_id)
+                await session.execute(clear)
+                await session.execute(rollup_backfill_statement(user_id))
+
+                count_query = select(func.count()).select_from(ExpenseRollup)
+                if user_id is not None:
+                    count_query = count_query.where(ExpenseRollup.user_id == user_id)
+                rows = (await session.execute(count_query)).scalar()
+        logger.info("Expense rollups backfilled", user_id=user_id, rows=rows)
+        return rows
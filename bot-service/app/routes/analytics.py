@@ -1,11 +1,17 @@
-from fastapi import APIRouter, HTTPException, Request, BackgroundTasks
+from fastapi import APIRouter, HTTPException, Request, BackgroundTasks, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
 from app.services.analytics import AnalyticsService
-from app.schemas.analytics import AnalyticsRequest, AnalyticsResponse, TaskStatusResponse
-from app.tasks.analytics import run_analytics_task
+from app.schemas.analytics import AnalyticsEngine, AnalyticsRequest, AnalyticsResponse, BulkAnalyticsRequest, BulkAnalyticsStatus, TaskStatusResponse, Granularity, TrendPeriod, TrendsResult
+from app.tasks.analytics import run_analytics_task, run_bulk_analytics_task
 from app.core.celery_worker import celery_app
 from app.core.logging import get_logger
+from app.handlers.task_events import task_event_broker
+from app.handlers.task_dedup import QUEUED_STATE, task_deduplicator
+from app.handlers.analytics_cache import analytics_cache
 from celery.result import AsyncResult
-from typing import Dict, Any
+from datetime import date
+from typing import Dict, Any, List, Optional
+import json
 
 router = APIRouter()
 logger = get_logger(__name__)
@@ -17,17 +23,65 @@ async def create_analytics_task(analytic: AnalyticsRequest) -> AnalyticsResponse
     """
     try:
         logger.info("Creating analytics task", data=analytic.model_dump())
-        # Submit task to Celery
-        task = run_analytics_task.delay(analytic.model_dump())
-        logger.info("Analytics task created", task_id=task.id)
+        # Identical requests over the same data share one task
+        payload = analytic.model_dump()
+        version = await analytics_cache.current_version(analytic.user_id)
+        task_id, existing_state = await task_deduplicator.submit(
+            "run_analytics_task", analytic.model_dump(mode="json"), version,
+            lambda new_id: run_analytics_task.apply_async(args=[payload], task_id=new_id),
+        )
+        logger.info("Analytics task created", task_id=task_id, deduplicated=existing_state is not None)
         return AnalyticsResponse(
-            task_id=task.id,
-            status="PENDING"
+            task_id=task_id,
+            status=existing_state or "PENDING",
+            deduplicated=existing_state is not None,
         )
     except Exception as e:
         logger.error("Error creating analytics task", error=str(e))
         raise HTTPException(status_code=400, detail=f"Error creating task: {str(e)}")
 
+@router.post("/bulk", response_model=BulkAnalyticsStatus)
+async def create_bulk_analytics_task(request: BulkAnalyticsRequest) -> BulkAnalyticsStatus:
+    """
+    Compute (and cache) analytics for many users, or "all", in chunked Celery subtasks
+    """
+    try:
+        task = run_bulk_analytics_task.delay(request.model_dump(mode="json"))
+        logger.info("Bulk analytics task created", task_id=task.id)
+        return BulkAnalyticsStatus(task_id=task.id, status="PENDING")
+    except Exception as e:
+        logger.error("Error creating bulk analytics task", error=str(e))
+        raise HTTPException(status_code=400, detail=f"Error creating task: {str(e)}")
+
+@router.get("/bulk/{task_id}", response_model=BulkAnalyticsStatus)
+async def get_bulk_analytics_status(task_id: str) -> BulkAnalyticsStatus:
+    """
+    Status of a bulk analytics run: the dispatch task, then the chord of chunks it started
+    """
+    try:
+        dispatch = AsyncResult(task_id, app=celery_app)
+        if dispatch.state == "FAILURE":
+            return BulkAnalyticsStatus(task_id=task_id, status="FAILED", error=str(dispatch.result))
+        if dispatch.state != "SUCCESS":
+            return BulkAnalyticsStatus(task_id=task_id, status=dispatch.state)
+
+        submitted = dispatch.result
+        status = BulkAnalyticsStatus(task_id=task_id, status="SUCCESS", users=submitted["users"],
+                                     chunks=submitted["chunks"])
+        if not submitted["chord_id"]:
+            return status
+        summary = AsyncResult(submitted["chord_id"], app=celery_app)
+        if summary.state == "SUCCESS":
+            status.result = summary.result
+        elif summary.state == "FAILURE":
+            status.status, status.error = "FAILED", str(summary.result)
+        else:
+            status.status = "STARTED"
+        return status
+    except Exception as e:
+        logger.error("Error checking bulk analytics status", task_id=task_id, error=str(e))
+        raise HTTPException(status_code=500, detail=f"Error checking task status: {str(e)}")
+
 @router.get("/status/{task_id}", response_model=TaskStatusResponse)
 async def get_task_status(task_id: str) -> TaskStatusResponse:
     """
@@ -38,7 +92,7 @@ async def get_task_status(task_id: str) -> TaskStatusResponse:
     try:
         task_result = AsyncResult(task_id, app=celery_app)
         
-        if task_result.state == "PENDING":
+        if task_result.state in ("PENDING", QUEUED_STATE):
             return TaskStatusResponse(
                 task_id=task_id,
                 status="PENDING"
@@ -66,11 +120,42 @@ async def get_task_status(task_id: str) -> TaskStatusResponse:
         logger.error("Error checking task status", task_id=task_id, error=str(e))
         raise HTTPException(status_code=500, detail=f"Error checking task status: {str(e)}")
 
+@router.get("/events/{task_id}")
+async def stream_task_events(task_id: str) -> StreamingResponse:
+    """
+    Server-Sent Events with the task's state: the current one, then every
+    change (STARTED, RETRY, SUCCESS with the result, FAILED) until it finishes
+    """
+    async def events():
+        async for event in task_event_broker.stream(task_id):
+            if event is None:
+                yield ": keepalive\n\n"
+            else:
+                yield f"event: {event['status'].lower()}\ndata: {json.dumps(event, default=str)}\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@router.websocket("/ws/{task_id}")
+async def task_events_websocket(websocket: WebSocket, task_id: str):
+    """
+    Same events as /events/{task_id}, as JSON messages over a WebSocket
+    """
+    await websocket.accept()
+    try:
+        async for event in task_event_broker.stream(task_id):
+            if event is not None:
+                await websocket.send_text(json.dumps(event, default=str))
+        await websocket.close()
+    except WebSocketDisconnect:
+        logger.info("Task events client disconnected", task_id=task_id)
+
 @router.get("/sync", response_model=Dict[str, Any])
 async def get_analytics_sync(
     user_id: str,
     start_date: str = None,
-    end_date: str = None
+    end_date: str = None,
+    engine: Optional[AnalyticsEngine] = None
 ) -> Dict[str, Any]:
     """
     Get analytics synchronously (for testing purposes)
@@ -85,6 +170,8 @@ async def get_analytics_sync(
             request_data["start_date"] = datetime.fromisoformat(start_date).date()
         if end_date:
             request_data["end_date"] = datetime.fromisoformat(end_date).date()
+        if engine:
+            request_data["engine"] = engine
             
         analytics_request = AnalyticsRequest(**request_data)
         service = AnalyticsService()
@@ -97,10 +184,10 @@ async def get_analytics_sync(
         raise HTTPException(status_code=500, detail=f"Error getting analytics: {str(e)}")
 
 @router.get("/overview/{user_id}")
-async def get_overview(user_id: str):
+async def get_overview(user_id: str, engine: Optional[AnalyticsEngine] = None):
     """Get expense overview for a user (for frontend dashboard)"""
     try:
-        analytics_request = AnalyticsRequest(user_id=user_id)
+        analytics_request = AnalyticsRequest(user_id=user_id, **({"engine": engine} if engine else {}))
         service = AnalyticsService()
         result = await service.get_expense_analytics(analytics_request)
         # Compose overview data
@@ -116,13 +203,43 @@ async def get_overview(user_id: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/category-summary/{user_id}")
-async def get_category_summary(user_id: str):
+async def get_category_summary(user_id: str, engine: Optional[AnalyticsEngine] = None):
     """Get category summary for a user (for frontend chart)"""
     try:
-        analytics_request = AnalyticsRequest(user_id=user_id)
+        analytics_request = AnalyticsRequest(user_id=user_id, **({"engine": engine} if engine else {}))
         service = AnalyticsService()
         result = await service.get_expense_analytics(analytics_request)
         return [cb.model_dump() for cb in result.category_breakdown]
     except Exception as e:
         logger.error("Error in get_category_summary", error=str(e))
         raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/trends/{user_id}", response_model=TrendsResult)
+async def get_trends(
+    user_id: str,
+    granularity: Granularity = "month",
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+) -> TrendsResult:
+    """Time series of totals per day/week/month and category, with empty periods as zeros"""
+    try:
+        service = AnalyticsService()
+        return await service.get_trends(user_id, start_date, end_date, granularity)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error("Error in get_trends", error=str(e))
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/monthly-trends/{user_id}", response_model=List[TrendPeriod])
+async def get_monthly_trends(user_id: str, start_date: Optional[date] = None, end_date: Optional[date] = None):
+    """Monthly totals for the frontend trend chart (last 12 months by default)"""
+    try:
+        service = AnalyticsService()
+        result = await service.get_trends(user_id, start_date, end_date, "month")
+        return result.periods
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error("Error in get_monthly_trends", error=str(e))
+        raise HTTPException(status_code=500, detail=str(e))
@@ -1,12 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from typing import List
+from datetime import datetime
+from decimal import Decimal
+from typing import List, Optional
 
 from app.core.db import get_db
 from app.core.logging import get_logger
+from app.core.pagination import InvalidCursorError
 from app.services.expense import ExpenseService
-from app.schemas.expense import ExpenseCreate, ExpenseUpdate, ExpenseResponse
+from app.services.expense_export import ExpenseExportService, ExportFormatUnavailable
+from app.services.expense_import import ExpenseImportService
+from app.services.ingest import IngestService, to_response
+from app.schemas.expense import ExpenseSort, ExportFormat, ExpenseImportResponse, ImportFormat, ExpenseCreate, ExpenseUpdate, ExpenseResponse, ExpenseIngestRequest, ExpenseIngestResponse
+from app.models.ingest import INGEST_PENDING
+from app.repositories.ingest import lease_expired
+from app.tasks.ingest import process_ingest_message
 from app.models.user import User
 
 router = APIRouter()
@@ -14,21 +24,99 @@ logger = get_logger(__name__)
 
 @router.get("/", response_model=List[ExpenseResponse])
 async def get_expenses(
+    response: Response,
     skip: int = 0,
-    limit: int = 100,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    user_id: Optional[str] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
     db: AsyncSession = Depends(get_db)
 ):
-    """Get all expenses with pagination"""
+    """Get expenses ordered by date, paginated with an opaque cursor.
+
+    The cursor of the next page is returned in the X-Next-Cursor header
+    (absent on the last page). skip is still accepted without a cursor.
+    """
     try:
-        logger.info("Fetching expenses", skip=skip, limit=limit)
+        logger.info("Fetching expenses", skip=skip, limit=limit, cursor=cursor, user_id=user_id)
         service = ExpenseService()
-        expenses = await service.get_expenses(skip=skip, limit=limit)
+        expenses, next_cursor = await service.list_expenses(
+            limit=limit, cursor=cursor, skip=skip, user_id=user_id, start_date=start_date, end_date=end_date
+        )
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
         return expenses
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error("Error fetching expenses", error=str(e))
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/user/{user_id}", response_model=List[ExpenseResponse])
+async def get_user_expenses(
+    user_id: str,
+    response: Response,
+    category: Optional[str] = None,
+    min_amount: Optional[Decimal] = Query(None, ge=0),
+    max_amount: Optional[Decimal] = Query(None, ge=0),
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    sort: ExpenseSort = "date_desc",
+    limit: int = Query(50, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db)
+):
+    """Get one user's expenses, filtered and sorted in the database.
+
+    Newest first by default; the next page's cursor is returned in the
+    X-Next-Cursor header and is only valid for the same sort.
+    """
+    try:
+        logger.info("Fetching user expenses", user_id=user_id, sort=sort, limit=limit, cursor=cursor)
+        service = ExpenseService()
+        expenses, next_cursor = await service.list_expenses(
+            limit=limit, cursor=cursor, user_id=user_id, start_date=start_date, end_date=end_date,
+            category=category, min_amount=min_amount, max_amount=max_amount, sort=sort
+        )
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
+        return expenses
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error("Error fetching user expenses", user_id=user_id, error=str(e))
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/export")
+async def export_expenses(
+    format: ExportFormat = "csv",
+    gzip: bool = False,
+    user_id: Optional[str] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    category: Optional[str] = None,
+) -> StreamingResponse:
+    """Download expenses as CSV, NDJSON or Parquet, optionally gzipped.
+
+    The file is streamed from a server-side cursor, oldest first.
+    """
+    logger.info("Exporting expenses", format=format, gzip=gzip, user_id=user_id)
+    service = ExpenseExportService()
+    try:
+        chunks = service.export(
+            format, gzip=gzip, user_id=user_id, start_date=start_date, end_date=end_date, category=category
+        )
+    except ExportFormatUnavailable as e:
+        raise HTTPException(status_code=501, detail=str(e))
+    return StreamingResponse(
+        chunks,
+        media_type=service.media_type(format, gzip),
+        headers={"Content-Disposition": f'attachment; filename="{service.filename(format, gzip)}"'},
+    )
+
 @router.post("/", response_model=ExpenseResponse)
 async def create_expense(
     expense: ExpenseCreate,
@@ -44,6 +132,74 @@ async def create_expense(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+IMPORT_CONTENT_TYPES = {
+    "text/csv": "csv",
+    "application/x-ndjson": "jsonl",
+    "application/jsonl": "jsonl",
+    "application/json-lines": "jsonl",
+}
+
+
+@router.post("/import", response_model=ExpenseImportResponse)
+async def import_expenses(
+    request: Request,
+    format: Optional[ImportFormat] = None,
+    categorize: bool = False,
+) -> ExpenseImportResponse:
+    """Bulk import expenses from a CSV (with header) or JSON Lines body.
+
+    The body is streamed and written in batches; rows that fail validation
+    are reported by line number without aborting the import. The format is
+    taken from ?format= or the Content-Type.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    fmt = format or IMPORT_CONTENT_TYPES.get(content_type)
+    if fmt is None:
+        raise HTTPException(status_code=400, detail="Unknown import format, pass ?format=csv or ?format=jsonl")
+
+    try:
+        service = ExpenseImportService()
+        return await service.import_expenses(request.stream(), fmt, categorize=categorize)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error("Error importing expenses", error=str(e))
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/ingest", response_model=ExpenseIngestResponse, status_code=202)
+async def ingest_expense(message: ExpenseIngestRequest) -> ExpenseIngestResponse:
+    """Accept a raw message and categorize it in the background"""
+    try:
+        logger.info("Ingesting expense message", data=message.model_dump())
+        service = IngestService()
+        ingest, created = await service.accept(message)
+    except Exception as e:
+        logger.error("Error storing ingest message", error=str(e))
+        raise HTTPException(status_code=500, detail=str(e))
+
+    # Re-enqueue duplicates that are still pending (the first enqueue may
+    # have failed) or whose worker died mid-processing (its lease expired);
+    # workers claim messages atomically so a second task is a no-op.
+    if created or ingest.status == INGEST_PENDING or lease_expired(ingest):
+        try:
+            process_ingest_message.delay(ingest.id)
+        except Exception as e:
+            logger.error("Error enqueuing ingest message", ingest_id=ingest.id, error=str(e))
+            raise HTTPException(status_code=503, detail="Message stored but could not be queued, retry later")
+
+    return to_response(ingest, duplicate=not created)
+
+
+@router.get("/ingest/{ingest_id}", response_model=ExpenseIngestResponse)
+async def get_ingest_status(ingest_id: int) -> ExpenseIngestResponse:
+    """Get the processing status of an accepted message"""
+    service = IngestService()
+    ingest = await service.get(ingest_id)
+    if not ingest:
+        raise HTTPException(status_code=404, detail="Ingest message not found")
+    return to_response(ingest)
+
+
 @router.get("/{expense_id}", response_model=ExpenseResponse)
 async def get_expense(
     expense_id: int,
@@ -53,11 +209,11 @@ async def get_expense(
     try:
         logger.info(f"Fetching expense by ID: {expense_id}")
         service = ExpenseService()
-        expense = await service.get_expense_by_id(expense_id)
-        if not expense or "message" in expense:
+        expense = await service.get_expense(expense_id)
+        if not expense:
             logger.warning(f"Expense not found: {expense_id}")
             raise HTTPException(status_code=404, detail="Expense not found")
-        return ExpenseResponse(**expense)
+        return expense
     except HTTPException:
         logger.error(f"Error fetching expense: {expense_id}")
         raise
@@ -1,72 +1,30 @@
 from fastapi import APIRouter, HTTPException
 from app.core.logging import get_logger
-from app.core.db import AsyncSessionLocal
-from app.core.celery_worker import celery_app
-from sqlalchemy import text
-import redis
-from app.core.config import REDIS_URL
+from app.core.db import get_pool_status
+from app.core.redis_client import get_redis_pool_status
+from app.handlers.health_monitor import health_monitor
+from app.handlers.llm_engine import llm_engine
+from app.handlers.categorization_cache import categorization_cache
+from app.handlers.analytics_cache import analytics_cache
+from app.handlers.vector_analytics import vector_analytics
+from app.handlers.task_events import task_event_broker
+from app.handlers.task_dedup import task_deduplicator
+from app.handlers.stage_stats import categorization_stats
+from app.handlers.langchain_handler import llm_batcher
 from typing import Dict, Any
 
 router = APIRouter()
 logger = get_logger(__name__)
 
 @router.get("/")
-async def health_check() -> Dict[str, Any]:
+async def health_check(refresh: bool = False) -> Dict[str, Any]:
     """
-    Comprehensive health check endpoint
+    Comprehensive health check endpoint, answered from the background
+    health monitor (refresh=true probes everything now)
     """
-    logger.info("Health check requested")
-    
-    health_status = {
-        "status": "healthy",
-        "service": "bot-service",
-        "checks": {
-            "database": "unknown",
-            "redis": "unknown",
-            "celery": "unknown"
-        }
-    }
-    
-    # Check database connection
-    try:
-        async with AsyncSessionLocal() as session:
-            await session.execute(text("SELECT 1"))
-        health_status["checks"]["database"] = "healthy"
-        logger.info("Database health check passed")
-    except Exception as e:
-        health_status["checks"]["database"] = f"unhealthy: {str(e)}"
-        health_status["status"] = "unhealthy"
-        logger.error("Database health check failed", error=str(e))
-    
-    # Check Redis connection
-    try:
-        r = redis.from_url(REDIS_URL)
-        r.ping()
-        health_status["checks"]["redis"] = "healthy"
-        logger.info("Redis health check passed")
-    except Exception as e:
-        health_status["checks"]["redis"] = f"unhealthy: {str(e)}"
-        health_status["status"] = "unhealthy"
-        logger.error("Redis health check failed", error=str(e))
-    
-    # Check Celery workers
-    try:
-        inspect = celery_app.control.inspect()
-        active_workers = inspect.active()
-        if active_workers:
-            health_status["checks"]["celery"] = f"healthy: {len(active_workers)} workers"
-        else:
-            health_status["checks"]["celery"] = "unhealthy: no active workers"
-            health_status["status"] = "degraded"
-        logger.info("Celery health check completed", active_workers=len(active_workers) if active_workers else 0)
-    except Exception as e:
-        health_status["checks"]["celery"] = f"unhealthy: {str(e)}"
-        health_status["status"] = "unhealthy"
-        logger.error("Celery health check failed", error=str(e))
-    
+    health_status = await health_monitor.current(refresh=refresh)
     if health_status["status"] == "unhealthy":
         raise HTTPException(status_code=503, detail=health_status)
-    
     return health_status
 
 @router.get("/ready")
@@ -74,13 +32,11 @@ async def readiness_check() -> Dict[str, str]:
     """
     Readiness check for Kubernetes/Docker
     """
-    try:
-        async with AsyncSessionLocal() as session:
-            await session.execute(text("SELECT 1"))
-        return {"status": "ready"}
-    except Exception as e:
-        logger.error("Readiness check failed", error=str(e))
-        raise HTTPException(status_code=503, detail={"status": "not ready", "error": str(e)})
+    database = (await health_monitor.current(["database"]))["checks"]["database"]
+    if database != "healthy":
+        logger.error("Readiness check failed", error=database)
+        raise HTTPException(status_code=503, detail={"status": "not ready", "error": database})
+    return {"status": "ready"}
 
 @router.get("/live")
 async def liveness_check() -> Dict[str, str]:
@@ -88,3 +44,22 @@ async def liveness_check() -> Dict[str, str]:
     Liveness check for Kubernetes/Docker
     """
     return {"status": "alive"}
+
+@router.get("/metrics")
+async def metrics() -> Dict[str, Any]:
+    """
+    In-process runtime metrics (LLM concurrency, caches, pools)
+    """
+    return {
+        "llm": llm_engine.metrics(),
+        "llm_batching": llm_batcher.metrics(),
+        "categorization_cache": categorization_cache.metrics(),
+        "categorization_stages": categorization_stats.metrics(),
+        "analytics_cache": analytics_cache.metrics(),
+        "vector_analytics": vector_analytics.metrics(),
+        "task_events": task_event_broker.metrics(),
+        "task_dedup": task_deduplicator.metrics(),
+        "db_pool": get_pool_status(),
+        "redis_pool": get_redis_pool_status(),
+        "health": health_monitor.metrics(),
+    }
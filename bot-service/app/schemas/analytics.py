@@ -1,12 +1,19 @@
 from pydantic import BaseModel, Field
-from typing import List, Optional, Dict
+from typing import Any, List, Literal, Optional, Dict, Union
 from datetime import date
+from app.core.config import ANALYTICS_BULK_CHUNK_SIZE, ANALYTICS_DEFAULT_ENGINE
+
+
+AnalyticsEngine = Literal["sql", "vector"]
 
 
 class AnalyticsRequest(BaseModel):
     user_id: str = Field(..., description="ID del usuario a analizar")
     start_date: Optional[date] = Field(None, description="Fecha de inicio del análisis")
     end_date: Optional[date] = Field(None, description="Fecha de fin del análisis")
+    engine: AnalyticsEngine = Field(
+        ANALYTICS_DEFAULT_ENGINE, description="sql (consultas a la base) o vector (NumPy en memoria)"
+    )
 
 
 class CategoryBreakdown(BaseModel):
@@ -21,12 +28,36 @@ class AnalyticsResult(BaseModel):
     category_breakdown: List[CategoryBreakdown]
     average_by_category: Dict[str, float] = Field(default_factory=dict)
     monthly_variation_percentage: float = 0.0
+    engine: AnalyticsEngine = "sql"
+    amount_percentiles: Dict[str, float] = Field(default_factory=dict, description="Solo con engine=vector")
+    daily_rolling_mean: Dict[str, float] = Field(default_factory=dict, description="Solo con engine=vector")
+
+
+Granularity = Literal["day", "week", "month"]
+
+
+class TrendPeriod(BaseModel):
+    period: date = Field(..., description="Primer día del período")
+    total: float
+    count: int
+    categories: Dict[str, float] = Field(default_factory=dict)
+    variation_percentage: float = Field(0.0, description="Variación respecto del período anterior")
+
+
+class TrendsResult(BaseModel):
+    user_id: str
+    granularity: Granularity
+    start_date: date
+    end_date: date
+    categories: List[str]
+    periods: List[TrendPeriod]
 
 
 class AnalyticsResponse(BaseModel):
     task_id: str
     status: str
     result: Optional[AnalyticsResult] = None
+    deduplicated: bool = Field(False, description="Ya había una task igual en curso; se devuelve su task_id")
 
 
 class TaskStatusResponse(BaseModel):
@@ -34,3 +65,19 @@ class TaskStatusResponse(BaseModel):
     status: str
     result: Optional[AnalyticsResult] = None
     error: Optional[str] = None
+
+
+class BulkAnalyticsRequest(BaseModel):
+    user_ids: Union[List[str], Literal["all"]] = Field("all", description="IDs de usuario o \"all\" para todos")
+    start_date: Optional[date] = Field(None, description="Fecha de inicio del análisis")
+    end_date: Optional[date] = Field(None, description="Fecha de fin del análisis")
+    chunk_size: int = Field(ANALYTICS_BULK_CHUNK_SIZE, ge=1, le=10000, description="Usuarios por subtarea")
+
+
+class BulkAnalyticsStatus(BaseModel):
+    task_id: str
+    status: str
+    users: Optional[int] = None
+    chunks: Optional[int] = None
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
@@ -1,5 +1,13 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import List, Literal, Optional
+from datetime import datetime
+from decimal import Decimal
+
+ExpenseSort = Literal["date_asc", "date_desc", "amount_asc", "amount_desc"]
+ImportFormat = Literal["csv", "jsonl"]
+ExportFormat = Literal["csv", "ndjson", "parquet"]
+# Largest amount expenses.amount (Numeric(10, 2)) can store
+MAX_AMOUNT = Decimal("99999999.99")
 
 class ExpenseInput(BaseModel):
     user_id: str = Field(..., description="ID interno del usuario (opcional si usás solo telegram_id)")
@@ -46,6 +54,7 @@ class ExpenseResponse(BaseModel):
     category: Optional[str] = Field(None, description="Categoría del gasto, si ya viene definida")
     telegram_id: str = Field(..., description="ID del usuario en Telegram")
     text: Optional[str] = Field(None, description="Texto original del mensaje para categorizar")
+    added_at: Optional[datetime] = Field(None, description="Fecha y hora del gasto")
 
     class Config:
         json_schema_extra = {
@@ -88,4 +97,64 @@ class ExpenseDeleteResponse(BaseModel):
             "example": {
                 "message": "Expense deleted successfully"
             }
-        }
\ No newline at end of file
+        }
+
+class ExpenseIngestRequest(BaseModel):
+    telegram_id: str = Field(..., description="ID del usuario en Telegram")
+    telegram_message_id: str = Field(..., description="ID del mensaje en Telegram, usado para idempotencia")
+    text: str = Field(..., description="Texto original del mensaje para categorizar")
+    received_at: Optional[datetime] = Field(None, description="Momento en que se recibió el mensaje")
+    chat_id: Optional[str] = Field(None, description="Chat de Telegram a notificar (vía INGEST_CALLBACK_URL) cuando el gasto fue procesado")
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "telegram_id": "5440711730",
+                "telegram_message_id": "1024",
+                "text": "Pizza 20",
+                "received_at": "2024-01-15T12:30:00",
+                "chat_id": "5440711730"
+            }
+        }
+
+class ExpenseIngestResponse(BaseModel):
+    ingest_id: int = Field(..., description="ID del mensaje aceptado")
+    status: str = Field(..., description="pending, processing, done o failed")
+    telegram_id: str = Field(..., description="ID del usuario en Telegram")
+    telegram_message_id: str = Field(..., description="ID del mensaje en Telegram")
+    expense_id: Optional[int] = Field(None, description="ID del gasto creado, cuando status es done")
+    error: Optional[str] = Field(None, description="Error del último intento, cuando status es failed")
+    duplicate: bool = Field(False, description="True si el mensaje ya había sido recibido")
+
+class ExpenseImportRow(BaseModel):
+    telegram_id: str = Field(..., description="ID del usuario en Telegram")
+    description: Optional[str] = Field(None, description="Descripción de la compra")
+    amount: Optional[Decimal] = Field(None, gt=0, le=MAX_AMOUNT, decimal_places=2, description="Monto del gasto")
+    category: Optional[str] = Field(None, description="Categoría; si falta se categoriza con categorize=true")
+    added_at: Optional[datetime] = Field(None, description="Fecha del gasto; por defecto el momento de la importación")
+    text: Optional[str] = Field(None, description="Texto original, usado para categorizar")
+
+class ExpenseImportError(BaseModel):
+    line: int = Field(..., description="Línea del archivo (1 = primera línea, incluido el encabezado CSV)")
+    error: str = Field(..., description="Motivo por el que la fila no se importó")
+
+class ExpenseImportResponse(BaseModel):
+    imported: int = Field(..., description="Filas guardadas")
+    failed: int = Field(..., description="Filas rechazadas")
+    categorized: int = Field(0, description="Filas categorizadas durante la importación")
+    errors: List[ExpenseImportError] = Field(default_factory=list, description="Detalle de las filas rechazadas")
+    errors_truncated: bool = Field(False, description="True si hubo más errores de los que se listan")
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "imported": 998,
+                "failed": 2,
+                "categorized": 0,
+                "errors": [
+                    {"line": 17, "error": "amount: Input should be greater than 0"},
+                    {"line": 431, "error": "category is required (or import with categorize=true)"}
+                ],
+                "errors_truncated": False
+            }
+        }
@@ -1,12 +1,42 @@
-from app.repositories.analytics import AnalyticsRepository
-from app.schemas.analytics import AnalyticsRequest, AnalyticsResult, CategoryBreakdown
+from app.repositories.analytics import AnalyticsRepository, AnalyticsSnapshot, variation_percentage, truncate_date, next_period
+from app.schemas.analytics import AnalyticsRequest, AnalyticsResult, CategoryBreakdown, Granularity, TrendPeriod, TrendsResult
+from app.handlers.analytics_cache import analytics_cache
+from app.handlers.vector_analytics import vector_analytics
 from app.core.logging import get_logger
 from datetime import date, datetime
+from typing import Dict, List, Optional
+from decimal import Decimal
 from dateutil.relativedelta import relativedelta
-from typing import List
 
 logger = get_logger(__name__)
 
+DEFAULT_TREND_PERIODS = 12
+MAX_TREND_PERIODS = 1000
+
+_PERIOD_STEP = {"day": relativedelta(days=1), "week": relativedelta(weeks=1), "month": relativedelta(months=1)}
+
+def _current_month(start_date: Optional[date], end_date: Optional[date]) -> Optional[date]:
+    # Monthly variation only makes sense for an explicit date range
+    return end_date.replace(day=1) if start_date and end_date else None
+
+
+def _build_result(snapshot: AnalyticsSnapshot, start_date: date, end_date: date,
+                  current_month: Optional[date]) -> AnalyticsResult:
+    monthly_variation = 0.0
+    if current_month:
+        monthly_variation = variation_percentage(snapshot.current_month_total, snapshot.previous_month_total)
+    return AnalyticsResult(
+        total_expenses=float(snapshot.total),
+        start_date=start_date,
+        end_date=end_date,
+        category_breakdown=[
+            CategoryBreakdown(category=row.category, total=float(row.total)) for row in snapshot.categories
+        ],
+        average_by_category={row.category: float(row.average) for row in snapshot.categories},
+        monthly_variation_percentage=monthly_variation,
+    )
+
+
 class AnalyticsService:
     def __init__(self):
         self.repo = AnalyticsRepository()
@@ -23,48 +53,118 @@ class AnalyticsService:
             start_date = data.start_date or date.min
             end_date = data.end_date or date.max
 
-            # Get category breakdown
-            category_data = await self.repo.get_expenses_summary(data.user_id, start_date, end_date)
-            category_breakdown = [
-                CategoryBreakdown(category=row[0], total=float(row[1])) for row in category_data
-            ]
+            if data.engine == "vector":
+                # The engine keeps the user's columns in memory; recomputing is cheap
+                return await self._compute_expense_analytics(data, start_date, end_date)
+            return await analytics_cache.get_or_compute(
+                data.user_id, start_date, end_date,
+                lambda: self._compute_expense_analytics(data, start_date, end_date),
+            )
 
-            # Get total expenses
-            total_expenses = await self.repo.get_total_expenses(data.user_id, start_date, end_date)
-            total_expenses_float = float(total_expenses) if total_expenses else 0.0
+        except Exception as e:
+            logger.error("Error in expense analytics", error=str(e), user_id=data.user_id)
+            raise
 
-            # Get average by category
-            avg_data = await self.repo.get_average_by_category(data.user_id, start_date, end_date)
-            avg_by_category = {row[0]: float(row[1]) for row in avg_data}
+    async def _compute_expense_analytics(self, data: AnalyticsRequest, start_date: date, end_date: date) -> AnalyticsResult:
+        """Run the analytics queries (bypassing the cache)"""
+        current_month = _current_month(data.start_date, data.end_date)
+        source = vector_analytics if data.engine == "vector" else self.repo
+        snapshot = await source.get_analytics_snapshot(data.user_id, start_date, end_date, current_month)
 
-            # Calculate monthly variation if we have date range
-            monthly_variation = 0.0
-            if data.start_date and data.end_date:
-                try:
-                    current_month = data.end_date.replace(day=1)
-                    previous_month = current_month - relativedelta(months=1)
-                    monthly_variation = await self.repo.get_monthly_variation(
-                        data.user_id, current_month, previous_month
-                    )
-                except Exception as e:
-                    logger.warning("Could not calculate monthly variation", error=str(e))
-
-            result = AnalyticsResult(
-                total_expenses=total_expenses_float,
-                start_date=start_date,
-                end_date=end_date,
-                category_breakdown=category_breakdown,
-                average_by_category=avg_by_category,
-                monthly_variation_percentage=monthly_variation
+        result = _build_result(snapshot, start_date, end_date, current_month)
+        if data.engine == "vector":
+            result.engine = "vector"
+            result.amount_percentiles, result.daily_rolling_mean = await vector_analytics.get_distribution(
+                data.user_id, start_date, end_date
             )
 
-            logger.info("Analytics completed successfully", 
-                       total_expenses=total_expenses_float,
-                       categories_count=len(category_breakdown),
-                       monthly_variation=monthly_variation)
-            
-            return result
+        logger.info("Analytics completed successfully", 
+                    total_expenses=result.total_expenses,
+                    categories_count=len(result.category_breakdown),
+                    monthly_variation=result.monthly_variation_percentage)
+        
+        return result
 
-        except Exception as e:
-            logger.error("Error in expense analytics", error=str(e), user_id=data.user_id)
-            raise
+    async def get_bulk_analytics(self, user_ids: List[str], start_date: Optional[date] = None,
+                                 end_date: Optional[date] = None) -> Dict[str, AnalyticsResult]:
+        """Analytics of many users from one grouped query, stored in the result cache.
+
+        Results are the same get_expense_analytics would return for each
+        user with this range (SQL engine).
+        """
+        logger.info("Starting bulk analytics", users=len(user_ids), start_date=start_date, end_date=end_date)
+
+        if start_date and end_date and start_date > end_date:
+            raise ValueError("start_date debe ser anterior o igual a end_date.")
+        current_month = _current_month(start_date, end_date)
+        start_date, end_date = start_date or date.min, end_date or date.max
+
+        versions = await analytics_cache.versions(user_ids)
+        snapshots = await self.repo.get_analytics_snapshots(user_ids, start_date, end_date, current_month)
+        results = {
+            user_id: _build_result(snapshot, start_date, end_date, current_month)
+            for user_id, snapshot in snapshots.items()
+        }
+        cached = await analytics_cache.store_many(start_date, end_date, results, versions)
+
+        logger.info("Bulk analytics completed", users=len(results), cached=cached)
+        return results
+
+    async def get_trends(self, user_id: str, start_date: Optional[date] = None, end_date: Optional[date] = None,
+                         granularity: Granularity = "month") -> TrendsResult:
+        """Per-period totals by category, zero-filled, with period-over-period variation.
+
+        Defaults to the last DEFAULT_TREND_PERIODS periods up to today. Every
+        number comes from one time series query.
+        """
+        logger.info("Starting trends", user_id=user_id, start_date=start_date, end_date=end_date, granularity=granularity)
+
+        end_date = end_date or date.today()
+        if start_date is None:
+            start_date = truncate_date(end_date, granularity) - _PERIOD_STEP[granularity] * (DEFAULT_TREND_PERIODS - 1)
+        if start_date > end_date:
+            raise ValueError("start_date debe ser anterior o igual a end_date.")
+
+        periods: List[date] = []
+        period = truncate_date(start_date, granularity)
+        while period <= end_date:
+            periods.append(period)
+            if len(periods) > MAX_TREND_PERIODS:
+                raise ValueError(f"El rango supera los {MAX_TREND_PERIODS} períodos; usar una granularidad mayor.")
+            period = next_period(period, granularity)
+
+        rows = await self.repo.get_time_series(user_id, start_date, end_date, granularity)
+        by_period: Dict[date, Dict[str, Decimal]] = {p: {} for p in periods}
+        counts: Dict[date, int] = {p: 0 for p in periods}
+        for row in rows:
+            bucket = by_period.get(row.period)
+            if bucket is None:
+                # Not one of the computed periods (e.g. a driver returning another type)
+                logger.warning("Skipping unexpected trend period", user_id=user_id, period=str(row.period))
+                continue
+            bucket[row.category] = row.total
+            counts[row.period] += row.count
+        categories = sorted({row.category for row in rows})
+
+        result_periods: List[TrendPeriod] = []
+        previous_total: Optional[Decimal] = None
+        for period in periods:
+            total = sum(by_period[period].values(), Decimal('0'))
+            result_periods.append(TrendPeriod(
+                period=period,
+                total=float(total),
+                count=counts[period],
+                categories={c: float(by_period[period].get(c, 0)) for c in categories},
+                variation_percentage=variation_percentage(total, previous_total),
+            ))
+            previous_total = total
+
+        logger.info("Trends completed", user_id=user_id, periods=len(result_periods), categories=len(categories))
+        return TrendsResult(
+            user_id=user_id,
+            granularity=granularity,
+            start_date=start_date,
+            end_date=end_date,
+            categories=categories,
+            periods=result_periods,
+        )
@@ -1,7 +1,8 @@
 from app.repositories.expense import ExpenseRepository
-from app.models.user import User
-from app.core.db import AsyncSessionLocal
-from sqlalchemy import select
+from app.schemas.expense import ExpenseResponse, ExpenseSort
+from datetime import datetime
+from decimal import Decimal
+from typing import List, Optional, Tuple
 
 class ExpenseService:
     def __init__(self):
@@ -30,20 +31,26 @@ class ExpenseService:
             text=text
         )
 
-    async def get_expenses(self, skip: int = 0, limit: int = 10):
-        expenses = await self.expense_repo.get_all_expenses(skip=skip, limit=limit)
-        # Attach telegram_id to each expense
-        async with AsyncSessionLocal() as session:
-            for expense in expenses:
-                result = await session.execute(select(User).where(User.id == expense.user_id))
-                user = result.scalar_one_or_none()
-                expense.telegram_id = user.telegram_id if user else None
-        return expenses
+    async def get_expenses(self, skip: int = 0, limit: int = 10) -> List[ExpenseResponse]:
+        return await self.expense_repo.get_all_expenses(skip=skip, limit=limit)
     
-    async def get_expense_by_id(self, expense_id: int):
+    async def list_expenses(self, limit: int = 100, cursor: Optional[str] = None, skip: int = 0,
+                            user_id: Optional[str] = None, start_date: Optional[datetime] = None,
+                            end_date: Optional[datetime] = None, category: Optional[str] = None,
+                            min_amount: Optional[Decimal] = None, max_amount: Optional[Decimal] = None,
+                            sort: ExpenseSort = "date_asc") -> Tuple[List[ExpenseResponse], Optional[str]]:
+        return await self.expense_repo.list_expenses(
+            limit=limit, cursor=cursor, skip=skip, user_id=user_id, start_date=start_date, end_date=end_date,
+            category=category, min_amount=min_amount, max_amount=max_amount, sort=sort
+        )
+
+    async def get_expense(self, expense_id: int) -> Optional[ExpenseResponse]:
         return await self.expense_repo.get_expense_by_id(expense_id)
+
+    async def get_expense_by_id(self, expense_id: int) -> Optional[ExpenseResponse]:
+        return await self.get_expense(expense_id)
     
-    async def delete_expense(self, expense_id: int):
+    async def delete_expense(self, expense_id: int) -> bool:
         return await self.expense_repo.delete_expense(expense_id)
     
     async def update_expense(self, expense_id: int, expense_update: dict):
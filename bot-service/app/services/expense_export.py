@@ -0,0 +1,160 @@
+import csv
+import importlib.util
+import io
+import json
+import zlib
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from app.core.config import EXPORT_BATCH_SIZE
+from app.core.logging import get_logger
+from app.repositories.expense import ExpenseRepository
+from app.schemas.expense import ExportFormat
+
+logger = get_logger(__name__)
+
+EXPORT_COLUMNS = ("id", "user_id", "telegram_id", "description", "amount", "category", "added_at")
+
+MEDIA_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+class ExportFormatUnavailable(Exception):
+    pass
+
+
+def parquet_available() -> bool:
+    """Parquet export needs the optional pyarrow dependency."""
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+async def csv_chunks(batches: AsyncIterator[List[Any]]) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    yield buffer.getvalue().encode()
+    async for batch in batches:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(
+            (row.id, row.user_id, row.telegram_id, row.description, row.amount, row.category, row.added_at.isoformat())
+            for row in batch
+        )
+        yield buffer.getvalue().encode()
+
+
+async def ndjson_chunks(batches: AsyncIterator[List[Any]]) -> AsyncIterator[bytes]:
+    async for batch in batches:
+        yield "".join(
+            json.dumps({
+                "id": row.id,
+                "user_id": row.user_id,
+                "telegram_id": row.telegram_id,
+                "description": row.description,
+                "amount": float(row.amount),
+                "category": row.category,
+                "added_at": row.added_at.isoformat(),
+            }, ensure_ascii=False) + "\n"
+            for row in batch
+        ).encode()
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file that hands back whatever pyarrow wrote since the last drain."""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+async def parquet_chunks(batches: AsyncIterator[List[Any]]) -> AsyncIterator[bytes]:
+    """One Parquet row group per batch, streamed as it is written."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([
+        ("id", pa.int64()),
+        ("user_id", pa.string()),
+        ("telegram_id", pa.string()),
+        ("description", pa.string()),
+        ("amount", pa.decimal128(10, 2)),
+        ("category", pa.string()),
+        ("added_at", pa.timestamp("us")),
+    ])
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema)
+    try:
+        async for batch in batches:
+            columns: Dict[str, list] = {name: [getattr(row, name) for row in batch] for name in EXPORT_COLUMNS}
+            writer.write_table(pa.table(columns, schema=schema))
+            yield sink.drain()
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+async def gzip_chunks(chunks: AsyncIterator[bytes], level: int = 6) -> AsyncIterator[bytes]:
+    compressor = zlib.compressobj(level, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+    async for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+ENCODERS = {"csv": csv_chunks, "ndjson": ndjson_chunks, "parquet": parquet_chunks}
+
+
+class ExpenseExportService:
+    """Streams a user's (or everyone's) expenses as CSV, NDJSON or Parquet.
+
+    Rows are read from a server-side cursor batch_size at a time and encoded
+    batch by batch, so memory does not grow with the size of the history.
+    """
+
+    def __init__(self, batch_size: int = EXPORT_BATCH_SIZE):
+        self.expense_repo = ExpenseRepository()
+        self.batch_size = batch_size
+
+    def export(self, fmt: ExportFormat, gzip: bool = False, user_id: Optional[str] = None,
+               start_date: Optional[datetime] = None, end_date: Optional[datetime] = None,
+               category: Optional[str] = None) -> AsyncIterator[bytes]:
+        """Byte chunks of the export. Raises ExportFormatUnavailable before
+        anything is streamed if the format's dependency is missing."""
+        if fmt == "parquet" and not parquet_available():
+            raise ExportFormatUnavailable("Parquet export requires pyarrow to be installed")
+
+        logger.info("Starting expense export", format=fmt, gzip=gzip, user_id=user_id)
+        batches = self.expense_repo.stream_expenses(
+            user_id=user_id, start_date=start_date, end_date=end_date, category=category,
+            batch_size=self.batch_size,
+        )
+        chunks = ENCODERS[fmt](batches)
+        return gzip_chunks(chunks) if gzip else chunks
+
+    @staticmethod
+    def filename(fmt: ExportFormat, gzip: bool = False) -> str:
+        return f"expenses.{fmt}" + (".gz" if gzip else "")
+
+    @staticmethod
+    def media_type(fmt: ExportFormat, gzip: bool = False) -> str:
+        return "application/gzip" if gzip else MEDIA_TYPES[fmt]
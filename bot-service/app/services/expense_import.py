@@ -0,0 +1,219 @@
+import asyncio
+import codecs
+import csv
+import json
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Any, AsyncIterator, Dict, List, NamedTuple, Optional, Tuple
+
+from pydantic import ValidationError
+
+from app.core.config import IMPORT_BATCH_SIZE, IMPORT_MAX_ERRORS
+from app.core.logging import get_logger
+from app.handlers.langchain_handler import categorize_expense
+from app.repositories.expense import ExpenseRepository
+from app.schemas.expense import ExpenseImportError, ExpenseImportResponse, ExpenseImportRow, ImportFormat, MAX_AMOUNT
+
+logger = get_logger(__name__)
+
+CENTS = Decimal("0.01")
+
+
+class RawRow(NamedTuple):
+    line: int
+    fields: Optional[Dict[str, Any]]
+    error: Optional[str] = None
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Decode a UTF-8 byte stream into lines, whatever the chunk boundaries."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    buffer = ""
+    async for chunk in chunks:
+        buffer += decoder.decode(chunk)
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            yield line.rstrip("\r")
+    buffer += decoder.decode(b"", final=True)
+    if buffer:
+        yield buffer.rstrip("\r")
+
+
+async def iter_csv_rows(chunks: AsyncIterator[bytes]) -> AsyncIterator[RawRow]:
+    """Rows of a CSV stream with a header line, as dicts keyed by column name."""
+    header: Optional[List[str]] = None
+    pending: List[str] = []
+    line_no = start = 0
+    async for line in iter_lines(chunks):
+        line_no += 1
+        if not pending:
+            start = line_no
+        pending.append(line)
+        record = "\n".join(pending)
+        if record.count('"') % 2:
+            continue  # a quoted field continues on the next line
+        pending = []
+        if not record.strip():
+            continue
+        values = next(csv.reader([record]))
+        if header is None:
+            header = [name.strip().lower() for name in values]
+            if "telegram_id" not in header:
+                raise ValueError("CSV header must include a telegram_id column")
+            continue
+        if len(values) != len(header):
+            yield RawRow(start, None, f"expected {len(header)} columns, got {len(values)}")
+            continue
+        yield RawRow(start, dict(zip(header, values)))
+    if pending:
+        yield RawRow(start, None, "unterminated quoted field")
+
+
+async def iter_jsonl_rows(chunks: AsyncIterator[bytes]) -> AsyncIterator[RawRow]:
+    """Rows of a JSON Lines stream, one object per line."""
+    line_no = 0
+    async for line in iter_lines(chunks):
+        line_no += 1
+        if not line.strip():
+            continue
+        try:
+            fields = json.loads(line)
+        except ValueError as e:
+            yield RawRow(line_no, None, f"invalid JSON: {e}")
+            continue
+        if not isinstance(fields, dict):
+            yield RawRow(line_no, None, "expected a JSON object")
+            continue
+        yield RawRow(line_no, fields)
+
+
+def parse_row(fields: Dict[str, Any]) -> ExpenseImportRow:
+    """Validate one row; blank values count as missing."""
+    return ExpenseImportRow.model_validate({
+        key: value for key, value in fields.items() if value is not None and value != ""
+    })
+
+
+def validation_message(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in e['loc']) or 'row'}: {e['msg']}" for e in error.errors()
+    )
+
+
+def _naive_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+class ExpenseImportService:
+    """Bulk import of expenses from a streamed CSV or JSONL body.
+
+    Rows are validated as they are read and written in batches of
+    batch_size, each batch in its own transaction. A row that fails
+    validation or categorization is reported with its line number and the
+    rest of the import continues; a batch that fails to write is retried
+    row by row, so only the rows the database rejects are reported.
+    """
+
+    def __init__(self, batch_size: int = IMPORT_BATCH_SIZE, max_errors: int = IMPORT_MAX_ERRORS):
+        self.expense_repo = ExpenseRepository()
+        self.batch_size = batch_size
+        self.max_errors = max_errors
+
+    async def import_expenses(self, chunks: AsyncIterator[bytes], fmt: ImportFormat,
+                              categorize: bool = False) -> ExpenseImportResponse:
+        logger.info("Starting expense import", format=fmt, categorize=categorize, batch_size=self.batch_size)
+        rows = iter_csv_rows(chunks) if fmt == "csv" else iter_jsonl_rows(chunks)
+        result = ExpenseImportResponse(imported=0, failed=0)
+        imported_at = datetime.utcnow()
+
+        batch: List[Tuple[int, ExpenseImportRow]] = []
+        async for raw in rows:
+            if raw.error:
+                self._fail(result, raw.line, raw.error)
+                continue
+            try:
+                batch.append((raw.line, parse_row(raw.fields)))
+            except ValidationError as e:
+                self._fail(result, raw.line, validation_message(e))
+                continue
+            if len(batch) >= self.batch_size:
+                await self._write_batch(batch, categorize, imported_at, result)
+                batch = []
+        if batch:
+            await self._write_batch(batch, categorize, imported_at, result)
+
+        logger.info("Expense import finished", imported=result.imported, failed=result.failed,
+                    categorized=result.categorized)
+        return result
+
+    def _fail(self, result: ExpenseImportResponse, line: int, error: str) -> None:
+        result.failed += 1
+        if len(result.errors) < self.max_errors:
+            result.errors.append(ExpenseImportError(line=line, error=error))
+        else:
+            result.errors_truncated = True
+
+    async def _write_batch(self, batch: List[Tuple[int, ExpenseImportRow]], categorize: bool,
+                           imported_at: datetime, result: ExpenseImportResponse) -> None:
+        if categorize:
+            await self._categorize(batch, result)
+
+        ready: List[Tuple[int, Dict[str, Any]]] = []
+        for line, row in batch:
+            if row.category is None:
+                self._fail(result, line, "category is required (or import with categorize=true)")
+            elif not row.amount:
+                self._fail(result, line, "amount is required")
+            elif Decimal(str(row.amount)).quantize(CENTS) > MAX_AMOUNT:
+                # Categorized amounts skip the schema's bound
+                self._fail(result, line, f"amount must be at most {MAX_AMOUNT}")
+            else:
+                ready.append((line, {
+                    "telegram_id": row.telegram_id,
+                    "description": row.description or row.text or row.category,
+                    "amount": Decimal(str(row.amount)).quantize(CENTS),
+                    "category": row.category,
+                    "added_at": _naive_utc(row.added_at) if row.added_at else imported_at,
+                }))
+        if not ready:
+            return
+
+        try:
+            await self.expense_repo.bulk_insert_expenses([values for _, values in ready])
+        except Exception as e:
+            logger.error("Error writing import batch, retrying row by row", rows=len(ready),
+                         first_line=ready[0][0], error=str(e))
+            await self._write_rows(ready, result)
+            return
+        result.imported += len(ready)
+
+    async def _write_rows(self, ready: List[Tuple[int, Dict[str, Any]]], result: ExpenseImportResponse) -> None:
+        """Write a failed batch one row per transaction to single out the bad rows."""
+        for line, values in ready:
+            try:
+                await self.expense_repo.bulk_insert_expenses([values])
+            except Exception as e:
+                self._fail(result, line, f"write failed: {e}")
+                continue
+            result.imported += 1
+
+    async def _categorize(self, batch: List[Tuple[int, ExpenseImportRow]], result: ExpenseImportResponse) -> None:
+        """Fill missing category/amount/description of a batch's rows.
+
+        All rows are submitted at once so the LLM batcher can coalesce them
+        (the rule classifier and the cache answer many without a call).
+        """
+        pending = [row for _, row in batch if row.category is None or not row.amount]
+        texts = [row.text or " ".join(filter(None, [row.description, str(row.amount or "")])) for row in pending]
+        parsed = await asyncio.gather(*(categorize_expense(text) for text in texts), return_exceptions=True)
+        for row, outcome in zip(pending, parsed):
+            if isinstance(outcome, Exception):
+                logger.warning("Could not categorize import row", error=str(outcome))
+                continue
+            category, amount, description = outcome
+            row.category = row.category or category
+            row.amount = row.amount or amount or None
+            row.description = row.description or description
+            result.categorized += 1
@@ -0,0 +1,123 @@
+from app.repositories.ingest import IngestRepository
+from app.repositories.expense import ExpenseRepository
+from app.handlers.langchain_handler import categorize_expense
+from app.schemas.expense import ExpenseIngestRequest, ExpenseIngestResponse
+from app.models.ingest import IngestMessage
+from app.core.config import INGEST_CALLBACK_SECRET, INGEST_CALLBACK_TIMEOUT_SECONDS, INGEST_CALLBACK_URL
+from app.core.logging import get_logger
+from datetime import datetime
+from typing import Optional, Tuple
+import hashlib
+import hmac
+import httpx
+import json
+import time
+
+logger = get_logger(__name__)
+
+class IngestService:
+    def __init__(self):
+        self.ingest_repo = IngestRepository()
+        self.expense_repo = ExpenseRepository()
+
+    async def accept(self, data: ExpenseIngestRequest) -> Tuple[IngestMessage, bool]:
+        """Persist the raw message. Returns (message, created)."""
+        return await self.ingest_repo.create_or_get(
+            telegram_id=data.telegram_id,
+            telegram_message_id=data.telegram_message_id,
+            text=data.text,
+            received_at=data.received_at or datetime.utcnow(),
+            chat_id=data.chat_id,
+        )
+
+    async def get(self, ingest_id: int) -> Optional[IngestMessage]:
+        return await self.ingest_repo.get(ingest_id)
+
+    async def process(self, ingest_id: int) -> Optional[IngestMessage]:
+        """Categorize and store one accepted message.
+
+        Returns None if the message was already claimed or finished by
+        another worker. Errors, LLM failures included (no "Misc" fallback),
+        mark the message failed and are re-raised so the task can retry it.
+        """
+        message = await self.ingest_repo.claim(ingest_id)
+        if message is None:
+            logger.info("Ingest message already claimed or processed", ingest_id=ingest_id)
+            return None
+
+        try:
+            category, amount, description = await categorize_expense(message.text, fallback=False)
+            expense = await self.expense_repo.insert_categorized_expense(
+                message.telegram_id, description, amount, category, message.received_at,
+                ingest_id=message.id, ingest_claimed_at=message.claimed_at
+            )
+        except Exception as e:
+            logger.error("Error processing ingest message", ingest_id=ingest_id, error=str(e))
+            await self.ingest_repo.fail(ingest_id, str(e), claimed_at=message.claimed_at)
+            raise
+
+        logger.info("Ingest message processed", ingest_id=ingest_id, expense_id=expense.id)
+        message = await self.ingest_repo.get(ingest_id)
+        await self.notify(message, expense)
+        return message
+
+    async def notify_failed(self, ingest_id: int) -> None:
+        """Report a message that exhausted its retries to the connector."""
+        await self.notify(await self.ingest_repo.get(ingest_id))
+
+    async def notify(self, message: IngestMessage, expense=None) -> None:
+        """POST the outcome to INGEST_CALLBACK_URL, signed with
+        INGEST_CALLBACK_SECRET, if the message came with a chat_id.
+
+        The URL is configured, never taken from the request, so callers
+        can't make the service POST to arbitrary hosts.
+        """
+        if message is None or not message.chat_id:
+            return
+        if not INGEST_CALLBACK_URL or not INGEST_CALLBACK_SECRET:
+            logger.warning("Ingest callback not configured, skipping", ingest_id=message.id)
+            return
+        payload = {
+            **to_response(message).model_dump(),
+            "chat_id": message.chat_id,
+            "expense": {
+                "id": expense.id,
+                "user_id": expense.user_id,
+                "description": expense.description,
+                "amount": float(expense.amount),
+                "category": expense.category,
+                "telegram_id": message.telegram_id,
+            } if expense is not None else None,
+        }
+        body = json.dumps(payload).encode()
+        timestamp = str(int(time.time()))
+        headers = {
+            "Content-Type": "application/json",
+            "X-Signature-Timestamp": timestamp,
+            "X-Signature": sign_callback(INGEST_CALLBACK_SECRET, timestamp, body),
+        }
+        try:
+            async with httpx.AsyncClient(timeout=INGEST_CALLBACK_TIMEOUT_SECONDS) as client:
+                response = await client.post(INGEST_CALLBACK_URL, content=body, headers=headers)
+                response.raise_for_status()
+            logger.info("Ingest callback delivered", ingest_id=message.id)
+        except Exception as e:
+            logger.warning("Ingest callback failed", ingest_id=message.id, error=str(e))
+
+
+def sign_callback(secret: str, timestamp: str, body: bytes) -> str:
+    """HMAC-SHA256 of "<timestamp>.<body>", as checked by the connector."""
+    digest = hmac.new(secret.encode(), timestamp.encode() + b"." + body, hashlib.sha256).hexdigest()
+    return f"sha256={digest}"
+
+
+def to_response(message: IngestMessage, duplicate: bool = False) -> ExpenseIngestResponse:
+    return ExpenseIngestResponse(
+        ingest_id=message.id,
+        status=message.status,
+        telegram_id=message.telegram_id,
+        telegram_message_id=message.telegram_message_id,
+        expense_id=message.expense_id,
+        error=message.error,
+        duplicate=duplicate,
+    )
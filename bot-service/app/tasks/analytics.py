@@ -1,9 +1,13 @@
 from app.services.analytics import AnalyticsService
-from app.schemas.analytics import AnalyticsRequest
+from app.schemas.analytics import AnalyticsRequest, BulkAnalyticsRequest
+from app.repositories.analytics import AnalyticsRepository
 from app.core.celery_worker import celery_app
+from app.core.worker_loop import worker_loop
 from app.core.logging import get_logger
-import asyncio
-from typing import Dict, Any
+from app.handlers import task_events  # noqa: F401  (publishes task state changes)
+from celery import chord, group
+from datetime import date
+from typing import Dict, Any, List, Optional
 
 logger = get_logger(__name__)
 
@@ -18,19 +22,86 @@ def run_analytics_task(self, payload: Dict[str, Any]) -> Dict[str, Any]:
     try:
         service = AnalyticsService()
         request = AnalyticsRequest(**payload)
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        
-        try:
-            result = loop.run_until_complete(service.get_expense_analytics(request))
-            result_dict = result.model_dump()
-            
-            logger.info("Analytics task completed successfully", task_id=task_id)
-            return result_dict
-            
-        finally:
-            loop.close()
-            
+        result = worker_loop.run("run_analytics_task", lambda: service.get_expense_analytics(request))
+        result_dict = result.model_dump()
+
+        logger.info("Analytics task completed successfully", task_id=task_id)
+        return result_dict
+
     except Exception as e:
         logger.error("Analytics task failed", task_id=task_id, error=str(e))
         raise self.retry(exc=e, countdown=60, max_retries=3)
+
+
+def _parse_date(value: Optional[str]) -> Optional[date]:
+    return date.fromisoformat(value) if value else None
+
+
+@celery_app.task(name="run_bulk_analytics_task", bind=True)
+def run_bulk_analytics_task(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Celery task to compute analytics for many users: splits them into chunks
+    of chunk_size and fans the chunks out as a chord across the workers
+    """
+    task_id = self.request.id
+    request = BulkAnalyticsRequest(**payload)
+    logger.info("Starting bulk analytics task", task_id=task_id, chunk_size=request.chunk_size,
+                users="all" if request.user_ids == "all" else len(request.user_ids))
+
+    user_ids = request.user_ids
+    if user_ids == "all":
+        user_ids = worker_loop.run("run_bulk_analytics_task", AnalyticsRepository().get_user_ids)
+    chunks = [user_ids[i:i + request.chunk_size] for i in range(0, len(user_ids), request.chunk_size)]
+    if not chunks:
+        return {"users": 0, "chunks": 0, "chord_id": None}
+
+    dates = {
+        "start_date": request.start_date.isoformat() if request.start_date else None,
+        "end_date": request.end_date.isoformat() if request.end_date else None,
+    }
+    header = group(run_analytics_chunk_task.s(chunk, **dates) for chunk in chunks)
+    chord_result = chord(header)(summarize_bulk_analytics_task.s())
+
+    logger.info("Bulk analytics chunks submitted", task_id=task_id, users=len(user_ids), chunks=len(chunks),
+                chord_id=chord_result.id)
+    return {"users": len(user_ids), "chunks": len(chunks), "chord_id": chord_result.id}
+
+
+@celery_app.task(name="run_analytics_chunk_task", bind=True)
+def run_analytics_chunk_task(self, user_ids: List[str], start_date: Optional[str] = None,
+                             end_date: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Celery task to compute and cache the analytics of one chunk of users
+    """
+    task_id = self.request.id
+    logger.info("Starting analytics chunk task", task_id=task_id, users=len(user_ids))
+
+    try:
+        service = AnalyticsService()
+        results = worker_loop.run("run_analytics_chunk_task", lambda: service.get_bulk_analytics(
+            user_ids, _parse_date(start_date), _parse_date(end_date)
+        ))
+        active = sum(1 for result in results.values() if result.category_breakdown)
+        total = sum(result.total_expenses for result in results.values())
+
+        logger.info("Analytics chunk task completed", task_id=task_id, users=len(results), active_users=active)
+        return {"users": len(results), "active_users": active, "total_expenses": round(total, 2)}
+
+    except Exception as e:
+        logger.error("Analytics chunk task failed", task_id=task_id, error=str(e))
+        raise self.retry(exc=e, countdown=60, max_retries=3)
+
+
+@celery_app.task(name="summarize_bulk_analytics_task")
+def summarize_bulk_analytics_task(chunks: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Chord callback: totals over every chunk of a bulk analytics run
+    """
+    summary = {
+        "chunks": len(chunks),
+        "users": sum(chunk["users"] for chunk in chunks),
+        "active_users": sum(chunk["active_users"] for chunk in chunks),
+        "total_expenses": round(sum(chunk["total_expenses"] for chunk in chunks), 2),
+    }
+    logger.info("Bulk analytics completed", **summary)
+    return summary
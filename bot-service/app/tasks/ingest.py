@@ -0,0 +1,31 @@
+from app.services.ingest import IngestService
+from app.core.celery_worker import celery_app
+from app.core.config import INGEST_MAX_RETRIES
+from app.core.worker_loop import worker_loop
+from app.core.logging import get_logger
+from typing import Dict, Any
+
+logger = get_logger(__name__)
+
+@celery_app.task(name="process_ingest_message", bind=True, max_retries=INGEST_MAX_RETRIES)
+def process_ingest_message(self, ingest_id: int) -> Dict[str, Any]:
+    """
+    Celery task to categorize and store an accepted expense message
+    """
+    task_id = self.request.id
+    logger.info("Starting ingest task", task_id=task_id, ingest_id=ingest_id)
+
+    service = IngestService()
+    try:
+        message = worker_loop.run("process_ingest_message", lambda: service.process(ingest_id))
+    except Exception as e:
+        logger.error("Ingest task failed", task_id=task_id, ingest_id=ingest_id, error=str(e))
+        if self.request.retries >= self.max_retries:
+            worker_loop.run("process_ingest_message", lambda: service.notify_failed(ingest_id))
+            raise
+        raise self.retry(exc=e, countdown=2 ** self.request.retries * 5)
+
+    if message is None:
+        return {"ingest_id": ingest_id, "status": "skipped"}
+    logger.info("Ingest task completed successfully", task_id=task_id, ingest_id=ingest_id)
+    return {"ingest_id": ingest_id, "status": message.status, "expense_id": message.expense_id}
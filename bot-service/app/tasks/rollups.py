@@ -0,0 +1,41 @@
+"""Rebuild expense_rollups from expenses.
+
+Runs as the backfill_expense_rollups Celery task, or from the command line:
+
+    python -m app.tasks.rollups [--user-id USER_ID]
+"""
+from app.repositories.rollup import RollupRepository
+from app.core.celery_worker import celery_app
+from app.core.db import engine
+from app.core.worker_loop import worker_loop
+from app.core.logging import get_logger
+import argparse
+import asyncio
+from typing import Dict, Any, Optional
+
+logger = get_logger(__name__)
+
+@celery_app.task(name="backfill_expense_rollups", bind=True)
+def backfill_expense_rollups(self, user_id: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Celery task to rebuild the rollups of one user (or everyone)
+    """
+    task_id = self.request.id
+    logger.info("Starting rollup backfill task", task_id=task_id, user_id=user_id)
+
+    rows = worker_loop.run("backfill_expense_rollups", lambda: RollupRepository().backfill(user_id))
+    logger.info("Rollup backfill task completed", task_id=task_id, rows=rows)
+    return {"user_id": user_id, "rows": rows}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild expense_rollups from expenses")
+    parser.add_argument("--user-id", default=None, help="Only rebuild this user's rollups")
+    args = parser.parse_args()
+
+    async def main():
+        rows = await RollupRepository().backfill(args.user_id)
+        await engine.dispose()
+        print(f"expense_rollups rebuilt: {rows} rows")
+
+    asyncio.run(main())
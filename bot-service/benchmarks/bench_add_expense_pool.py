@@ -0,0 +1,126 @@
+"""Pool occupancy and latency of the expense write path under a slow LLM.
+
+Compares the previous write path (categorization awaited inside the open
+session) against the current pipeline (categorize first, then one short
+transaction) on an engine with a deliberately small pool.
+
+    python -m benchmarks.bench_add_expense_pool --requests 200 --llm-latency-ms 300
+"""
+import argparse
+import asyncio
+import time
+from datetime import datetime
+from unittest.mock import patch
+
+from benchmarks.common import PoolOccupancy, emit, latency_summary
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.core.config import DATABASE_URL
+from app.models.base import Base
+from app.models.expense import Expense
+from app.models.user import User
+from app.repositories.expense import ExpenseRepository
+import app.repositories.expense as expense_repository
+
+TELEGRAM_ID = "bench-user"
+
+
+def slow_llm(latency: float):
+    async def categorize(text: str):
+        await asyncio.sleep(latency)
+        return "Food", 10.0, text
+    return categorize
+
+
+async def legacy_add_expense(session_factory, categorize, telegram_id: str, text: str):
+    """The write path as it was: the LLM is awaited while the session is open."""
+    async with session_factory() as session:
+        result = await session.execute(select(User).where(User.telegram_id == telegram_id))
+        user = result.scalar_one_or_none()
+        if not user:
+            user = User(id=telegram_id, telegram_id=telegram_id)
+            session.add(user)
+            await session.commit()
+            await session.refresh(user)
+        category, amount, description = await categorize(text)
+        expense = Expense(user_id=user.id, description=description, amount=amount,
+                          category=category, added_at=datetime.utcnow())
+        session.add(expense)
+        await session.commit()
+        return expense
+
+
+async def run_mode(mode: str, args) -> dict:
+    engine = create_async_engine(
+        DATABASE_URL,
+        poolclass=AsyncAdaptedQueuePool,
+        pool_size=args.pool_size,
+        max_overflow=0,
+        pool_timeout=args.pool_timeout,
+    )
+    session_factory = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    async with session_factory() as session:
+        session.add(User(id=TELEGRAM_ID, telegram_id=TELEGRAM_ID))
+        await session.commit()
+
+    categorize = slow_llm(args.llm_latency_ms / 1000)
+    repo = ExpenseRepository()
+    semaphore = asyncio.Semaphore(args.concurrency)
+    latencies, errors = [], 0
+
+    async def one(i: int):
+        nonlocal errors
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                if mode == "legacy":
+                    result = await legacy_add_expense(session_factory, categorize, TELEGRAM_ID, f"item {i}")
+                else:
+                    result = await repo.add_expense(None, None, None, None, TELEGRAM_ID, f"item {i}")
+                if result is None:
+                    errors += 1
+            except Exception:
+                errors += 1
+            latencies.append(time.perf_counter() - started)
+
+    with patch.object(expense_repository, "AsyncSessionLocal", session_factory), \
+            patch.object(expense_repository, "categorize_expense", categorize), \
+            PoolOccupancy(engine) as occupancy:
+        started = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(args.requests)))
+        elapsed = time.perf_counter() - started
+
+    await engine.dispose()
+    return {
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(args.requests / elapsed, 2),
+        "errors": errors,
+        "latency": latency_summary(latencies),
+        "pool": occupancy.summary(),
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--llm-latency-ms", type=float, default=300)
+    parser.add_argument("--pool-size", type=int, default=5)
+    parser.add_argument("--pool-timeout", type=float, default=5)
+    parser.add_argument("--mode", choices=["legacy", "pipeline", "both"], default="both")
+    args = parser.parse_args()
+
+    modes = ["legacy", "pipeline"] if args.mode == "both" else [args.mode]
+    results = {mode: await run_mode(mode, args) for mode in modes}
+    emit("add_expense_pool", {"params": vars(args), "results": results})
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
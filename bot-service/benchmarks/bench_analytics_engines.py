@@ -0,0 +1,71 @@
+"""Latency of the analytics engines: SQL snapshot, rollups and in-memory NumPy.
+
+Seeds one user with N expenses spread over two years (same data as
+bench_analytics_query), then times the snapshot over expenses, over
+expense_rollups, and from VectorAnalyticsEngine, both cold (columns loaded
+on every call) and warm (columns already in memory). "vector_full" adds the
+percentiles and rolling means only the vector engine computes.
+
+    python -m benchmarks.bench_analytics_engines --sizes 10000 100000 1000000 --repeat 20
+"""
+import argparse
+import asyncio
+import time
+from datetime import date
+
+from benchmarks.bench_analytics_query import USER_ID, seed
+from benchmarks.common import emit, latency_summary
+
+from app.core.db import engine
+from app.handlers.vector_analytics import VectorAnalyticsEngine
+from app.repositories.analytics import AnalyticsRepository
+
+
+async def measure(fn, repeat: int) -> dict:
+    await fn()  # warm-up
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await fn()
+        samples.append(time.perf_counter() - started)
+    return latency_summary(samples)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    repo = AnalyticsRepository(use_rollups=False)
+    rollup_repo = AnalyticsRepository(use_rollups=True)
+    vector = VectorAnalyticsEngine(max_users=1, ttl=float("inf"))
+    start, end = date(2024, 1, 1), date(2024, 6, 30)
+    month = end.replace(day=1)
+
+    async def vector_cold():
+        vector.clear()
+        await vector.get_analytics_snapshot(USER_ID, start, end, month)
+
+    async def vector_full():
+        await vector.get_analytics_snapshot(USER_ID, start, end, month)
+        await vector.get_distribution(USER_ID, start, end)
+
+    results = {}
+    for size in args.sizes:
+        await seed(size)
+        vector.clear()
+        results[size] = {
+            "sql": await measure(lambda: repo.get_analytics_snapshot(USER_ID, start, end, month), args.repeat),
+            "rollups": await measure(lambda: rollup_repo.get_analytics_snapshot(USER_ID, start, end, month), args.repeat),
+            "vector_cold": await measure(vector_cold, max(1, args.repeat // 4)),
+            "vector_warm": await measure(lambda: vector.get_analytics_snapshot(USER_ID, start, end, month), args.repeat),
+            "vector_full": await measure(vector_full, args.repeat),
+            "vector_memory": vector.metrics()["bytes"],
+        }
+    await engine.dispose()
+    emit("analytics_engines", {"params": vars(args), "results": results})
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
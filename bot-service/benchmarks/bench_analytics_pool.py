@@ -0,0 +1,130 @@
+"""Connection growth under repeated GET /api/analytics/sync calls.
+
+Compares the previous analytics repository (a new engine, and so a new pool,
+per query) against the shared engine. The shared mode runs on a QueuePool
+configured from the DB_POOL_* settings, so connections opened should stay
+flat from round to round while the legacy mode grows with every request.
+
+    python -m benchmarks.bench_analytics_pool --rounds 5 --requests 50
+"""
+import argparse
+import asyncio
+import time
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+from benchmarks.common import PoolOccupancy, emit, latency_summary
+
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.core.config import DATABASE_URL, DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT
+from app.main import app
+from app.models.base import Base
+from app.models.expense import Expense
+from app.models.user import User
+import app.repositories.analytics as analytics_repository
+
+USER_ID = "bench-user"
+
+
+class LegacySessionFactory:
+    """Mimics get_new_async_session(): one engine per session, never disposed."""
+
+    def __init__(self):
+        self.engines = []
+        self.connections_opened = 0
+
+    def _count(self, *args):
+        self.connections_opened += 1
+
+    def __call__(self):
+        engine = create_async_engine(DATABASE_URL, echo=False)
+        event.listen(engine.sync_engine, "connect", self._count)
+        self.engines.append(engine)
+        return sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)()
+
+    async def dispose(self):
+        for engine in self.engines:
+            await engine.dispose()
+
+
+async def seed(session_factory, expenses: int):
+    async with session_factory() as session:
+        session.add(User(id=USER_ID, telegram_id=USER_ID))
+        start = datetime.utcnow() - timedelta(days=90)
+        session.add_all(
+            Expense(user_id=USER_ID, description=f"item {i}", amount=10 + i % 50,
+                    category=["Food", "Transportation", "Housing"][i % 3],
+                    added_at=start + timedelta(minutes=i * 7))
+            for i in range(expenses)
+        )
+        await session.commit()
+
+
+async def run_mode(mode: str, args) -> dict:
+    engine = create_async_engine(
+        DATABASE_URL,
+        poolclass=AsyncAdaptedQueuePool,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+    )
+    shared = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    await seed(shared, args.expenses)
+
+    legacy = LegacySessionFactory()
+    factory = legacy if mode == "legacy" else shared
+    semaphore = asyncio.Semaphore(args.concurrency)
+    latencies, errors, rounds = [], 0, []
+
+    async def one(client: AsyncClient):
+        nonlocal errors
+        async with semaphore:
+            started = time.perf_counter()
+            response = await client.get(f"/api/analytics/sync?user_id={USER_ID}")
+            latencies.append(time.perf_counter() - started)
+            if response.status_code != 200:
+                errors += 1
+
+    transport = ASGITransport(app=app)
+    with patch.object(analytics_repository, "AsyncSessionLocal", factory), \
+            PoolOccupancy(engine) as occupancy:
+        async with AsyncClient(transport=transport, base_url="http://bench") as client:
+            for _ in range(args.rounds):
+                await asyncio.gather(*(one(client) for _ in range(args.requests)))
+                opened = legacy.connections_opened if mode == "legacy" else occupancy.connects
+                rounds.append({"connections_opened": opened, "engines": len(legacy.engines) or 1})
+
+    await legacy.dispose()
+    await engine.dispose()
+    return {
+        "errors": errors,
+        "latency": latency_summary(latencies),
+        "rounds": rounds,
+        "pool": occupancy.summary() if mode == "shared" else None,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--expenses", type=int, default=1000)
+    parser.add_argument("--mode", choices=["legacy", "shared", "both"], default="both")
+    args = parser.parse_args()
+
+    modes = ["legacy", "shared"] if args.mode == "both" else [args.mode]
+    results = {mode: await run_mode(mode, args) for mode in modes}
+    emit("analytics_pool", {"params": vars(args), "results": results})
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,100 @@
+"""Latency of the analytics read path: per-metric queries vs the single snapshot.
+
+Seeds one user with N expenses spread over two years, then times the previous
+AnalyticsService path (summary, total, averages and the two month totals as
+separate queries) against AnalyticsRepository.get_analytics_snapshot, both
+over expenses and over the expense_rollups table.
+
+    python -m benchmarks.bench_analytics_query --sizes 10000 100000 1000000 --repeat 20
+"""
+import argparse
+import asyncio
+import time
+from datetime import date, datetime, timedelta
+
+from benchmarks.common import emit, latency_summary
+
+from dateutil.relativedelta import relativedelta
+from sqlalchemy import insert
+
+from app.core.db import AsyncSessionLocal, engine
+from app.models.base import Base
+from app.models.expense import Expense
+from app.models.user import User
+from app.repositories.analytics import AnalyticsRepository
+from app.repositories.rollup import RollupRepository
+
+USER_ID = "bench-user"
+CATEGORIES = ["Food", "Transportation", "Housing", "Utilities", "Entertainment", "Health", "Other"]
+START = datetime(2023, 1, 1)
+CHUNK = 10000
+
+
+async def seed(size: int):
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(insert(User), [{"id": USER_ID, "telegram_id": USER_ID}])
+        span = 730 * 24 * 60
+        for offset in range(0, size, CHUNK):
+            await conn.execute(insert(Expense), [
+                {
+                    "user_id": USER_ID,
+                    "description": f"item {i}",
+                    "amount": 5 + i % 200,
+                    "category": CATEGORIES[i % len(CATEGORIES)],
+                    "added_at": START + timedelta(minutes=i * span // size),
+                }
+                for i in range(offset, min(offset + CHUNK, size))
+            ])
+    await RollupRepository().backfill()
+
+
+async def legacy(repo: AnalyticsRepository, start: date, end: date):
+    current_month = end.replace(day=1)
+    await repo.get_expenses_summary(USER_ID, start, end)
+    await repo.get_total_expenses(USER_ID, start, end)
+    await repo.get_average_by_category(USER_ID, start, end)
+    await repo.get_monthly_variation(USER_ID, current_month, current_month - relativedelta(months=1))
+
+
+async def snapshot(repo: AnalyticsRepository, start: date, end: date):
+    await repo.get_analytics_snapshot(USER_ID, start, end, end.replace(day=1))
+
+
+async def measure(fn, repo, start, end, repeat: int) -> dict:
+    await fn(repo, start, end)  # warm-up
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await fn(repo, start, end)
+        samples.append(time.perf_counter() - started)
+    return latency_summary(samples)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    repo = AnalyticsRepository(use_rollups=False)
+    rollup_repo = AnalyticsRepository(use_rollups=True)
+    start, end = date(2024, 1, 1), date(2024, 6, 30)
+    results = {}
+    for size in args.sizes:
+        started = time.perf_counter()
+        await seed(size)
+        seed_s = time.perf_counter() - started
+        results[size] = {
+            "seed_s": round(seed_s, 2),
+            "legacy": await measure(legacy, repo, start, end, args.repeat),
+            "snapshot": await measure(snapshot, repo, start, end, args.repeat),
+            "rollups": await measure(snapshot, rollup_repo, start, end, args.repeat),
+        }
+    await engine.dispose()
+    emit("analytics_query", {"params": vars(args), "results": results})
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,84 @@
+"""Nightly analytics for every user: one snapshot per user vs grouped chunks.
+
+Seeds U users with E expenses each, then times computing everyone's
+analytics the way one run_analytics_task per user does (a snapshot query
+per user) against AnalyticsService.get_bulk_analytics over chunks of
+--chunk-size users (one GROUP BY user_id, category query per chunk), both
+over expense_rollups.
+
+    python -m benchmarks.bench_bulk_analytics --users 2000 --expenses 50 --chunk-size 500
+"""
+import argparse
+import asyncio
+import time
+from datetime import date, datetime, timedelta
+
+from benchmarks.common import emit
+
+from sqlalchemy import insert
+
+from app.core.db import engine
+from app.handlers.analytics_cache import analytics_cache
+from app.models.base import Base
+from app.models.expense import Expense
+from app.models.user import User
+from app.repositories.rollup import RollupRepository
+from app.schemas.analytics import AnalyticsRequest
+from app.services.analytics import AnalyticsService
+
+CATEGORIES = ["Food", "Transportation", "Housing", "Utilities", "Entertainment", "Health", "Other"]
+START = datetime(2024, 1, 1)
+
+
+async def seed(users: int, expenses: int):
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(insert(User), [{"id": f"u{u}", "telegram_id": f"u{u}"} for u in range(users)])
+        for u in range(users):
+            await conn.execute(insert(Expense), [
+                {
+                    "user_id": f"u{u}",
+                    "description": f"item {i}",
+                    "amount": 5 + (u + i) % 200,
+                    "category": CATEGORIES[i % len(CATEGORIES)],
+                    "added_at": START + timedelta(hours=i * 4380 // expenses),
+                }
+                for i in range(expenses)
+            ])
+    await RollupRepository().backfill()
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--expenses", type=int, default=50)
+    parser.add_argument("--chunk-size", type=int, default=500)
+    args = parser.parse_args()
+
+    await seed(args.users, args.expenses)
+    analytics_cache.enabled = False
+    service = AnalyticsService()
+    user_ids = [f"u{u}" for u in range(args.users)]
+    start, end = date(2024, 1, 1), date(2024, 6, 30)
+
+    started = time.perf_counter()
+    for user_id in user_ids:
+        await service.get_expense_analytics(AnalyticsRequest(user_id=user_id, start_date=start, end_date=end))
+    per_user_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for i in range(0, len(user_ids), args.chunk_size):
+        await service.get_bulk_analytics(user_ids[i:i + args.chunk_size], start, end)
+    bulk_s = time.perf_counter() - started
+
+    await engine.dispose()
+    emit("bulk_analytics", {"params": vars(args), "results": {
+        "per_user_s": round(per_user_s, 3),
+        "bulk_s": round(bulk_s, 3),
+        "speedup": round(per_user_s / bulk_s, 1) if bulk_s else None,
+    }})
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,96 @@
+"""Memory and throughput of the streaming export vs loading every row.
+
+Seeds N expenses, then exports them as CSV through ExpenseExportService
+(server-side cursor, batch by batch) and, for comparison, the way a client
+has to do it today: materialize every row with scalars().all() and encode
+the whole list. Peak Python memory is measured with tracemalloc.
+
+    python -m benchmarks.bench_expense_export --sizes 100000 1000000 --format csv
+"""
+import argparse
+import asyncio
+import csv
+import io
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from benchmarks.common import emit
+
+from sqlalchemy import insert, select
+
+from app.core.db import AsyncSessionLocal, engine
+from app.models.base import Base
+from app.models.expense import Expense
+from app.models.user import User
+from app.services.expense_export import ExpenseExportService
+
+USER_ID = "bench-user"
+START = datetime(2020, 1, 1)
+CHUNK = 10000
+
+
+async def seed(size: int):
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(insert(User), [{"id": USER_ID, "telegram_id": USER_ID}])
+        for offset in range(0, size, CHUNK):
+            await conn.execute(insert(Expense), [
+                {
+                    "user_id": USER_ID,
+                    "description": f"item {i}",
+                    "amount": 5 + i % 200,
+                    "category": "Other",
+                    "added_at": START + timedelta(minutes=i),
+                }
+                for i in range(offset, min(offset + CHUNK, size))
+            ])
+
+
+async def streaming(fmt: str, gzip: bool) -> int:
+    written = 0
+    async for chunk in ExpenseExportService().export(fmt, gzip=gzip, user_id=USER_ID):
+        written += len(chunk)
+    return written
+
+
+async def materialized(fmt: str, gzip: bool) -> int:
+    async with AsyncSessionLocal() as session:
+        expenses = (await session.execute(select(Expense).where(Expense.user_id == USER_ID))).scalars().all()
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerows((e.id, e.user_id, e.description, e.amount, e.category, e.added_at.isoformat()) for e in expenses)
+    return len(buffer.getvalue().encode())
+
+
+async def measure(fn, fmt: str, gzip: bool) -> dict:
+    tracemalloc.start()
+    started = time.perf_counter()
+    size = await fn(fmt, gzip)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"seconds": round(elapsed, 2), "bytes": size, "peak_mib": round(peak / 2 ** 20, 1)}
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100000, 1000000])
+    parser.add_argument("--format", choices=["csv", "ndjson", "parquet"], default="csv")
+    parser.add_argument("--gzip", action="store_true")
+    args = parser.parse_args()
+
+    results = {}
+    for size in args.sizes:
+        await seed(size)
+        results[size] = {
+            "streaming": await measure(streaming, args.format, args.gzip),
+            "materialized_csv": await measure(materialized, args.format, args.gzip),
+        }
+    await engine.dispose()
+    emit("expense_export", {"params": vars(args), "results": results})
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,86 @@
+"""Throughput of the bulk import against one insert per expense.
+
+Streams a generated CSV of N rows (spread over a few hundred users) through
+ExpenseImportService in 64 KiB chunks, and times the per-row write path
+(ExpenseRepository.insert_categorized_expense, already categorized, so no
+LLM) on a sample of --sample rows for comparison.
+
+    python -m benchmarks.bench_expense_import --rows 1000000 --batch-size 5000 --sample 2000
+"""
+import argparse
+import asyncio
+import time
+from datetime import datetime, timedelta
+
+from benchmarks.common import emit
+
+from app.core.db import engine
+from app.models.base import Base
+from app.repositories.expense import ExpenseRepository
+from app.services.expense_import import ExpenseImportService
+
+USERS = 500
+CATEGORIES = ["Food", "Transportation", "Housing", "Utilities", "Entertainment", "Health", "Other"]
+START = datetime(2022, 1, 1)
+CHUNK_BYTES = 64 * 1024
+
+
+async def csv_body(rows: int):
+    """The CSV file as a stream of byte chunks, like request.stream()."""
+    buffer = ["telegram_id,description,amount,category,added_at\n"]
+    size = len(buffer[0])
+    for i in range(rows):
+        line = (f"user-{i % USERS},item {i},{5 + i % 200}.{i % 100:02d},{CATEGORIES[i % len(CATEGORIES)]},"
+                f"{(START + timedelta(minutes=i)).isoformat()}\n")
+        buffer.append(line)
+        size += len(line)
+        if size >= CHUNK_BYTES:
+            yield "".join(buffer).encode()
+            buffer, size = [], 0
+    if buffer:
+        yield "".join(buffer).encode()
+
+
+async def reset():
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--sample", type=int, default=2000, help="rows written one by one for the baseline")
+    args = parser.parse_args()
+
+    await reset()
+    repo = ExpenseRepository()
+    started = time.perf_counter()
+    for i in range(args.sample):
+        await repo.insert_categorized_expense(f"user-{i % USERS}", f"item {i}", 10, "Food", START + timedelta(minutes=i))
+    per_row_s = time.perf_counter() - started
+
+    await reset()
+    service = ExpenseImportService(batch_size=args.batch_size)
+    started = time.perf_counter()
+    result = await service.import_expenses(csv_body(args.rows), "csv")
+    bulk_s = time.perf_counter() - started
+    await engine.dispose()
+
+    per_row_rate = args.sample / per_row_s
+    emit("expense_import", {
+        "params": vars(args),
+        "per_row": {"rows": args.sample, "seconds": round(per_row_s, 2), "rows_per_s": round(per_row_rate)},
+        "bulk": {
+            "rows": result.imported,
+            "failed": result.failed,
+            "seconds": round(bulk_s, 2),
+            "rows_per_s": round(result.imported / bulk_s),
+        },
+        "projected_per_row_seconds_for_bulk_size": round(args.rows / per_row_rate),
+    })
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
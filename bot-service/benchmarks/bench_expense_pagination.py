@@ -0,0 +1,99 @@
+"""Page latency of the expense listing: OFFSET vs keyset cursor.
+
+Seeds N expenses across a few users, then times one page read at increasing
+depths with the old offset(skip).limit(limit) query against
+ExpenseRepository.list_expenses resuming from a cursor at the same position.
+Offset pages get slower with depth; cursor pages should stay flat.
+
+    python -m benchmarks.bench_expense_pagination --size 1000000 --depths 0 10000 100000 999000
+"""
+import argparse
+import asyncio
+import time
+from datetime import datetime, timedelta
+
+from benchmarks.common import emit, latency_summary
+
+from sqlalchemy import insert, select
+
+from app.core.db import AsyncSessionLocal, engine
+from app.models.base import Base
+from app.models.expense import Expense
+from app.models.user import User
+from app.repositories.expense import ExpenseRepository, encode_expense_cursor, expense_response_query
+
+USERS = [f"bench-user-{i}" for i in range(10)]
+START = datetime(2023, 1, 1)
+CHUNK = 10000
+
+
+async def seed(size: int):
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(insert(User), [{"id": u, "telegram_id": u} for u in USERS])
+        for offset in range(0, size, CHUNK):
+            await conn.execute(insert(Expense), [
+                {
+                    "user_id": USERS[i % len(USERS)],
+                    "description": f"item {i}",
+                    "amount": 5 + i % 200,
+                    "category": "Other",
+                    "added_at": START + timedelta(seconds=i * 30),
+                }
+                for i in range(offset, min(offset + CHUNK, size))
+            ])
+
+
+async def cursor_at(depth: int) -> str:
+    """Cursor a client would hold after reading `depth` rows."""
+    if depth == 0:
+        return None
+    async with AsyncSessionLocal() as session:
+        row = (await session.execute(
+            select(Expense.added_at, Expense.id).order_by(Expense.added_at, Expense.id).offset(depth - 1).limit(1)
+        )).one()
+    return encode_expense_cursor("date_asc", row.added_at, row.id)
+
+
+async def offset_page(depth: int, limit: int):
+    async with AsyncSessionLocal() as session:
+        await session.execute(expense_response_query().order_by(Expense.added_at, Expense.id).offset(depth).limit(limit))
+
+
+async def measure(fn, repeat: int) -> dict:
+    await fn()  # warm-up
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await fn()
+        samples.append(time.perf_counter() - started)
+    return latency_summary(samples)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=1000000)
+    parser.add_argument("--depths", type=int, nargs="+", default=[0, 10000, 100000, 999000])
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    await seed(args.size)
+    seed_s = time.perf_counter() - started
+
+    repo = ExpenseRepository()
+    results = {}
+    for depth in args.depths:
+        cursor = await cursor_at(depth)
+        results[depth] = {
+            "offset": await measure(lambda: offset_page(depth, args.limit), args.repeat),
+            "cursor": await measure(lambda: repo.list_expenses(limit=args.limit, cursor=cursor), args.repeat),
+        }
+    await engine.dispose()
+    emit("expense_pagination", {"params": vars(args), "seed_s": round(seed_s, 2), "results": results})
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
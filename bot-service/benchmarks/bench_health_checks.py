@@ -0,0 +1,108 @@
+"""Health probes vs the requests served next to them.
+
+Simulates the Celery broadcast taking --broadcast-ms (no broker needed) and
+fires orchestrator probes at /health/ while --clients keep calling
+/health/live until the probes are done.
+The "inline" mode reproduces the previous handler, which ran the blocking
+broadcast inside the async route and so stalled every in-flight request;
+"monitor" answers from the background health monitor.
+
+    python -m benchmarks.bench_health_checks --probes 20 --clients 20 --broadcast-ms 500
+"""
+import argparse
+import asyncio
+import time
+from unittest.mock import MagicMock, patch
+
+from benchmarks.common import emit, latency_summary
+
+from fastapi import APIRouter
+from httpx import ASGITransport, AsyncClient
+
+from app.handlers.health_monitor import HealthMonitor
+from app.main import app
+
+legacy = APIRouter()
+
+
+@legacy.get("/bench/inline-health")
+async def inline_health_check():
+    # What routes/health.health_check used to do: a blocking broadcast per request
+    replies = app.state.bench_celery.control.inspect().ping()
+    return {"status": "healthy" if replies else "degraded"}
+
+
+app.include_router(legacy)
+
+
+def fake_celery(broadcast_ms: float) -> MagicMock:
+    def ping():
+        time.sleep(broadcast_ms / 1000)
+        return {"worker1": {"ok": "pong"}}
+
+    celery_app = MagicMock()
+    celery_app.control.inspect.return_value.ping.side_effect = ping
+    return celery_app
+
+
+async def run_mode(mode: str, args) -> dict:
+    probe_path = "/bench/inline-health" if mode == "inline" else "/health/"
+    probe_latencies, request_latencies = [], []
+
+    async def timed(client: AsyncClient, path: str, samples: list):
+        started = time.perf_counter()
+        await client.get(path)
+        samples.append(time.perf_counter() - started)
+
+    async def probes(client: AsyncClient):
+        for _ in range(args.probes):
+            await timed(client, probe_path, probe_latencies)
+            await asyncio.sleep(args.probe_interval_ms / 1000)
+
+    async def requests(client: AsyncClient, done: asyncio.Future):
+        # Latency from when the request was due, so time spent waiting on a
+        # blocked loop to even send it counts
+        due = time.perf_counter()
+        while not done.done():
+            await asyncio.sleep(max(0.0, due - time.perf_counter()))
+            await client.get("/health/live")
+            request_latencies.append(time.perf_counter() - due)
+            due += args.request_interval_ms / 1000
+
+    monitor = HealthMonitor(interval=args.probe_interval_ms / 1000, timeout=args.broadcast_ms / 1000 * 2)
+    app.state.bench_celery = fake_celery(args.broadcast_ms)
+    started = time.perf_counter()
+    with patch("app.handlers.health_monitor.celery_app", app.state.bench_celery), \
+            patch("app.routes.health.health_monitor", monitor):
+        if mode == "monitor":
+            monitor.start()
+            await monitor.probe()
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench") as client:
+            done = asyncio.ensure_future(probes(client))
+            await asyncio.gather(done, *(requests(client, done) for _ in range(args.clients)))
+        await monitor.stop()
+    return {
+        "elapsed_s": round(time.perf_counter() - started, 3),
+        "probe_latency": latency_summary(probe_latencies),
+        "request_latency": latency_summary(request_latencies),
+        "probes_run": monitor.probes,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--probes", type=int, default=20)
+    parser.add_argument("--probe-interval-ms", type=float, default=100)
+    parser.add_argument("--clients", type=int, default=20)
+    parser.add_argument("--request-interval-ms", type=float, default=10)
+    parser.add_argument("--broadcast-ms", type=float, default=500)
+    parser.add_argument("--mode", choices=["inline", "monitor", "both"], default="both")
+    args = parser.parse_args()
+
+    modes = ["inline", "monitor"] if args.mode == "both" else [args.mode]
+    results = {mode: await run_mode(mode, args) for mode in modes}
+    emit("health_checks", {"params": vars(args), "results": results})
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
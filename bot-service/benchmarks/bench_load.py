@@ -0,0 +1,274 @@
+"""Load test of the bot-service with a realistic Telegram message mix.
+
+Seeds --users users with a year of expenses, starts benchmarks.stub_groq
+(or uses --groq-base-url) so categorization never reaches the real API,
+and runs the app in-process over ASGI with --concurrency closed-loop
+clients for --duration seconds. Each client picks an action from --mix:
+POST /api/expenses (the connector's payload, with messages that hit the
+rules, the categorization cache or the LLM) or one of the analytics
+routes for a random user.
+
+Reports RPS, p50/p95/p99 per route and overall, event-loop lag, DB pool
+occupancy (and time spent at capacity for a QueuePool), the stub's
+counters and /health/metrics. The JSON includes the git commit, so two
+runs (BENCH_OUTPUT=before.json / after.json) can be diffed. SQLite by
+default; export DATABASE_URL for PostgreSQL and REDIS_URL to include the
+Redis caches.
+
+    python -m benchmarks.bench_load --duration 30 --concurrency 50 --llm-latency-ms 300 --llm-error-rate 0.02
+"""
+import argparse
+import asyncio
+import random
+import string
+import subprocess
+import sys
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List
+from unittest.mock import patch
+
+from benchmarks.common import PoolOccupancy, emit, latency_summary
+
+from groq import Groq
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import insert
+
+from app.core.config import DB_MAX_OVERFLOW, DB_POOL_SIZE
+from app.core.db import engine
+from app.main import app
+from app.models.base import Base
+from app.models.expense import Expense
+from app.models.user import User
+from app.repositories.rollup import RollupRepository
+import app.handlers.langchain_handler as langchain_handler
+
+CATEGORIES = ["Food", "Transportation", "Housing", "Utilities", "Entertainment", "Medical/Healthcare", "Other"]
+# (template, weight): what people actually send the bot, mostly repeats of
+# the same few shapes with different amounts
+MESSAGES = [
+    ("pizza {amount}", 8), ("café {amount}", 6), ("super {amount}", 8), ("uber {amount}", 6),
+    ("nafta {amount}", 4), ("pagué {amount} de luz", 3), ("internet {amount}", 2), ("alquiler {amount}", 1),
+    ("netflix {amount}", 2), ("farmacia {amount}", 2), ("almuerzo con amigos {amount}", 3),
+    ("{amount} empanadas", 2), ("hola", 1), ("cuanto gaste este mes?", 1),
+]
+DEFAULT_MIX = "expense=60,overview=15,sync=10,trends=10,category=5"
+CHUNK = 10000
+
+
+def user_id(i: int) -> str:
+    return f"load-user-{i}"
+
+
+def parse_mix(mix: str) -> Dict[str, float]:
+    weights = {}
+    for item in mix.split(","):
+        name, _, weight = item.partition("=")
+        if name not in ACTIONS:
+            raise SystemExit(f"Unknown action {name!r}, choose from {', '.join(ACTIONS)}")
+        weights[name] = float(weight or 1)
+    return weights
+
+
+def telegram_message(rng: random.Random, novel_ratio: float) -> str:
+    amount = rng.choice([rng.randint(1, 99), rng.randint(100, 9999), round(rng.uniform(1, 50), 2)])
+    if rng.random() < novel_ratio:
+        # An unseen merchant: misses the rules and the cache, so it reaches the LLM
+        merchant = "".join(rng.choices(string.ascii_lowercase, k=7))
+        return f"compra en {merchant} {amount}"
+    templates, weights = zip(*MESSAGES)
+    return rng.choices(templates, weights)[0].format(amount=amount)
+
+
+async def post_expense(client: AsyncClient, rng: random.Random, user: str, args):
+    text = telegram_message(rng, args.novel_ratio)
+    # Same payload as connector-service's sendToBotService
+    return await client.post("/api/expenses/", json={
+        "user_id": user, "description": text, "amount": 1, "category": "Other", "telegram_id": user, "text": text,
+    })
+
+
+ACTIONS: Dict[str, Callable] = {
+    "expense": post_expense,
+    "overview": lambda client, rng, user, args: client.get(f"/api/analytics/overview/{user}"),
+    "sync": lambda client, rng, user, args: client.get(f"/api/analytics/sync?user_id={user}"),
+    "trends": lambda client, rng, user, args: client.get(f"/api/analytics/trends/{user}?granularity=week"),
+    "category": lambda client, rng, user, args: client.get(f"/api/analytics/category-summary/{user}"),
+}
+
+
+async def seed(users: int, expenses_per_user: int):
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(insert(User), [{"id": user_id(i), "telegram_id": user_id(i)} for i in range(users)])
+        start = datetime.utcnow() - timedelta(days=365)
+        rows = [
+            {
+                "user_id": user_id(u),
+                "description": f"item {i}",
+                "amount": 5 + (i * 7 + u) % 200,
+                "category": CATEGORIES[(i + u) % len(CATEGORIES)],
+                "added_at": start + timedelta(minutes=i * 365 * 24 * 60 // max(expenses_per_user, 1)),
+            }
+            for u in range(users) for i in range(expenses_per_user)
+        ]
+        for offset in range(0, len(rows), CHUNK):
+            await conn.execute(insert(Expense), rows[offset:offset + CHUNK])
+    await RollupRepository().backfill()
+
+
+async def start_stub(args) -> subprocess.Popen:
+    process = subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.stub_groq", "--port", str(args.stub_port),
+         "--latency-ms", str(args.llm_latency_ms), "--jitter-ms", str(args.llm_jitter_ms),
+         "--error-rate", str(args.llm_error_rate), "--seed", str(args.seed)],
+        stdout=subprocess.DEVNULL,
+    )
+    async with AsyncClient() as client:
+        for _ in range(100):
+            try:
+                await client.get(f"http://127.0.0.1:{args.stub_port}/stats")
+                return process
+            except Exception:
+                await asyncio.sleep(0.1)
+    process.terminate()
+    raise SystemExit("Groq stub did not start")
+
+
+class Sampler:
+    """Event-loop lag (how late a short sleep wakes up) and pool checkouts,
+    sampled every interval while the load runs."""
+
+    def __init__(self, interval: float, capacity: int = None):
+        self.interval = interval
+        self.capacity = capacity
+        self.lags: List[float] = []
+        self.checked_out: List[int] = []
+
+    async def run(self, stop: asyncio.Event):
+        pool = engine.sync_engine.pool
+        while not stop.is_set():
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.lags.append(max(0.0, time.perf_counter() - started - self.interval))
+            if self.capacity:
+                self.checked_out.append(pool.checkedout())
+
+    def summary(self) -> Dict[str, Any]:
+        lag = latency_summary(self.lags)
+        lag["mean_ms"] = round(sum(self.lags) / len(self.lags) * 1000, 3) if self.lags else 0.0
+        pool = {"capacity": self.capacity}
+        if self.checked_out:
+            pool["at_capacity_pct"] = round(
+                100 * sum(1 for n in self.checked_out if n >= self.capacity) / len(self.checked_out), 2)
+        return {"event_loop_lag": lag, "pool_samples": pool}
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True,
+                                       stderr=subprocess.DEVNULL).strip()
+    except Exception:
+        return "unknown"
+
+
+async def run(args) -> Dict[str, Any]:
+    weights = parse_mix(args.mix)
+    names, name_weights = zip(*weights.items())
+    latencies: Dict[str, List[float]] = {name: [] for name in names}
+    statuses: Dict[str, Counter] = {name: Counter() for name in names}
+    # QueuePool (PostgreSQL) has a capacity to saturate; SQLite's NullPool doesn't
+    capacity = None if str(engine.url).startswith("sqlite") else DB_POOL_SIZE + DB_MAX_OVERFLOW
+    sampler = Sampler(args.sample_ms / 1000, capacity)
+
+    async def client_loop(client: AsyncClient, worker: int, deadline: float):
+        rng = random.Random(args.seed * 1000 + worker)
+        while time.perf_counter() < deadline:
+            name = rng.choices(names, name_weights)[0]
+            user = user_id(rng.randrange(args.users))
+            started = time.perf_counter()
+            try:
+                response = await ACTIONS[name](client, rng, user, args)
+                statuses[name][response.status_code] += 1
+            except Exception as e:
+                statuses[name][type(e).__name__] += 1
+            latencies[name].append(time.perf_counter() - started)
+            if args.think_ms:
+                await asyncio.sleep(rng.expovariate(1000 / args.think_ms))
+
+    stop = asyncio.Event()
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://load", timeout=60) as client:
+        with PoolOccupancy(engine) as occupancy:
+            sampling = asyncio.ensure_future(sampler.run(stop))
+            started = time.perf_counter()
+            deadline = started + args.duration
+            await asyncio.gather(*(client_loop(client, w, deadline) for w in range(args.concurrency)))
+            elapsed = time.perf_counter() - started
+            stop.set()
+            await sampling
+        service_metrics = (await client.get("/health/metrics")).json()
+
+    routes = {}
+    for name in names:
+        errors = sum(count for status, count in statuses[name].items() if not (isinstance(status, int) and status < 400))
+        routes[name] = {
+            "requests": len(latencies[name]),
+            "rps": round(len(latencies[name]) / elapsed, 2),
+            "errors": errors,
+            "status_codes": {str(status): count for status, count in statuses[name].items()},
+            "latency": latency_summary(latencies[name]),
+        }
+    total = sum(len(samples) for samples in latencies.values())
+    sampled = sampler.summary()
+    return {
+        "elapsed_s": round(elapsed, 3),
+        "requests": total,
+        "rps": round(total / elapsed, 2),
+        "errors": sum(route["errors"] for route in routes.values()),
+        "latency": latency_summary([s for samples in latencies.values() for s in samples]),
+        "routes": routes,
+        "event_loop_lag": sampled["event_loop_lag"],
+        "db_pool": {**occupancy.summary(), **sampled["pool_samples"]},
+        "service_metrics": {key: service_metrics.get(key) for key in
+                            ("llm", "llm_batching", "categorization_stages", "categorization_cache", "db_pool")},
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--think-ms", type=float, default=0, help="mean pause between a client's requests")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"action=weight list of {', '.join(ACTIONS)}")
+    parser.add_argument("--novel-ratio", type=float, default=0.2, help="share of messages that need the LLM")
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--expenses-per-user", type=int, default=500)
+    parser.add_argument("--llm-latency-ms", type=float, default=300)
+    parser.add_argument("--llm-jitter-ms", type=float, default=50)
+    parser.add_argument("--llm-error-rate", type=float, default=0.0)
+    parser.add_argument("--groq-base-url", help="use this endpoint instead of starting benchmarks.stub_groq")
+    parser.add_argument("--stub-port", type=int, default=8090)
+    parser.add_argument("--sample-ms", type=float, default=10)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    await seed(args.users, args.expenses_per_user)
+    stub = None if args.groq_base_url else await start_stub(args)
+    base_url = args.groq_base_url or f"http://127.0.0.1:{args.stub_port}"
+    try:
+        with patch.object(langchain_handler, "client", Groq(api_key="load-test", base_url=base_url)):
+            results = await run(args)
+        async with AsyncClient() as client:
+            results["llm_stub"] = (await client.get(f"{base_url}/stats")).json() if stub else None
+    finally:
+        if stub is not None:
+            stub.terminate()
+            stub.wait()
+    await engine.dispose()
+    emit("load", {"commit": git_commit(), "params": vars(args), "results": results})
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
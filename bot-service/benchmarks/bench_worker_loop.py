@@ -0,0 +1,61 @@
+"""Per-task overhead of a loop per task vs one loop per Celery worker process.
+
+Runs the analytics task body (AnalyticsService.get_expense_analytics) N
+times through WorkerLoop, first with a fresh loop and engine dispose per
+task (CELERY_REUSE_EVENT_LOOP=false) and then on a long-lived loop as
+worker_process_init sets up, and reports setup vs run time and the DB
+connections opened. Point DATABASE_URL at PostgreSQL to see the pool win.
+
+    python -m benchmarks.bench_worker_loop --tasks 200 --expenses 5000
+"""
+import argparse
+import asyncio
+import time
+from datetime import date
+
+from benchmarks.bench_analytics_query import USER_ID, seed
+from benchmarks.common import emit, latency_summary
+
+from app.core.db import engine
+from app.core.worker_loop import WorkerLoop
+from app.handlers.analytics_cache import analytics_cache
+from app.schemas.analytics import AnalyticsRequest
+from app.services.analytics import AnalyticsService
+
+
+def run_tasks(worker: WorkerLoop, tasks: int) -> dict:
+    service = AnalyticsService()
+    request = AnalyticsRequest(user_id=USER_ID, start_date=date(2024, 1, 1), end_date=date(2024, 6, 30))
+    samples = []
+    for _ in range(tasks):
+        started = time.perf_counter()
+        worker.run("run_analytics_task", lambda: service.get_expense_analytics(request))
+        samples.append(time.perf_counter() - started)
+    return {"latency": latency_summary(samples), **worker.metrics()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=200)
+    parser.add_argument("--expenses", type=int, default=5000)
+    args = parser.parse_args()
+
+    asyncio.run(seed(args.expenses))
+    asyncio.run(engine.dispose())
+    # Measure the task itself, not the result cache
+    analytics_cache.enabled = False
+
+    per_task = run_tasks(WorkerLoop(reuse=False), args.tasks)
+
+    worker = WorkerLoop(reuse=True)
+    worker.start()
+    try:
+        per_process = run_tasks(worker, args.tasks)
+    finally:
+        worker.stop()
+
+    emit("worker_loop", {"params": vars(args), "results": {"loop_per_task": per_task, "loop_per_process": per_process}})
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""Shared helpers for the bot-service benchmarks.
+
+Benchmarks are plain scripts run with ``python -m benchmarks.<name>`` from the
+bot-service directory. They default to a throwaway SQLite database; point
+DATABASE_URL at Postgres to benchmark the production backend.
+"""
+import json
+import math
+import os
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List
+
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{tempfile.gettempdir()}/bot_service_bench.db")
+os.environ.setdefault("GROQ_API_KEY", "benchmark")
+
+from sqlalchemy import event  # noqa: E402
+
+from app.core.logging import configure_logging  # noqa: E402
+
+configure_logging(os.environ.get("BENCH_LOG_LEVEL", "WARNING"))
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile of samples (pct in 0..100)."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(0, min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+def latency_summary(samples: List[float]) -> Dict[str, float]:
+    """p50/p95/p99/max of samples given in seconds, reported in ms."""
+    return {
+        "count": len(samples),
+        "p50_ms": round(percentile(samples, 50) * 1000, 3),
+        "p95_ms": round(percentile(samples, 95) * 1000, 3),
+        "p99_ms": round(percentile(samples, 99) * 1000, 3),
+        "max_ms": round(max(samples) * 1000, 3) if samples else 0.0,
+    }
+
+
+class PoolOccupancy:
+    """Tracks how many pooled connections are checked out over time.
+
+    Works with any pool class (including SQLite's NullPool) by listening to
+    checkout/checkin events instead of reading pool internals.
+    """
+
+    def __init__(self, engine):
+        self.pool = engine.sync_engine.pool
+        self.current = 0
+        self.peak = 0
+        self.checkouts = 0
+        self.connects = 0
+        self._busy_since = None
+        self._area = 0.0
+        self._started = time.perf_counter()
+
+    def _on_checkout(self, *args):
+        self._accumulate()
+        self.current += 1
+        self.checkouts += 1
+        self.peak = max(self.peak, self.current)
+
+    def _on_checkin(self, *args):
+        self._accumulate()
+        self.current = max(0, self.current - 1)
+
+    def _on_connect(self, *args):
+        self.connects += 1
+
+    def _accumulate(self):
+        now = time.perf_counter()
+        if self._busy_since is not None:
+            self._area += self.current * (now - self._busy_since)
+        self._busy_since = now
+
+    def __enter__(self):
+        self._started = time.perf_counter()
+        event.listen(self.pool, "checkout", self._on_checkout)
+        event.listen(self.pool, "checkin", self._on_checkin)
+        event.listen(self.pool, "connect", self._on_connect)
+        return self
+
+    def __exit__(self, *exc):
+        self._accumulate()
+        event.remove(self.pool, "checkout", self._on_checkout)
+        event.remove(self.pool, "checkin", self._on_checkin)
+        event.remove(self.pool, "connect", self._on_connect)
+
+    def summary(self) -> Dict[str, Any]:
+        elapsed = time.perf_counter() - self._started
+        return {
+            "peak_checked_out": self.peak,
+            "mean_checked_out": round(self._area / elapsed, 3) if elapsed else 0.0,
+            "checkouts": self.checkouts,
+            "new_connections": self.connects,
+        }
+
+
+def emit(name: str, results: Dict[str, Any]) -> None:
+    """Print results as JSON (and write them to BENCH_OUTPUT if set)."""
+    payload = {"benchmark": name, "database": os.environ["DATABASE_URL"].split("://")[0], **results}
+    text = json.dumps(payload, indent=2, default=str)
+    print(text)
+    output = os.environ.get("BENCH_OUTPUT")
+    if output:
+        with open(output, "w") as f:
+            f.write(text)
+    sys.stdout.flush()
@@ -0,0 +1,102 @@
+"""Local stand-in for the Groq chat completions API, for load tests.
+
+Answers the categorization prompts of app/handlers/langchain_handler.py
+(single and batched) after --latency-ms (+/- --jitter-ms), and fails a
+--error-rate fraction of requests with a 503. GET /stats reports what it
+served. Point the service at it with GROQ_BASE_URL:
+
+    python -m benchmarks.stub_groq --port 8090 --latency-ms 300 --error-rate 0.02
+    GROQ_BASE_URL=http://127.0.0.1:8090 uvicorn app.main:app
+"""
+import argparse
+import asyncio
+import json
+import random
+import re
+import time
+from typing import Any, Dict, List
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+KEYWORDS = {
+    "Food": ("pizza", "cafe", "café", "super", "almuerzo", "cena", "burger", "sushi", "empanadas"),
+    "Transportation": ("uber", "taxi", "nafta", "subte", "colectivo", "peaje", "cabify"),
+    "Utilities": ("luz", "gas", "agua", "internet", "celular"),
+    "Housing": ("alquiler", "expensas"),
+    "Entertainment": ("cine", "netflix", "spotify", "recital", "bar"),
+    "Medical/Healthcare": ("farmacia", "medico", "médico", "dentista"),
+}
+AMOUNT = re.compile(r"\d+(?:[.,]\d+)?")
+SINGLE = re.compile(r'The user wrote: "(.*)"\.')
+BATCH_ITEM = re.compile(r'^(\d+)\. "(.*)"$', re.MULTILINE)
+
+
+def categorize(text: str) -> Dict[str, Any]:
+    lowered = text.lower()
+    category = next((name for name, words in KEYWORDS.items() if any(w in lowered for w in words)), "Other")
+    match = AMOUNT.search(text)
+    amount = float(match.group().replace(",", ".")) if match else 0.0
+    description = AMOUNT.sub("", text).strip() or text
+    return {"category": category, "amount": amount, "description": description}
+
+
+def answer(prompt: str) -> str:
+    items = BATCH_ITEM.findall(prompt)
+    if items:
+        return json.dumps([{"id": int(i), **categorize(text)} for i, text in items])
+    match = SINGLE.search(prompt)
+    return json.dumps(categorize(match.group(1) if match else prompt))
+
+
+def create_app(latency_ms: float, jitter_ms: float, error_rate: float, seed: int = 0) -> FastAPI:
+    app = FastAPI(title="Groq stub")
+    rng = random.Random(seed)
+    stats = {"requests": 0, "batched_items": 0, "errors_injected": 0}
+
+    @app.post("/openai/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        stats["requests"] += 1
+        delay = max(0.0, latency_ms + rng.uniform(-jitter_ms, jitter_ms)) / 1000
+        await asyncio.sleep(delay)
+        if rng.random() < error_rate:
+            stats["errors_injected"] += 1
+            return JSONResponse({"error": {"message": "stub: injected error", "type": "server_error"}}, status_code=503)
+
+        prompt = body["messages"][-1]["content"]
+        stats["batched_items"] += len(BATCH_ITEM.findall(prompt))
+        return {
+            "id": f"chatcmpl-stub-{stats['requests']}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model") or "stub",
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": answer(prompt)},
+                         "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": len(prompt) // 4, "completion_tokens": 20, "total_tokens": len(prompt) // 4 + 20},
+        }
+
+    @app.get("/stats")
+    async def get_stats() -> Dict[str, int]:
+        return stats
+
+    return app
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--latency-ms", type=float, default=300)
+    parser.add_argument("--jitter-ms", type=float, default=50)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    app = create_app(args.latency_ms, args.jitter_ms, args.error_rate, args.seed)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
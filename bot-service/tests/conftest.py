@@ -8,9 +8,12 @@ from app.core.db import AsyncSessionLocal, engine
 from app.models.base import Base
 from app.models.user import User
 from app.models.expense import Expense
+from app.repositories.rollup import RollupRepository
 from datetime import datetime, date
 from decimal import Decimal
 from unittest.mock import AsyncMock, patch
+from contextlib import contextmanager
+from sqlalchemy import event
 
 os.environ["TESTING"] = "1"
 os.environ["DATABASE_URL"] = "sqlite+aiosqlite:///./test.db"
@@ -22,6 +25,32 @@ def event_loop():
     yield loop
     loop.close()
 
+@pytest.fixture(autouse=True)
+def clean_categorization_cache():
+    """Keep categorization results from leaking between tests"""
+    from app.handlers.categorization_cache import categorization_cache
+    categorization_cache.clear()
+    with patch.object(categorization_cache, "use_redis", False):
+        yield categorization_cache
+    categorization_cache.clear()
+
+@pytest.fixture(autouse=True)
+def no_analytics_cache():
+    """Compute analytics directly; cache tests opt in with their own instance"""
+    from app.handlers.analytics_cache import analytics_cache
+    from app.handlers.vector_analytics import vector_analytics
+    vector_analytics.clear()
+    with patch.object(analytics_cache, "enabled", False):
+        yield analytics_cache
+    vector_analytics.clear()
+
+@pytest.fixture
+def llm_only():
+    """Disable the rule-based stage so messages reach the (mocked) LLM"""
+    from app.handlers.rule_classifier import rule_classifier
+    with patch.object(rule_classifier, "enabled", False):
+        yield
+
 @pytest_asyncio.fixture(scope="function")
 async def db_session():
     """Create a clean database session for each test"""
@@ -99,7 +128,10 @@ async def test_expenses(db_session, test_user):
     
     for expense in expenses:
         await db_session.refresh(expense)
-    
+
+    # Inserted directly, so build their rollups the way the backfill does
+    await RollupRepository().backfill()
+
     return expenses
 
 @pytest.fixture
@@ -117,3 +149,35 @@ def mock_celery_task():
         mock_result.id = "test-task-id"
         mock.delay.return_value = mock_result
         yield mock
+
+class QueryCounter:
+    """Records the SQL statements executed on the shared engine"""
+
+    def __init__(self):
+        self.statements = []
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def __enter__(self):
+        event.listen(engine.sync_engine, "before_cursor_execute", self._record)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(engine.sync_engine, "before_cursor_execute", self._record)
+
+@pytest.fixture
+def assert_max_queries():
+    """Fail when a block runs more than n SQL statements (catches N+1 regressions)"""
+    @contextmanager
+    def check(n: int):
+        with QueryCounter() as counter:
+            yield counter
+        assert counter.count <= n, (
+            f"Expected at most {n} queries, got {counter.count}:\n" + "\n".join(counter.statements)
+        )
+    return check
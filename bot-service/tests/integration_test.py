@@ -58,6 +58,92 @@ class TestExpenseEndpoints:
         data = response.json()
         assert len(data) == 2
 
+    @pytest.mark.asyncio
+    async def test_get_expenses_with_cursor(self, async_client: AsyncClient, test_expenses):
+        """Test following X-Next-Cursor until the last page"""
+        first = await async_client.get("/api/expenses/?limit=2")
+        assert first.status_code == 200
+        assert len(first.json()) == 2
+
+        cursor = first.headers["X-Next-Cursor"]
+        second = await async_client.get(f"/api/expenses/?limit=2&cursor={cursor}")
+        assert second.status_code == 200
+        assert len(second.json()) == 1
+        assert "X-Next-Cursor" not in second.headers
+
+    @pytest.mark.asyncio
+    async def test_get_expenses_invalid_cursor(self, async_client: AsyncClient, test_expenses):
+        """Test a malformed cursor is a client error"""
+        response = await async_client.get("/api/expenses/?cursor=garbage")
+        assert response.status_code == 400
+
+    @pytest.mark.asyncio
+    async def test_get_user_expenses(self, async_client: AsyncClient, test_user, test_expenses):
+        """Test the per-user listing filters and sorts server-side"""
+        response = await async_client.get(
+            f"/api/expenses/user/{test_user.id}?category=Food&sort=amount_desc&limit=1"
+        )
+        assert response.status_code == 200
+        assert [e["id"] for e in response.json()] == [3]
+
+        cursor = response.headers["X-Next-Cursor"]
+        response = await async_client.get(
+            f"/api/expenses/user/{test_user.id}?category=Food&sort=amount_desc&limit=1&cursor={cursor}"
+        )
+        assert [e["id"] for e in response.json()] == [1]
+        assert "X-Next-Cursor" not in response.headers
+
+    @pytest.mark.asyncio
+    async def test_get_user_expenses_invalid_sort(self, async_client: AsyncClient, test_user):
+        """Test unknown sort options are rejected"""
+        response = await async_client.get(f"/api/expenses/user/{test_user.id}?sort=category")
+        assert response.status_code == 422
+
+    @pytest.mark.asyncio
+    async def test_import_expenses(self, async_client: AsyncClient, test_user):
+        """Test importing a JSON Lines body"""
+        body = (
+            f'{{"telegram_id": "{test_user.telegram_id}", "description": "Pan", "amount": 3, "category": "Food"}}\n'
+            f'{{"telegram_id": "{test_user.telegram_id}", "description": "Pan"}}\n'
+        )
+        response = await async_client.post(
+            "/api/expenses/import", content=body, headers={"Content-Type": "application/x-ndjson"}
+        )
+        assert response.status_code == 200
+
+        data = response.json()
+        assert (data["imported"], data["failed"]) == (1, 1)
+        assert data["errors"][0]["line"] == 2
+
+    @pytest.mark.asyncio
+    async def test_import_expenses_unknown_format(self, async_client: AsyncClient):
+        """Test the format must be given or inferable"""
+        response = await async_client.post("/api/expenses/import", content=b"x", headers={"Content-Type": "text/plain"})
+        assert response.status_code == 400
+
+    @pytest.mark.asyncio
+    async def test_export_expenses(self, async_client: AsyncClient, test_user, test_expenses):
+        """Test the CSV export is served as an attachment"""
+        response = await async_client.get(f"/api/expenses/export?format=csv&user_id={test_user.id}")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/csv")
+        assert 'filename="expenses.csv"' in response.headers["content-disposition"]
+        assert len(response.text.strip().splitlines()) == 4
+
+    @pytest.mark.asyncio
+    async def test_update_expense_keeps_added_at(self, async_client: AsyncClient, test_expenses):
+        """Test the PUT response carries the stored added_at"""
+        expense = test_expenses[0]
+        response = await async_client.put(f"/api/expenses/{expense.id}", json={
+            "description": "Empanadas", "amount": 12.5, "category": "Food",
+        })
+        assert response.status_code == 200
+
+        data = response.json()
+        assert data["description"] == "Empanadas"
+        assert data["added_at"] is not None
+        assert data["added_at"] == expense.added_at.isoformat()
+
     @pytest.mark.asyncio
     async def test_delete_expense(self, async_client: AsyncClient, test_expenses):
         """Test deleting expense"""
@@ -97,11 +183,23 @@ class TestAnalyticsEndpoints:
         assert data["total_expenses"] == 70.50
 
     @pytest.mark.asyncio
-    async def test_task_status_pending(self, async_client: AsyncClient):
-        """Test task status for pending task"""
+    async def test_analytics_sync_vector_engine(self, async_client: AsyncClient, test_user, test_expenses):
+        """Test the in-memory engine is selectable per request"""
+        response = await async_client.get(f"/api/analytics/sync?user_id={test_user.id}&engine=vector")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["engine"] == "vector"
+        assert data["total_expenses"] == 70.50
+        assert set(data["amount_percentiles"]) == {"p50", "p90", "p99"}
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("state", ["PENDING", "SENT"])
+    async def test_task_status_pending(self, async_client: AsyncClient, state):
+        """Test task status for pending task (SENT: queued by the deduplicator)"""
         with patch('app.routes.analytics.AsyncResult') as mock_result:
             mock_task = AsyncMock()
-            mock_task.state = "PENDING"
+            mock_task.state = state
             mock_result.return_value = mock_task
             
             response = await async_client.get("/api/analytics/status/test-task-id")
@@ -126,6 +224,37 @@ class TestAnalyticsEndpoints:
             assert data["status"] == "FAILED"
             assert "error" in data
 
+    @pytest.mark.asyncio
+    async def test_create_analytics_task_deduplicated(self, async_client: AsyncClient):
+        """Test a repeated request gets the in-flight task instead of a new one"""
+        with patch('app.routes.analytics.task_deduplicator.submit', return_value=("task-1", "STARTED")) as submit:
+            response = await async_client.post("/api/analytics/", json={"user_id": "u1", "start_date": "2024-01-01"})
+
+        assert response.status_code == 200
+        assert response.json()["task_id"] == "task-1"
+        assert response.json()["status"] == "STARTED"
+        assert response.json()["deduplicated"] is True
+        assert submit.call_args.args[1]["start_date"] == "2024-01-01"
+
+    @pytest.mark.asyncio
+    async def test_bulk_analytics_endpoint(self, async_client: AsyncClient):
+        """Test a bulk run is submitted and its chord followed"""
+        with patch('app.routes.analytics.run_bulk_analytics_task') as mock_task:
+            mock_task.delay.return_value.id = "bulk-task-id"
+            response = await async_client.post("/api/analytics/bulk", json={"user_ids": "all", "chunk_size": 100})
+        assert response.status_code == 200
+        assert response.json()["task_id"] == "bulk-task-id"
+        mock_task.delay.assert_called_once_with(
+            {"user_ids": "all", "start_date": None, "end_date": None, "chunk_size": 100}
+        )
+
+        dispatch = AsyncMock(state="SUCCESS", result={"users": 3, "chunks": 1, "chord_id": "chord-id"})
+        summary = AsyncMock(state="SUCCESS", result={"chunks": 1, "users": 3, "active_users": 2, "total_expenses": 10.0})
+        with patch('app.routes.analytics.AsyncResult', side_effect=[dispatch, summary]):
+            response = await async_client.get("/api/analytics/bulk/bulk-task-id")
+        data = response.json()
+        assert (data["status"], data["users"], data["result"]["active_users"]) == ("SUCCESS", 3, 2)
+
     @pytest.mark.asyncio
     async def test_overview_endpoint(self, async_client: AsyncClient, test_user, test_expenses):
         """Test overview endpoint"""
@@ -149,6 +278,26 @@ class TestAnalyticsEndpoints:
         assert len(data) == 2
         assert all("category" in item and "total" in item for item in data)
 
+    @pytest.mark.asyncio
+    async def test_monthly_trends_endpoint(self, async_client: AsyncClient, test_user, test_expenses):
+        """Test monthly trends returns one zero-filled entry per month"""
+        response = await async_client.get(
+            f"/api/analytics/monthly-trends/{test_user.id}?start_date=2024-01-01&end_date=2024-03-31"
+        )
+        assert response.status_code == 200
+
+        data = response.json()
+        assert [p["period"] for p in data] == ["2024-01-01", "2024-02-01", "2024-03-01"]
+        assert [p["total"] for p in data] == [40.5, 30.0, 0.0]
+
+    @pytest.mark.asyncio
+    async def test_trends_invalid_range(self, async_client: AsyncClient, test_user):
+        """Test reversed ranges are a client error"""
+        response = await async_client.get(
+            f"/api/analytics/trends/{test_user.id}?granularity=week&start_date=2024-03-01&end_date=2024-01-01"
+        )
+        assert response.status_code == 400
+
 
 class TestHealthEndpoints:
     """Integration tests for health endpoints"""
@@ -1,10 +1,12 @@
 import pytest
 from app.services.analytics import AnalyticsService
-from app.repositories.analytics import AnalyticsRepository
+from app.repositories.analytics import AnalyticsRepository, PeriodTotal, time_series_query
 from app.schemas.analytics import AnalyticsRequest
 from datetime import date, datetime
 from decimal import Decimal
 from dateutil.relativedelta import relativedelta
+from unittest.mock import patch
+from app.core.db import engine, engine_options, get_pool_status
 
 class TestAnalyticsRepository:
     """Unit tests for analytics repository"""
@@ -81,6 +83,25 @@ class TestAnalyticsRepository:
         assert avg_dict["Food"] == 27.75
         assert avg_dict["Transportation"] == 15.00
 
+    @pytest.mark.asyncio
+    async def test_per_metric_queries_include_whole_end_date(self, test_user, test_expenses):
+        """Test the per-metric queries use the snapshot's end_date rule"""
+        from app.repositories.expense import ExpenseRepository
+        await ExpenseRepository().insert_categorized_expense(
+            test_user.telegram_id, "Cena", 20, "Food", datetime(2024, 1, 31, 21, 30)
+        )
+        repo = AnalyticsRepository()
+        start, end = date(2024, 1, 1), date(2024, 1, 31)
+
+        summary = dict(await repo.get_expenses_summary(test_user.id, start, end))
+        total = await repo.get_total_expenses(test_user.id, start, end)
+        averages = dict(await repo.get_average_by_category(test_user.id, start, end))
+        snapshot = await repo.get_analytics_snapshot(test_user.id, start, end)
+
+        assert total == snapshot.total == Decimal("60.50")
+        assert summary == {c.category: c.total for c in snapshot.categories}
+        assert averages["Food"] == pytest.approx(Decimal("22.75"))
+
     @pytest.mark.asyncio
     async def test_get_monthly_variation_increase(self, test_user):
         """Test monthly variation calculation with increase"""
@@ -88,8 +109,12 @@ class TestAnalyticsRepository:
         
         from unittest.mock import AsyncMock, patch
         
-        with patch.object(repo, 'get_total_expenses') as mock_get_total:
-            mock_get_total.side_effect = [Decimal('100'), Decimal('80')]
+        with patch.object(repo, 'get_time_series') as mock_series:
+            mock_series.return_value = [
+                PeriodTotal(date(2024, 1, 1), "Food", Decimal('80'), 2),
+                PeriodTotal(date(2024, 2, 1), "Food", Decimal('60'), 1),
+                PeriodTotal(date(2024, 2, 1), "Health", Decimal('40'), 1),
+            ]
             
             variation = await repo.get_monthly_variation(
                 test_user.id,
@@ -106,8 +131,8 @@ class TestAnalyticsRepository:
         
         from unittest.mock import AsyncMock, patch
         
-        with patch.object(repo, 'get_total_expenses') as mock_get_total:
-            mock_get_total.side_effect = [Decimal('100'), None]
+        with patch.object(repo, 'get_time_series') as mock_series:
+            mock_series.return_value = [PeriodTotal(date(2024, 2, 1), "Food", Decimal('100'), 1)]
             
             variation = await repo.get_monthly_variation(
                 test_user.id,
@@ -118,6 +143,126 @@ class TestAnalyticsRepository:
             assert variation == 0.0
 
 
+    @pytest.mark.asyncio
+    async def test_get_monthly_variation_includes_month_end(self, test_user):
+        """Test days 29-31 count towards their month"""
+        from app.repositories.expense import ExpenseRepository
+        expenses = ExpenseRepository()
+        await expenses.insert_categorized_expense(test_user.telegram_id, "Alquiler", 100, "Housing", datetime(2024, 1, 31, 20))
+        await expenses.insert_categorized_expense(test_user.telegram_id, "Alquiler", 150, "Housing", datetime(2024, 2, 29, 20))
+
+        variation = await AnalyticsRepository().get_monthly_variation(test_user.id, date(2024, 2, 1), date(2024, 1, 1))
+
+        assert variation == 50.0
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("use_rollups", [False, True])
+    async def test_get_time_series(self, test_user, test_expenses, use_rollups):
+        """Test totals per month and category, from expenses or rollups"""
+        repo = AnalyticsRepository(use_rollups=use_rollups)
+
+        series = await repo.get_time_series(test_user.id, date(2024, 1, 1), date(2024, 2, 10), "month")
+
+        assert series == [
+            PeriodTotal(date(2024, 1, 1), "Food", Decimal("25.50"), 1),
+            PeriodTotal(date(2024, 1, 1), "Transportation", Decimal("15.00"), 1),
+            PeriodTotal(date(2024, 2, 1), "Food", Decimal("30.00"), 1),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_get_time_series_weeks_start_on_monday(self, test_user, test_expenses):
+        """Test week buckets match date_trunc('week')"""
+        series = await AnalyticsRepository().get_time_series(test_user.id, date(2024, 1, 1), date(2024, 2, 29), "week")
+
+        # 2024-01-15 and 2024-01-20 share the week of Monday 15th; 2024-02-10 is a Saturday
+        assert [(row.period, row.category) for row in series] == [
+            (date(2024, 1, 15), "Food"),
+            (date(2024, 1, 15), "Transportation"),
+            (date(2024, 2, 5), "Food"),
+        ]
+
+    def test_time_series_query_postgres(self):
+        """Test PostgreSQL buckets with date_trunc cast to date, identical in SELECT and GROUP BY"""
+        from sqlalchemy.dialects import postgresql
+        query = time_series_query("u", date(2024, 1, 1), date(2024, 12, 31), "month", "postgresql")
+        sql = str(query.compile(dialect=postgresql.dialect()))
+
+        assert sql.count("CAST(date_trunc('month', expenses.added_at) AS DATE)") == 2
+
+    @pytest.mark.asyncio
+    async def test_get_analytics_snapshot(self, test_user, test_expenses):
+        """Test the single-pass snapshot matches the per-metric queries"""
+        repo = AnalyticsRepository()
+
+        snapshot = await repo.get_analytics_snapshot(
+            test_user.id, date(2024, 1, 1), date(2024, 1, 31), current_month=date(2024, 2, 1)
+        )
+
+        by_category = {c.category: c for c in snapshot.categories}
+        assert by_category["Food"].total == Decimal("25.50")
+        assert by_category["Food"].count == 1
+        assert by_category["Transportation"].average == Decimal("15.00")
+        assert snapshot.total == Decimal("40.50")
+        assert snapshot.current_month_total == Decimal("30.00")
+        assert snapshot.previous_month_total == Decimal("40.50")
+
+    @pytest.mark.asyncio
+    async def test_get_analytics_snapshot_month_outside_range(self, test_user, test_expenses):
+        """Test month windows are counted even when outside the date range"""
+        repo = AnalyticsRepository()
+
+        snapshot = await repo.get_analytics_snapshot(
+            test_user.id, date(2024, 2, 1), date(2024, 2, 28), current_month=date(2024, 2, 1)
+        )
+
+        assert [c.category for c in snapshot.categories] == ["Food"]
+        assert snapshot.total == Decimal("30.00")
+        assert snapshot.previous_month_total == Decimal("40.50")
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("use_rollups", [False, True])
+    async def test_get_analytics_snapshot_includes_whole_end_date(self, test_user, use_rollups):
+        """Test expenses later on end_date count, in the single and bulk snapshots"""
+        from app.repositories.expense import ExpenseRepository
+        expenses = ExpenseRepository()
+        await expenses.insert_categorized_expense(test_user.telegram_id, "Cena", 40, "Food", datetime(2024, 1, 31, 21, 30))
+        await expenses.insert_categorized_expense(test_user.telegram_id, "Taxi", 10, "Transportation", datetime(2024, 2, 1))
+        repo = AnalyticsRepository(use_rollups=use_rollups)
+
+        snapshot = await repo.get_analytics_snapshot(test_user.id, date(2024, 1, 1), date(2024, 1, 31))
+        bulk = await repo.get_analytics_snapshots([test_user.id], date(2024, 1, 1), date(2024, 1, 31))
+
+        assert snapshot.total == Decimal("40")
+        assert [c.category for c in snapshot.categories] == ["Food"]
+        assert bulk[test_user.id].total == Decimal("40")
+
+    @pytest.mark.asyncio
+    async def test_queries_use_shared_engine(self, test_user, test_expenses):
+        """Test that analytics queries never build their own engine"""
+        repo = AnalyticsRepository()
+        before = get_pool_status()["checkouts"]
+
+        with patch("sqlalchemy.ext.asyncio.create_async_engine") as mock_create:
+            for _ in range(5):
+                await repo.get_expenses_summary(test_user.id, date(2024, 1, 1), date(2024, 1, 31))
+                await repo.get_total_expenses(test_user.id, date(2024, 1, 1), date(2024, 1, 31))
+                await repo.get_average_by_category(test_user.id, date(2024, 1, 1), date(2024, 1, 31))
+
+        mock_create.assert_not_called()
+        assert get_pool_status()["checkouts"] - before == 15
+
+    def test_engine_options(self):
+        """Test pool settings are applied to server databases only"""
+        assert engine_options("sqlite+aiosqlite:///./test.db") == {}
+        options = engine_options("postgresql+asyncpg://user:pass@db/expenses")
+        assert set(options) == {"pool_size", "max_overflow", "pool_timeout", "pool_recycle", "pool_pre_ping"}
+
+    def test_pool_status(self):
+        """Test pool status reports the shared engine's pool"""
+        status = get_pool_status()
+        assert status["pool_class"] == type(engine.pool).__name__
+        assert "connections_opened" in status
+
 class TestAnalyticsService:
     """Unit tests for analytics service"""
 
@@ -214,31 +359,97 @@ class TestAnalyticsService:
         
         from unittest.mock import patch
         
-        with patch.object(service.repo, 'get_monthly_variation', return_value=15.5):
-            request = AnalyticsRequest(
-                user_id=test_user.id,
-                start_date=date(2024, 2, 1),
-                end_date=date(2024, 2, 28)
-            )
-            
-            result = await service.get_expense_analytics(request)
-            
-            assert result.monthly_variation_percentage == 15.5
+        request = AnalyticsRequest(
+            user_id=test_user.id,
+            start_date=date(2024, 2, 1),
+            end_date=date(2024, 2, 28)
+        )
+
+        result = await service.get_expense_analytics(request)
+
+        # February (30.00) against January (25.50 + 15.00)
+        assert result.monthly_variation_percentage == pytest.approx(-25.925925, rel=1e-6)
 
     @pytest.mark.asyncio
-    async def test_get_expense_analytics_monthly_variation_error(self, test_user, test_expenses):
-        """Test analytics when monthly variation calculation fails"""
+    async def test_get_expense_analytics_monthly_variation_no_previous_data(self, test_user, test_expenses):
+        """Test analytics when the previous month has no expenses"""
         service = AnalyticsService()
-        
-        from unittest.mock import patch
-        
-        with patch.object(service.repo, 'get_monthly_variation', side_effect=Exception("DB Error")):
-            request = AnalyticsRequest(
+
+        request = AnalyticsRequest(
+            user_id=test_user.id,
+            start_date=date(2024, 1, 1),
+            end_date=date(2024, 1, 31)
+        )
+
+        result = await service.get_expense_analytics(request)
+
+        assert result.monthly_variation_percentage == 0.0
+
+    @pytest.mark.asyncio
+    async def test_get_expense_analytics_single_query(self, test_user, test_expenses):
+        """Test analytics run as one snapshot query"""
+        service = AnalyticsService()
+
+        with patch.object(service.repo, 'get_expenses_summary') as mock_summary, \
+                patch.object(service.repo, 'get_total_expenses') as mock_total, \
+                patch.object(service.repo, 'get_monthly_variation') as mock_variation:
+            before = get_pool_status()["checkouts"]
+            await service.get_expense_analytics(AnalyticsRequest(
                 user_id=test_user.id,
-                start_date=date(2024, 2, 1),
+                start_date=date(2024, 1, 1),
                 end_date=date(2024, 2, 28)
-            )
-            
-            result = await service.get_expense_analytics(request)
-            
-            assert result.monthly_variation_percentage == 0.0
+            ))
+
+        assert get_pool_status()["checkouts"] - before == 1
+        mock_summary.assert_not_called()
+        mock_total.assert_not_called()
+        mock_variation.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_get_trends_zero_fills(self, test_user, test_expenses):
+        """Test empty months are zeros and variation is month over month"""
+        service = AnalyticsService()
+
+        result = await service.get_trends(test_user.id, date(2023, 12, 1), date(2024, 3, 31))
+
+        assert result.categories == ["Food", "Transportation"]
+        assert [p.period for p in result.periods] == [date(2023, 12, 1), date(2024, 1, 1), date(2024, 2, 1), date(2024, 3, 1)]
+        assert [p.total for p in result.periods] == [0.0, 40.5, 30.0, 0.0]
+        assert result.periods[0].categories == {"Food": 0.0, "Transportation": 0.0}
+        assert result.periods[2].categories == {"Food": 30.0, "Transportation": 0.0}
+        assert result.periods[2].variation_percentage == pytest.approx((30 - 40.5) / 40.5 * 100)
+        assert result.periods[1].variation_percentage == 0.0
+
+    @pytest.mark.asyncio
+    async def test_get_trends_skips_unknown_periods(self, test_user):
+        """Test a row outside the computed buckets is skipped instead of failing"""
+        service = AnalyticsService()
+        rows = [
+            PeriodTotal(date(2024, 1, 1), "Food", Decimal("10"), 1),
+            PeriodTotal(datetime(2024, 2, 1), "Food", Decimal("5"), 1),
+        ]
+
+        with patch.object(service.repo, "get_time_series", return_value=rows):
+            result = await service.get_trends(test_user.id, date(2024, 1, 1), date(2024, 2, 29))
+
+        assert [p.total for p in result.periods] == [10.0, 0.0]
+
+    @pytest.mark.asyncio
+    async def test_get_trends_defaults_to_last_twelve_months(self, test_user):
+        """Test the default window ends in the current month"""
+        result = await AnalyticsService().get_trends(test_user.id)
+
+        assert len(result.periods) == 12
+        assert result.periods[-1].period == date.today().replace(day=1)
+
+    @pytest.mark.asyncio
+    async def test_get_trends_single_query(self, test_user, test_expenses, assert_max_queries):
+        """Test the whole series comes from one query"""
+        with assert_max_queries(1):
+            await AnalyticsService().get_trends(test_user.id, date(2023, 1, 1), date(2024, 12, 31), "week")
+
+    @pytest.mark.asyncio
+    async def test_get_trends_too_many_periods(self, test_user):
+        """Test oversized day ranges are rejected"""
+        with pytest.raises(ValueError):
+            await AnalyticsService().get_trends(test_user.id, date(2000, 1, 1), date(2024, 1, 1), "day")
@@ -0,0 +1,235 @@
+import pytest
+import asyncio
+import json
+import time
+from datetime import date
+from unittest.mock import patch
+from app.handlers.analytics_cache import AnalyticsCache
+from app.schemas.analytics import AnalyticsResult, AnalyticsRequest
+from app.services.analytics import AnalyticsService
+from app.repositories.expense import ExpenseRepository
+
+
+class FakeRedis:
+    """Minimal async stand-in for the commands the analytics cache uses"""
+
+    def __init__(self):
+        self.store = {}
+
+    async def get(self, key):
+        return self.store.get(key)
+
+    async def mget(self, *keys):
+        return [self.store.get(key) for key in keys]
+
+    async def set(self, key, value, ex=None, px=None, nx=False):
+        if nx and key in self.store:
+            return None
+        self.store[key] = value
+        return True
+
+    async def incr(self, key):
+        self.store[key] = str(int(self.store.get(key, 0)) + 1)
+        return int(self.store[key])
+
+    async def delete(self, key):
+        self.store.pop(key, None)
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    """Queues commands and runs them on execute()"""
+
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    def set(self, *args, **kwargs):
+        self.commands.append((self.redis.set, args, kwargs))
+        return self
+
+    def mget(self, *args, **kwargs):
+        self.commands.append((self.redis.mget, args, kwargs))
+        return self
+
+    async def execute(self):
+        return [await command(*args, **kwargs) for command, args, kwargs in self.commands]
+
+
+def make_result(total: float) -> AnalyticsResult:
+    return AnalyticsResult(
+        total_expenses=total,
+        start_date=date(2024, 1, 1),
+        end_date=date(2024, 1, 31),
+        category_breakdown=[],
+    )
+
+
+class Counter:
+    """compute() stand-in that counts calls and can be slowed down"""
+
+    def __init__(self, delay: float = 0):
+        self.calls = 0
+        self.delay = delay
+
+    async def __call__(self) -> AnalyticsResult:
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return make_result(float(self.calls))
+
+
+class TestAnalyticsCache:
+    """Unit tests for the versioned analytics result cache"""
+
+    @pytest.fixture
+    def fake(self):
+        fake = FakeRedis()
+        with patch("app.handlers.analytics_cache.get_redis", return_value=fake):
+            yield fake
+
+    @pytest.mark.asyncio
+    async def test_hit_after_miss(self, fake):
+        cache = AnalyticsCache(enabled=True)
+        compute = Counter()
+
+        first = await cache.get_or_compute("u1", date(2024, 1, 1), date(2024, 1, 31), compute)
+        second = await cache.get_or_compute("u1", date(2024, 1, 1), date(2024, 1, 31), compute)
+
+        assert compute.calls == 1
+        assert first == second
+        assert cache.metrics()["hits"] == 1
+        assert cache.metrics()["misses"] == 1
+
+    @pytest.mark.asyncio
+    async def test_invalidate_is_per_user(self, fake):
+        cache = AnalyticsCache(enabled=True)
+        compute = Counter()
+        for user in ("u1", "u2"):
+            await cache.get_or_compute(user, date.min, date.max, compute)
+
+        await cache.invalidate("u1")
+        u1 = await cache.get_or_compute("u1", date.min, date.max, compute)
+        await cache.get_or_compute("u2", date.min, date.max, compute)
+
+        assert compute.calls == 3
+        assert u1.total_expenses == 3.0
+
+    @pytest.mark.asyncio
+    async def test_single_flight(self, fake):
+        cache = AnalyticsCache(enabled=True)
+        compute = Counter(delay=0.05)
+
+        results = await asyncio.gather(*(
+            cache.get_or_compute("u1", date.min, date.max, compute) for _ in range(20)
+        ))
+
+        assert compute.calls == 1
+        assert {r.total_expenses for r in results} == {1.0}
+        assert cache.metrics()["coalesced"] == 19
+
+    @pytest.mark.asyncio
+    async def test_cancelled_caller_keeps_computation(self, fake):
+        """Test cancelling one coalesced caller doesn't cancel the other's result"""
+        cache = AnalyticsCache(enabled=True)
+        compute = Counter(delay=0.05)
+        first = asyncio.ensure_future(cache.get_or_compute("u1", date.min, date.max, compute))
+        second = asyncio.ensure_future(cache.get_or_compute("u1", date.min, date.max, compute))
+        await asyncio.sleep(0.01)
+
+        first.cancel()
+        result = await second
+
+        assert first.cancelled()
+        assert result.total_expenses == 1.0
+        assert compute.calls == 1
+
+    @pytest.mark.asyncio
+    async def test_waits_for_other_process(self, fake):
+        cache = AnalyticsCache(enabled=True, lock_timeout=1)
+        cache.poll_interval = 0.01
+        key = cache.cache_key("u1", date.min, date.max)
+        fake.store[cache.lock_prefix + key] = "1"
+
+        async def other_process_finishes():
+            await asyncio.sleep(0.03)
+            fake.store[key] = json.dumps({
+                "version": 0, "computed_at": time.time(),
+                "result": make_result(42.0).model_dump(mode="json"),
+            })
+
+        compute = Counter()
+        result, _ = await asyncio.gather(
+            cache.get_or_compute("u1", date.min, date.max, compute), other_process_finishes()
+        )
+
+        assert compute.calls == 0
+        assert result.total_expenses == 42.0
+
+    @pytest.mark.asyncio
+    async def test_stale_while_revalidate(self, fake):
+        cache = AnalyticsCache(enabled=True, fresh_ttl=0)
+        compute = Counter(delay=0.01)
+        await cache.get_or_compute("u1", date.min, date.max, compute)
+
+        stale = await cache.get_or_compute("u1", date.min, date.max, compute)
+        await asyncio.sleep(0.05)
+
+        assert stale.total_expenses == 1.0
+        assert compute.calls == 2
+        assert cache.metrics()["stale_hits"] == 1
+        entry = json.loads(fake.store[cache.cache_key("u1", date.min, date.max)])
+        assert entry["result"]["total_expenses"] == 2.0
+
+    @pytest.mark.asyncio
+    async def test_store_many(self, fake):
+        cache = AnalyticsCache(enabled=True)
+        await cache.invalidate("u2")
+        versions = await cache.versions(["u1", "u2"])
+
+        stored = await cache.store_many(date.min, date.max, {"u1": make_result(1.0), "u2": make_result(2.0)}, versions)
+        await cache.invalidate("u2")
+        compute = Counter()
+        u1 = await cache.get_or_compute("u1", date.min, date.max, compute)
+        u2 = await cache.get_or_compute("u2", date.min, date.max, compute)
+
+        assert versions == {"u1": 0, "u2": 1}
+        assert stored == 2
+        assert u1.total_expenses == 1.0
+        # u2 wrote after its versions were read, so its stored entry is stale
+        assert (compute.calls, u2.total_expenses) == (1, 1.0)
+
+    @pytest.mark.asyncio
+    async def test_store_many_without_redis(self):
+        cache = AnalyticsCache(enabled=True)
+
+        with patch("app.handlers.analytics_cache.get_redis", return_value=None):
+            assert await cache.versions(["u1"]) is None
+            assert await cache.store_many(date.min, date.max, {"u1": make_result(1.0)}, None) == 0
+
+    @pytest.mark.asyncio
+    async def test_redis_down_computes_directly(self):
+        cache = AnalyticsCache(enabled=True)
+        compute = Counter()
+
+        with patch("app.handlers.analytics_cache.get_redis", return_value=None):
+            await cache.get_or_compute("u1", date.min, date.max, compute)
+            await cache.get_or_compute("u1", date.min, date.max, compute)
+
+        assert compute.calls == 2
+
+    @pytest.mark.asyncio
+    async def test_expense_writes_invalidate(self, fake, test_user, test_expenses, no_analytics_cache):
+        no_analytics_cache.enabled = True
+        service = AnalyticsService()
+        request = AnalyticsRequest(user_id=test_user.id)
+
+        before = await service.get_expense_analytics(request)
+        await ExpenseRepository().insert_categorized_expense(
+            test_user.telegram_id, "Cine", 10, "Entertainment", test_expenses[0].added_at
+        )
+        after = await service.get_expense_analytics(request)
+
+        assert before.total_expenses == 70.50
+        assert after.total_expenses == 80.50
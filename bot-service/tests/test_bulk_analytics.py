@@ -0,0 +1,89 @@
+import pytest
+import asyncio
+from datetime import date
+from decimal import Decimal
+from unittest.mock import patch
+from app.repositories.analytics import AnalyticsRepository
+from app.schemas.analytics import AnalyticsRequest
+from app.services.analytics import AnalyticsService
+from app.tasks.analytics import run_analytics_chunk_task, run_bulk_analytics_task, summarize_bulk_analytics_task
+
+USERS = ["test_user_123", "test_user_456", "nobody"]
+
+
+class TestBulkAnalytics:
+    """Unit tests for analytics over many users at once"""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("use_rollups", [True, False])
+    async def test_snapshots_match_single_user(self, test_user, test_user_2, test_expenses, use_rollups):
+        """Test the grouped query gives every user their own snapshot"""
+        repo = AnalyticsRepository(use_rollups=use_rollups)
+        start, end, month = date(2024, 1, 1), date(2024, 2, 29), date(2024, 2, 1)
+
+        snapshots = await repo.get_analytics_snapshots(USERS, start, end, month)
+
+        assert list(snapshots) == USERS
+        for user_id in USERS:
+            assert snapshots[user_id] == await repo.get_analytics_snapshot(user_id, start, end, month)
+        assert snapshots["nobody"].total == Decimal("0")
+
+    @pytest.mark.asyncio
+    async def test_one_query_for_all_users(self, db_session, assert_max_queries):
+        """Test the cost does not grow with the number of users"""
+        with assert_max_queries(1):
+            await AnalyticsRepository().get_analytics_snapshots([f"u{i}" for i in range(200)], date.min, date.max)
+
+    @pytest.mark.asyncio
+    async def test_service_matches_per_user_analytics(self, test_user, test_user_2, test_expenses):
+        """Test bulk results equal what get_expense_analytics returns per user"""
+        service = AnalyticsService()
+
+        results = await service.get_bulk_analytics(USERS, date(2024, 1, 1), date(2024, 2, 29))
+
+        for user_id in USERS:
+            single = await service.get_expense_analytics(
+                AnalyticsRequest(user_id=user_id, start_date=date(2024, 1, 1), end_date=date(2024, 2, 29))
+            )
+            assert results[user_id] == single
+        assert results[test_user.id].total_expenses == 70.5
+
+    @pytest.mark.asyncio
+    async def test_invalid_range(self):
+        with pytest.raises(ValueError):
+            await AnalyticsService().get_bulk_analytics(USERS, date(2024, 2, 1), date(2024, 1, 1))
+
+
+class TestBulkAnalyticsTasks:
+    """The dispatch, chunk and summary Celery tasks"""
+
+    @pytest.mark.asyncio
+    async def test_dispatch_all_users_in_chunks(self, test_user, test_user_2):
+        """Test "all" is resolved and split into one chord header task per chunk"""
+        with patch("app.tasks.analytics.chord") as chord:
+            chord.return_value.return_value.id = "chord-id"
+            submitted = await asyncio.to_thread(run_bulk_analytics_task, {"user_ids": "all", "chunk_size": 1,
+                                                                          "start_date": "2024-01-01"})
+
+        assert submitted == {"users": 2, "chunks": 2, "chord_id": "chord-id"}
+        header = chord.call_args.args[0]
+        assert [task.args for task in header.tasks] == [([test_user.id],), ([test_user_2.id],)]
+        assert header.tasks[0].kwargs == {"start_date": "2024-01-01", "end_date": None}
+
+    def test_dispatch_nothing(self):
+        with patch("app.tasks.analytics.chord") as chord:
+            assert run_bulk_analytics_task({"user_ids": []}) == {"users": 0, "chunks": 0, "chord_id": None}
+        chord.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_chunk_and_summary(self, test_user, test_user_2, test_expenses):
+        """Test a chunk computes its users and the callback adds the chunks up"""
+        chunks = [
+            await asyncio.to_thread(run_analytics_chunk_task, USERS[:2], "2024-01-01", "2024-01-31"),
+            await asyncio.to_thread(run_analytics_chunk_task, USERS[2:]),
+        ]
+
+        assert chunks[0] == {"users": 2, "active_users": 1, "total_expenses": 40.5}
+        assert summarize_bulk_analytics_task(chunks) == {
+            "chunks": 2, "users": 3, "active_users": 1, "total_expenses": 40.5,
+        }
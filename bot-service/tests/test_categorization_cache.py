@@ -0,0 +1,122 @@
+import pytest
+import json
+from unittest.mock import patch, MagicMock
+from app.handlers.categorization_cache import CategorizationCache
+from app.handlers.langchain_handler import categorize_expense
+from app.handlers.normalization import message_template, extract_amount
+
+
+class FakeRedis:
+    """Minimal async stand-in for the Redis tier"""
+
+    def __init__(self):
+        self.store = {}
+
+    async def get(self, key):
+        return self.store.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.store[key] = value
+
+
+class TestNormalization:
+    """Unit tests for message normalization"""
+
+    def test_amount_is_abstracted(self):
+        assert message_template("Pizza 20") == message_template("pizza  $25")
+        assert message_template("Café 3,5") == "cafe <amount>"
+
+    def test_ambiguous_messages_have_no_template(self):
+        assert message_template("2 cafes 6") is None
+        assert message_template("cafe") is None
+
+    def test_extract_amount(self):
+        assert extract_amount("subte 1.2") == 1.2
+        assert extract_amount("cafe 3,50") == 3.5
+        assert extract_amount("nafta $45") == 45.0
+        assert extract_amount("nada") is None
+
+
+class TestCategorizationCache:
+    """Unit tests for the two-tier categorization cache"""
+
+    @pytest.mark.asyncio
+    async def test_template_shared_and_amount_reextracted(self):
+        cache = CategorizationCache(use_redis=False)
+        await cache.set("pizza 20", "Food", 20.0, "Pizza")
+
+        result = await cache.get("Pizza 25")
+
+        assert result == ("Food", 25.0, "Pizza")
+        assert cache.metrics()["local_hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_amount_in_description_is_templated(self):
+        cache = CategorizationCache(use_redis=False)
+        await cache.set("nafta 45", "Transportation", 45.0, "Nafta 45")
+
+        result = await cache.get("nafta 30")
+
+        assert result == ("Transportation", 30.0, "Nafta 30")
+
+    @pytest.mark.asyncio
+    async def test_mismatched_amount_is_not_cached(self):
+        cache = CategorizationCache(use_redis=False)
+        await cache.set("pizza 20", "Food", 2.0, "Pizza")
+
+        assert await cache.get("pizza 20") is None
+        assert cache.metrics()["stores"] == 0
+
+    @pytest.mark.asyncio
+    async def test_ttl_expiry(self):
+        cache = CategorizationCache(ttl=10, use_redis=False)
+        with patch("app.handlers.categorization_cache.time.monotonic", return_value=100.0):
+            await cache.set("cafe 3", "Food", 3.0, "Cafe")
+        with patch("app.handlers.categorization_cache.time.monotonic", return_value=111.0):
+            assert await cache.get("cafe 3") is None
+        assert cache.metrics()["misses"] == 1
+
+    @pytest.mark.asyncio
+    async def test_lru_eviction(self):
+        cache = CategorizationCache(max_size=2, use_redis=False)
+        await cache.set("cafe 3", "Food", 3.0, "Cafe")
+        await cache.set("subte 1", "Transportation", 1.0, "Subte")
+        await cache.get("cafe 4")
+        await cache.set("nafta 45", "Transportation", 45.0, "Nafta")
+
+        assert await cache.get("subte 2") is None
+        assert await cache.get("cafe 5") is not None
+        assert cache.metrics()["evictions"] == 1
+
+    @pytest.mark.asyncio
+    async def test_redis_tier(self):
+        fake = FakeRedis()
+        writer = CategorizationCache(use_redis=True)
+        reader = CategorizationCache(use_redis=True)
+        with patch("app.handlers.categorization_cache.get_redis", return_value=fake):
+            await writer.set("pizza 20", "Food", 20.0, "Pizza")
+            result = await reader.get("pizza 30")
+
+        assert result == ("Food", 30.0, "Pizza")
+        assert json.loads(fake.store["catcache:v1:pizza <amount>"])["category"] == "Food"
+        assert reader.metrics()["redis_hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_categorize_expense_uses_cache(self, llm_only):
+        """Test that a repeated message template skips the LLM"""
+        with patch('app.handlers.langchain_handler.client') as mock_client:
+            mock_response = MagicMock()
+            mock_response.choices = [MagicMock()]
+            mock_response.choices[0].message.content = json.dumps({
+                "category": "Entertainment",
+                "amount": 12,
+                "description": "Cinema"
+            })
+            mock_client.chat.completions.create.return_value = mock_response
+
+            first = await categorize_expense("cinema 12")
+            second = await categorize_expense("Cinema 15")
+
+            assert first == ("Entertainment", 12.0, "Cinema")
+            assert second == ("Entertainment", 15.0, "Cinema")
+            mock_client.chat.completions.create.assert_called_once()
@@ -2,6 +2,10 @@ import pytest
 from app.repositories.expense import ExpenseRepository
 from app.services.expense import ExpenseService
 from app.schemas.expense import ExpenseCreate
+from app.core.db import engine
+from app.core.pagination import InvalidCursorError
+from sqlalchemy import event
+from unittest.mock import patch
 from datetime import datetime
 from decimal import Decimal
 
@@ -26,6 +30,40 @@ class TestExpenseRepository:
         assert result.amount == Decimal("25.50")
         assert result.telegram_id == test_user.telegram_id
 
+    @pytest.mark.asyncio
+    async def test_add_expense_categorizes_without_holding_connection(self, test_user):
+        """Test that no pooled connection is checked out while the LLM runs"""
+        checked_out = []
+        pool = engine.sync_engine.pool
+        on_checkout = lambda *args: checked_out.append(1)
+        on_checkin = lambda *args: checked_out.pop()
+        held_during_llm = []
+
+        async def slow_categorize(text):
+            held_during_llm.append(len(checked_out))
+            return ("Food", 25.50, "Pizza")
+
+        event.listen(pool, "checkout", on_checkout)
+        event.listen(pool, "checkin", on_checkin)
+        try:
+            with patch("app.repositories.expense.categorize_expense", slow_categorize):
+                result = await ExpenseRepository().add_expense(
+                    user_id="1",
+                    description="Pizza",
+                    amount=25.50,
+                    category="Food",
+                    telegram_id="555000111",
+                    text="Pizza 25.50"
+                )
+        finally:
+            event.remove(pool, "checkout", on_checkout)
+            event.remove(pool, "checkin", on_checkin)
+
+        assert held_during_llm == [0]
+        assert result is not None
+        assert result.user_id == "555000111"
+        assert result.telegram_id == "555000111"
+
     @pytest.mark.asyncio
     async def test_get_all_expenses(self, test_expenses):
         """Test getting all expenses"""
@@ -43,9 +81,9 @@ class TestExpenseRepository:
         expense_id = test_expenses[0].id
         expense = await repo.get_expense_by_id(expense_id)
         assert expense is not None
-        assert expense["id"] == expense_id
-        assert expense["description"] == "Test Food Expense"
-        assert "telegram_id" in expense
+        assert expense.id == expense_id
+        assert expense.description == "Test Food Expense"
+        assert expense.telegram_id == "123456789"
 
     @pytest.mark.asyncio
     async def test_delete_expense(self, test_expenses):
@@ -55,8 +93,7 @@ class TestExpenseRepository:
         
         result = await repo.delete_expense(expense_id)
         
-        assert isinstance(result, dict)
-        assert result["message"] == "Expense deleted successfully"
+        assert result is True
 
     @pytest.mark.asyncio
     async def test_update_expense(self, test_expenses):
@@ -71,12 +108,108 @@ class TestExpenseRepository:
             category="Food"
         )
         
-        assert isinstance(result, dict)
-        assert result["id"] == expense_id
-        assert result["description"] == "Updated Food"
-        assert result["amount"] == 30.00
-        assert result["category"] == "Food"
-        assert "telegram_id" in result
+        assert result.id == expense_id
+        assert result.description == "Updated Food"
+        assert result.amount == 30.00
+        assert result.category == "Food"
+        assert result.telegram_id == "123456789"
+
+
+    @pytest.mark.asyncio
+    async def test_read_paths_use_one_query(self, test_expenses, assert_max_queries):
+        """Test listing, fetching and updating never look users up per expense"""
+        repo = ExpenseRepository()
+
+        with assert_max_queries(1):
+            expenses = await repo.get_all_expenses(skip=0, limit=100)
+        with assert_max_queries(1):
+            expense = await repo.get_expense_by_id(test_expenses[0].id)
+
+        assert [e.telegram_id for e in expenses] == ["123456789"] * 3
+        assert expense.telegram_id == "123456789"
+
+    @pytest.mark.asyncio
+    async def test_update_does_not_reload(self, test_expenses, assert_max_queries):
+        """Test update reads the expense and its user once, then writes"""
+        repo = ExpenseRepository()
+
+        with assert_max_queries(2) as queries:
+            result = await repo.update_expense(test_expenses[1].id, description="Subte")
+
+        assert [q.split()[0] for q in queries.statements] == ["SELECT", "UPDATE"]
+        assert result.telegram_id == "123456789"
+
+
+    @pytest.mark.asyncio
+    async def test_cursor_pagination(self, test_user, test_expenses):
+        """Test cursor pages cover every expense once, in (added_at, id) order"""
+        repo = ExpenseRepository()
+        # Same timestamp as expense 1, so the id breaks the tie
+        await repo.insert_categorized_expense(test_user.telegram_id, "Cafe", 3, "Food", datetime(2024, 1, 15))
+
+        seen, cursor = [], None
+        for _ in range(3):
+            page, cursor = await repo.list_expenses(limit=2, cursor=cursor)
+            seen += [e.id for e in page]
+            if cursor is None:
+                break
+
+        assert seen == [1, 4, 2, 3]
+        assert cursor is None
+
+    @pytest.mark.asyncio
+    async def test_list_expenses_filters(self, test_user, test_user_2, test_expenses):
+        """Test user and date filters"""
+        repo = ExpenseRepository()
+        await repo.insert_categorized_expense(test_user_2.telegram_id, "Taxi", 9, "Transportation", datetime(2024, 1, 16))
+
+        page, cursor = await repo.list_expenses(
+            user_id=test_user.id, start_date=datetime(2024, 1, 16), end_date=datetime(2024, 2, 28)
+        )
+
+        assert [e.id for e in page] == [2, 3]
+        assert cursor is None
+
+    @pytest.mark.asyncio
+    async def test_invalid_cursor(self, db_session):
+        """Test malformed cursors are rejected"""
+        with pytest.raises(InvalidCursorError):
+            await ExpenseRepository().list_expenses(cursor="not-a-cursor")
+
+    @pytest.mark.asyncio
+    async def test_list_expenses_sorted_by_amount(self, test_user, test_expenses):
+        """Test amount_desc pages with ties broken by id"""
+        repo = ExpenseRepository()
+        await repo.insert_categorized_expense(test_user.telegram_id, "Cine", 25.50, "Entertainment", datetime(2024, 3, 1))
+
+        seen, cursor = [], None
+        while True:
+            page, cursor = await repo.list_expenses(user_id=test_user.id, sort="amount_desc", limit=2, cursor=cursor)
+            seen += [(e.amount, e.id) for e in page]
+            if cursor is None:
+                break
+
+        assert seen == [(30.0, 3), (25.5, 4), (25.5, 1), (15.0, 2)]
+
+    @pytest.mark.asyncio
+    async def test_list_expenses_category_and_amount_filters(self, test_user, test_expenses):
+        """Test category and amount range filters"""
+        repo = ExpenseRepository()
+
+        food, _ = await repo.list_expenses(user_id=test_user.id, category="Food", sort="date_desc")
+        cheap, _ = await repo.list_expenses(user_id=test_user.id, min_amount=Decimal("10"), max_amount=Decimal("26"))
+
+        assert [e.id for e in food] == [3, 1]
+        assert [e.id for e in cheap] == [1, 2]
+
+    @pytest.mark.asyncio
+    async def test_cursor_bound_to_sort(self, test_user, test_expenses):
+        """Test a cursor can't be replayed under another sort"""
+        repo = ExpenseRepository()
+        _, cursor = await repo.list_expenses(user_id=test_user.id, sort="date_desc", limit=1)
+
+        with pytest.raises(InvalidCursorError):
+            await repo.list_expenses(user_id=test_user.id, sort="amount_desc", cursor=cursor)
 
 
 class TestExpenseService:
@@ -143,7 +276,7 @@ class TestExpenseService:
         assert hasattr(expense, 'telegram_id')
 
     @pytest.mark.asyncio
-    async def test_get_expense_not_found_service(self):
+    async def test_get_expense_not_found_service(self, db_session):
         """Test getting non-existent expense via service"""
         service = ExpenseService()
         
@@ -162,7 +295,7 @@ class TestExpenseService:
         assert success is True
 
     @pytest.mark.asyncio
-    async def test_delete_expense_not_found_service(self):
+    async def test_delete_expense_not_found_service(self, db_session):
         """Test deleting non-existent expense via service"""
         service = ExpenseService()
         
@@ -189,7 +322,7 @@ class TestExpenseService:
         assert hasattr(result, 'telegram_id')
 
     @pytest.mark.asyncio
-    async def test_update_expense_not_found_service(self):
+    async def test_update_expense_not_found_service(self, db_session):
         """Test updating non-existent expense via service"""
         service = ExpenseService()
         
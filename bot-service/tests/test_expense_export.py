@@ -0,0 +1,71 @@
+import pytest
+import csv
+import gzip
+import io
+import json
+from datetime import datetime
+from unittest.mock import patch
+from app.repositories.expense import ExpenseRepository
+from app.services.expense_export import ExpenseExportService, ExportFormatUnavailable
+
+
+async def collect(chunks) -> bytes:
+    return b"".join([chunk async for chunk in chunks])
+
+
+class TestExpenseExport:
+    """Unit tests for the streaming expense export"""
+
+    @pytest.mark.asyncio
+    async def test_stream_in_batches(self, test_user, test_expenses):
+        """Test rows arrive in batches of batch_size, oldest first"""
+        batches = [
+            [row.id for row in batch]
+            async for batch in ExpenseRepository().stream_expenses(user_id=test_user.id, batch_size=2)
+        ]
+
+        assert batches == [[1, 2], [3]]
+
+    @pytest.mark.asyncio
+    async def test_csv(self, test_user, test_expenses):
+        """Test CSV export has a header and one line per expense"""
+        data = await collect(ExpenseExportService(batch_size=2).export("csv", user_id=test_user.id))
+
+        rows = list(csv.DictReader(io.StringIO(data.decode())))
+        assert [r["id"] for r in rows] == ["1", "2", "3"]
+        assert rows[0]["amount"] == "25.50"
+        assert rows[0]["telegram_id"] == test_user.telegram_id
+        assert rows[0]["added_at"] == "2024-01-15T00:00:00"
+
+    @pytest.mark.asyncio
+    async def test_ndjson_gzip(self, test_user, test_expenses):
+        """Test gzipped NDJSON round-trips"""
+        data = await collect(ExpenseExportService().export(
+            "ndjson", gzip=True, user_id=test_user.id, start_date=datetime(2024, 1, 16)
+        ))
+
+        rows = [json.loads(line) for line in gzip.decompress(data).decode().splitlines()]
+        assert [(r["id"], r["amount"], r["category"]) for r in rows] == [(2, 15.0, "Transportation"), (3, 30.0, "Food")]
+
+    @pytest.mark.asyncio
+    async def test_empty_csv_has_header(self, db_session):
+        """Test exporting nothing still yields a valid file"""
+        data = await collect(ExpenseExportService().export("csv", user_id="nobody"))
+
+        assert data.decode().strip() == "id,user_id,telegram_id,description,amount,category,added_at"
+
+    @pytest.mark.asyncio
+    async def test_parquet(self, test_user, test_expenses):
+        """Test Parquet export writes one row group per batch"""
+        pq = pytest.importorskip("pyarrow.parquet")
+        data = await collect(ExpenseExportService(batch_size=2).export("parquet", user_id=test_user.id))
+
+        parquet = pq.ParquetFile(io.BytesIO(data))
+        assert parquet.metadata.num_row_groups == 2
+        assert parquet.read().column("id").to_pylist() == [1, 2, 3]
+
+    def test_parquet_requires_pyarrow(self):
+        """Test a missing pyarrow is reported before streaming starts"""
+        with patch("app.services.expense_export.parquet_available", return_value=False):
+            with pytest.raises(ExportFormatUnavailable):
+                ExpenseExportService().export("parquet")
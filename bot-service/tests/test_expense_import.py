@@ -0,0 +1,167 @@
+import pytest
+from datetime import date, datetime
+from decimal import Decimal
+from unittest.mock import AsyncMock, patch
+from sqlalchemy import func, select
+from app.core.db import AsyncSessionLocal
+from app.models.expense import Expense
+from app.models.rollup import ExpenseRollup
+from app.models.user import User
+from app.services.expense_import import ExpenseImportService, iter_csv_rows
+
+
+async def chunked(data: str, size: int = 7):
+    """Yield data in small byte chunks, splitting lines and multi-byte characters"""
+    raw = data.encode()
+    for i in range(0, len(raw), size):
+        yield raw[i:i + size]
+
+
+async def count(model) -> int:
+    async with AsyncSessionLocal() as session:
+        return (await session.execute(select(func.count()).select_from(model))).scalar()
+
+
+class TestExpenseImport:
+    """Unit tests for the bulk expense import"""
+
+    @pytest.mark.asyncio
+    async def test_csv_import(self, test_user):
+        """Test a CSV with quoted fields is imported across chunk boundaries"""
+        data = (
+            "telegram_id,description,amount,category,added_at\n"
+            f"{test_user.telegram_id},Café,\"1,234.5\",Food,2024-03-01T09:00:00\n"
+            f"{test_user.telegram_id},Pizza,20,Food,2024-03-01T21:00:00\n"
+            "999,\"Taxi\naeropuerto\",12.5,Transportation,2024-03-02T08:00:00+03:00\n"
+        )
+
+        result = await ExpenseImportService().import_expenses(chunked(data), "csv")
+
+        assert (result.imported, result.failed) == (2, 1)
+        assert result.errors[0].line == 2
+        assert "amount" in result.errors[0].error
+
+        async with AsyncSessionLocal() as session:
+            expenses = (await session.execute(select(Expense).order_by(Expense.id))).scalars().all()
+            new_user = (await session.execute(select(User).where(User.telegram_id == "999"))).scalar_one()
+            rollups = (await session.execute(
+                select(ExpenseRollup.day, ExpenseRollup.total, ExpenseRollup.count)
+                .where(ExpenseRollup.user_id == test_user.id)
+            )).all()
+        assert [(e.description, e.amount) for e in expenses] == [
+            ("Pizza", Decimal("20.00")), ("Taxi\naeropuerto", Decimal("12.50"))
+        ]
+        assert expenses[1].user_id == new_user.id
+        assert expenses[1].added_at == datetime(2024, 3, 2, 5)
+        assert rollups == [(date(2024, 3, 1), Decimal("20.00"), 1)]
+
+    @pytest.mark.asyncio
+    async def test_jsonl_reports_bad_rows(self, test_user):
+        """Test invalid rows are reported by line and the rest imported"""
+        data = "\n".join([
+            '{"telegram_id": "1", "description": "Pan", "amount": 3, "category": "Food"}',
+            '{"telegram_id": "1", "description": "Pan", "amount": 3',
+            '',
+            '["not", "an", "object"]',
+            '{"description": "Pan", "amount": 3, "category": "Food"}',
+            '{"telegram_id": "1", "description": "Pan", "amount": -3, "category": "Food"}',
+            '{"telegram_id": "1", "description": "Pan", "amount": 3}',
+            '{"telegram_id": "1", "description": "Leche", "amount": 2.5, "category": "Food"}',
+        ])
+
+        result = await ExpenseImportService().import_expenses(chunked(data), "jsonl")
+
+        assert result.imported == 2
+        assert [e.line for e in result.errors] == [2, 4, 5, 6, 7]
+        assert result.errors[2].error.startswith("telegram_id:")
+        assert "categorize=true" in result.errors[4].error
+        assert await count(Expense) == 2
+
+    @pytest.mark.asyncio
+    async def test_rejects_amounts_the_column_cannot_hold(self, test_user):
+        """Test amounts over Numeric(10, 2) or with more than two decimals are reported"""
+        data = "\n".join([
+            "telegram_id,description,amount,category",
+            "1,Auto,99999999.99,Other",
+            "1,Casa,100000000,Housing",
+            "1,Pan,1.005,Food",
+        ])
+
+        result = await ExpenseImportService().import_expenses(chunked(data), "csv")
+
+        assert result.imported == 1
+        assert [e.line for e in result.errors] == [3, 4]
+        assert "less than or equal" in result.errors[0].error
+        assert "decimal places" in result.errors[1].error
+
+    @pytest.mark.asyncio
+    async def test_failed_batch_retried_row_by_row(self, test_user):
+        """Test a batch the database rejects only reports the offending row"""
+        service = ExpenseImportService(batch_size=10)
+        bulk_insert = service.expense_repo.bulk_insert_expenses
+
+        async def reject_bad_rows(rows):
+            if any(row["description"] == "Bad" for row in rows):
+                raise Exception("value out of range")
+            return await bulk_insert(rows)
+
+        data = "telegram_id,description,amount,category\n1,Pan,3,Food\n1,Bad,4,Food\n1,Leche,2.5,Food\n"
+        with patch.object(service.expense_repo, "bulk_insert_expenses", side_effect=reject_bad_rows):
+            result = await service.import_expenses(chunked(data), "csv")
+
+        assert (result.imported, result.failed) == (2, 1)
+        assert result.errors[0].line == 3
+        assert "value out of range" in result.errors[0].error
+        assert await count(Expense) == 2
+
+    @pytest.mark.asyncio
+    async def test_categorize_missing_fields(self, test_user):
+        """Test categorize=true fills category and amount from the text"""
+        data = '{"telegram_id": "1", "text": "super 45"}\n{"telegram_id": "1", "text": "hola"}\n'
+        categorize = AsyncMock(side_effect=[("Food", 45.0, "Super"), ("Misc", 0.0, "hola")])
+
+        with patch("app.services.expense_import.categorize_expense", categorize):
+            result = await ExpenseImportService().import_expenses(chunked(data), "jsonl", categorize=True)
+
+        assert (result.imported, result.categorized) == (1, 2)
+        assert result.errors[0].line == 2
+        async with AsyncSessionLocal() as session:
+            expense = (await session.execute(select(Expense))).scalar_one()
+        assert (expense.category, expense.amount, expense.description) == ("Food", Decimal("45.00"), "Super")
+
+    @pytest.mark.asyncio
+    async def test_batches_and_error_cap(self, db_session):
+        """Test rows are written per batch and only max_errors are listed"""
+        lines = ["telegram_id,description,amount,category"]
+        lines += [f"{i % 3},Item {i},{i + 1},Other" for i in range(25)]
+        lines += ["1,Broken,abc,Other"] * 5
+        service = ExpenseImportService(batch_size=10, max_errors=3)
+
+        with patch.object(service.expense_repo, "bulk_insert_expenses",
+                          wraps=service.expense_repo.bulk_insert_expenses) as bulk:
+            result = await service.import_expenses(chunked("\n".join(lines), size=64), "csv")
+
+        assert [len(call.args[0]) for call in bulk.call_args_list] == [10, 10, 5]
+        assert (result.imported, result.failed) == (25, 5)
+        assert len(result.errors) == 3
+        assert result.errors_truncated
+        assert await count(User) == 3
+
+    @pytest.mark.asyncio
+    async def test_batch_query_count(self, db_session, assert_max_queries):
+        """Test a batch costs a fixed number of statements, not one per row"""
+        data = "telegram_id,description,amount,category\n" + "".join(
+            f"{i % 50},Item,{i + 1},Other\n" for i in range(500)
+        )
+
+        with assert_max_queries(5):
+            result = await ExpenseImportService().import_expenses(chunked(data, size=4096), "csv")
+
+        assert result.imported == 500
+
+    @pytest.mark.asyncio
+    async def test_csv_requires_telegram_id_column(self):
+        """Test a CSV without telegram_id is rejected up front"""
+        with pytest.raises(ValueError):
+            async for _ in iter_csv_rows(chunked("description,amount\nPan,3\n")):
+                pass
@@ -0,0 +1,182 @@
+import pytest
+import asyncio
+import threading
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
+from app.handlers.health_monitor import HealthMonitor, health_monitor
+
+
+def stub_checks(monitor: HealthMonitor, database="healthy", redis="healthy", celery="healthy: 1 workers"):
+    monitor._check_database = AsyncMock(return_value=database)
+    monitor._check_redis = AsyncMock(return_value=redis)
+    monitor._check_celery = AsyncMock(return_value=celery)
+    return monitor
+
+
+class TestHealthMonitor:
+    """Unit tests for the background health monitor"""
+
+    @pytest.mark.asyncio
+    async def test_answers_from_cache(self):
+        """Test fresh results are served without probing again"""
+        monitor = stub_checks(HealthMonitor(interval=10, timeout=1))
+
+        first = await monitor.current()
+        second = await monitor.current()
+
+        assert first["status"] == second["status"] == "healthy"
+        assert second["checks"] == {"database": "healthy", "redis": "healthy", "celery": "healthy: 1 workers"}
+        assert monitor._check_database.await_count == 1
+        assert monitor.probes == 3
+
+    @pytest.mark.asyncio
+    async def test_stale_and_refresh(self):
+        """Test results older than max_age (or refresh=true) are probed again"""
+        monitor = stub_checks(HealthMonitor(interval=10, timeout=1))
+        await monitor.current(["database"])
+
+        monitor._results["database"]["checked_at"] -= monitor.max_age + 1
+        await monitor.current(["database"])
+        await monitor.current(["database"], refresh=True)
+
+        assert monitor._check_database.await_count == 3
+        assert monitor._check_redis.await_count == 0
+
+    @pytest.mark.asyncio
+    async def test_concurrent_requests_share_probe(self):
+        monitor = stub_checks(HealthMonitor(interval=10, timeout=1))
+
+        async def slow_ping():
+            await asyncio.sleep(0.02)
+            return "healthy"
+        monitor._check_database = AsyncMock(side_effect=slow_ping)
+
+        await asyncio.gather(*(monitor.current(["database"]) for _ in range(20)))
+
+        assert monitor._check_database.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_timeout_is_unhealthy(self):
+        monitor = stub_checks(HealthMonitor(interval=10, timeout=0.01))
+
+        async def hang():
+            await asyncio.sleep(1)
+        monitor._check_redis = AsyncMock(side_effect=hang)
+
+        report = await monitor.current()
+
+        assert report["status"] == "unhealthy"
+        assert report["checks"]["redis"].startswith("unhealthy: timed out")
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("checks,status", [
+        ({"celery": "unhealthy: no active workers"}, "degraded"),
+        ({"celery": "unhealthy: broker down"}, "unhealthy"),
+        ({"database": "unhealthy: refused", "celery": "unhealthy: no active workers"}, "unhealthy"),
+    ])
+    async def test_overall_status(self, checks, status):
+        monitor = stub_checks(HealthMonitor(interval=10, timeout=1), **checks)
+
+        assert (await monitor.current())["status"] == status
+
+    @pytest.mark.asyncio
+    async def test_probe_errors(self):
+        """Test a raising probe is reported, not propagated"""
+        monitor = stub_checks(HealthMonitor(interval=10, timeout=1))
+        monitor._check_database = AsyncMock(side_effect=ConnectionError("refused"))
+
+        report = await monitor.current(["database"])
+
+        assert report == {"status": "unhealthy", "service": "bot-service",
+                          "checks": {"database": "unhealthy: refused"},
+                          "checked_at": report["checked_at"]}
+
+    @pytest.mark.asyncio
+    async def test_redis_backing_off(self):
+        with patch("app.handlers.health_monitor.get_redis", return_value=None):
+            report = await HealthMonitor(interval=10, timeout=1).current(["redis"])
+
+        assert report["checks"]["redis"] == "unhealthy: unavailable (backing off)"
+
+    @pytest.mark.asyncio
+    async def test_database_probe(self):
+        """Test the database probe against the test engine"""
+        report = await HealthMonitor(interval=10, timeout=1).current(["database"])
+
+        assert report["status"] == "healthy"
+
+    @pytest.mark.asyncio
+    async def test_celery_probe_runs_off_loop(self):
+        """Test the blocking Celery broadcast doesn't stall the event loop"""
+        threads = []
+
+        def ping():
+            threads.append(threading.current_thread())
+            time.sleep(0.05)
+            return {"worker1": {"ok": "pong"}}
+
+        celery_app = MagicMock()
+        celery_app.control.inspect.return_value.ping.side_effect = ping
+        with patch("app.handlers.health_monitor.celery_app", celery_app):
+            probe = asyncio.ensure_future(HealthMonitor(interval=10, timeout=1).current(["celery"]))
+            ticks = 0
+            while not probe.done():
+                ticks += 1
+                await asyncio.sleep(0.005)
+
+        assert probe.result()["checks"]["celery"] == "healthy: 1 workers"
+        assert threads[0] is not threading.main_thread()
+        assert ticks > 3
+
+    @pytest.mark.asyncio
+    async def test_background_loop(self):
+        monitor = stub_checks(HealthMonitor(interval=0.01, timeout=1))
+
+        monitor.start()
+        await asyncio.sleep(0.035)
+        assert monitor.metrics()["running"]
+        await monitor.stop()
+
+        assert not monitor.metrics()["running"]
+        assert monitor._check_database.await_count >= 2
+        assert set(monitor.metrics()["checks"]) == {"database", "redis", "celery"}
+
+
+class TestHealthEndpoints:
+    """Health routes answer from the monitor"""
+
+    @pytest.fixture
+    def results(self):
+        saved = dict(health_monitor._results)
+        health_monitor._results.clear()
+        yield health_monitor._results
+        health_monitor._results.clear()
+        health_monitor._results.update(saved)
+
+    def cached(self, results, **checks):
+        for name, status in checks.items():
+            results[name] = {"status": status, "checked_at": time.time(), "latency_ms": 1.0}
+
+    @pytest.mark.asyncio
+    async def test_health_from_cache(self, async_client, results):
+        self.cached(results, database="healthy", redis="healthy", celery="unhealthy: no active workers")
+
+        with patch.object(health_monitor, "_probe") as probe:
+            response = await async_client.get("/health/")
+
+        assert response.status_code == 200
+        assert response.json()["status"] == "degraded"
+        probe.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_unhealthy_is_503(self, async_client, results):
+        self.cached(results, database="unhealthy: refused", redis="healthy", celery="healthy: 1 workers")
+
+        health = await async_client.get("/health/")
+        ready = await async_client.get("/health/ready")
+        main = await async_client.get("/health")
+
+        assert health.status_code == 503
+        assert ready.status_code == 503
+        assert ready.json()["detail"] == {"status": "not ready", "error": "unhealthy: refused"}
+        assert main.json() == {"status": "unhealthy", "error": "unhealthy: refused"}
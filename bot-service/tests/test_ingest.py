@@ -0,0 +1,238 @@
+import pytest
+import hashlib
+import hmac
+import json
+from httpx import AsyncClient
+from datetime import datetime, timedelta
+from decimal import Decimal
+from unittest.mock import patch, MagicMock, AsyncMock
+from sqlalchemy import select, func, update
+from app.core.db import AsyncSessionLocal
+from app.models.expense import Expense
+from app.models.ingest import IngestMessage
+from app.services.ingest import IngestService
+from app.schemas.expense import ExpenseIngestRequest
+
+
+async def set_claimed(ingest_id, claimed_at, status="processing"):
+    """Leave a message as a worker would have: claimed at claimed_at"""
+    async with AsyncSessionLocal() as session:
+        async with session.begin():
+            await session.execute(
+                update(IngestMessage).where(IngestMessage.id == ingest_id).values(status=status, claimed_at=claimed_at)
+            )
+
+
+def ingest_request(**overrides):
+    data = {
+        "telegram_id": "123456789",
+        "telegram_message_id": "42",
+        "text": "Pizza 20",
+        "received_at": datetime(2024, 3, 1, 12, 30),
+    }
+    data.update(overrides)
+    return ExpenseIngestRequest(**data)
+
+
+class TestIngestEndpoints:
+    """Integration tests for the accepted ingest mode"""
+
+    @pytest.mark.asyncio
+    async def test_ingest_returns_202_and_enqueues(self, async_client: AsyncClient, db_session):
+        with patch('app.routes.expense.process_ingest_message') as mock_task:
+            response = await async_client.post("/api/expenses/ingest", json={
+                "telegram_id": "123456789",
+                "telegram_message_id": "42",
+                "text": "Pizza 20",
+            })
+
+        assert response.status_code == 202
+        data = response.json()
+        assert data["status"] == "pending"
+        assert data["duplicate"] is False
+        mock_task.delay.assert_called_once_with(data["ingest_id"])
+
+    @pytest.mark.asyncio
+    async def test_duplicate_message_is_idempotent(self, async_client: AsyncClient, db_session):
+        payload = {"telegram_id": "123456789", "telegram_message_id": "42", "text": "Pizza 20"}
+        with patch('app.routes.expense.process_ingest_message'):
+            first = (await async_client.post("/api/expenses/ingest", json=payload)).json()
+            second = (await async_client.post("/api/expenses/ingest", json=payload)).json()
+
+        assert second["ingest_id"] == first["ingest_id"]
+        assert second["duplicate"] is True
+
+    @pytest.mark.asyncio
+    async def test_duplicate_with_dead_worker_is_requeued(self, async_client: AsyncClient, db_session):
+        """Test a redelivery re-enqueues a message whose worker lease expired"""
+        payload = {"telegram_id": "123456789", "telegram_message_id": "42", "text": "Pizza 20"}
+        with patch('app.routes.expense.process_ingest_message') as mock_task:
+            ingest_id = (await async_client.post("/api/expenses/ingest", json=payload)).json()["ingest_id"]
+            await set_claimed(ingest_id, datetime.utcnow())
+            await async_client.post("/api/expenses/ingest", json=payload)
+            assert mock_task.delay.call_count == 1
+
+            await set_claimed(ingest_id, datetime.utcnow() - timedelta(hours=1))
+            await async_client.post("/api/expenses/ingest", json=payload)
+            assert mock_task.delay.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_ingest_status_not_found(self, async_client: AsyncClient, db_session):
+        response = await async_client.get("/api/expenses/ingest/999")
+        assert response.status_code == 404
+
+
+class TestIngestService:
+    """Unit tests for background processing of accepted messages"""
+
+    @pytest.mark.asyncio
+    async def test_process_creates_expense_once(self, test_user):
+        service = IngestService()
+        message, created = await service.accept(ingest_request())
+
+        processed = await service.process(message.id)
+        again = await service.process(message.id)
+
+        assert created is True
+        assert processed.status == "done"
+        assert processed.expense_id is not None
+        assert again is None
+
+        async with AsyncSessionLocal() as session:
+            expense = (await session.execute(select(Expense).where(Expense.id == processed.expense_id))).scalar_one()
+            count = (await session.execute(select(func.count(Expense.id)))).scalar()
+        assert count == 1
+        assert expense.category == "Food"
+        assert expense.amount == Decimal("20")
+        assert expense.added_at == datetime(2024, 3, 1, 12, 30)
+        assert expense.user_id == test_user.id
+
+    @pytest.mark.asyncio
+    async def test_process_failure_marks_failed(self, test_user):
+        service = IngestService()
+        message, _ = await service.accept(ingest_request())
+
+        with patch.object(service.expense_repo, "insert_categorized_expense", side_effect=Exception("DB Error")):
+            with pytest.raises(Exception, match="DB Error"):
+                await service.process(message.id)
+
+        failed = await service.get(message.id)
+        assert failed.status == "failed"
+        assert failed.error == "DB Error"
+
+        retried = await service.process(message.id)
+        assert retried.status == "done"
+
+    @pytest.mark.asyncio
+    async def test_llm_outage_is_retried(self, test_user):
+        """Test an LLM failure fails the message instead of storing a Misc fallback"""
+        service = IngestService()
+        message, _ = await service.accept(ingest_request(text="compra en qwzxv 20"))
+
+        with patch("app.handlers.langchain_handler.llm_batcher.submit", side_effect=TimeoutError("Groq timeout")):
+            with pytest.raises(TimeoutError):
+                await service.process(message.id)
+
+        failed = await service.get(message.id)
+        assert (failed.status, failed.expense_id) == ("failed", None)
+        async with AsyncSessionLocal() as session:
+            assert (await session.execute(select(func.count(Expense.id)))).scalar() == 0
+
+        with patch("app.handlers.langchain_handler.llm_batcher.submit",
+                   AsyncMock(return_value=("Other", 20.0, "compra en qwzxv"))):
+            retried = await service.process(message.id)
+        assert retried.status == "done"
+
+    @pytest.mark.asyncio
+    async def test_expired_lease_is_reclaimed(self, test_user):
+        """Test a message left processing by a dead worker is taken back"""
+        service = IngestService()
+        message, _ = await service.accept(ingest_request())
+
+        await set_claimed(message.id, datetime.utcnow())
+        assert await service.process(message.id) is None
+
+        await set_claimed(message.id, datetime.utcnow() - timedelta(hours=1))
+        processed = await service.process(message.id)
+        assert processed.status == "done"
+        assert processed.expense_id is not None
+
+    @pytest.mark.asyncio
+    async def test_reclaimed_worker_cannot_complete(self, test_user):
+        """Test the worker whose lease was taken over can't store the expense too"""
+        service = IngestService()
+        message, _ = await service.accept(ingest_request())
+        claim = await service.ingest_repo.claim(message.id)
+        await set_claimed(message.id, datetime.utcnow() - timedelta(hours=1))
+        assert await service.ingest_repo.claim(message.id) is not None
+
+        with pytest.raises(RuntimeError, match="not being processed"):
+            await service.expense_repo.insert_categorized_expense(
+                message.telegram_id, "Pizza", 20, "Food", message.received_at,
+                ingest_id=message.id, ingest_claimed_at=claim.claimed_at,
+            )
+        await service.ingest_repo.fail(message.id, "stale", claimed_at=claim.claimed_at)
+
+        async with AsyncSessionLocal() as session:
+            count = (await session.execute(select(func.count(Expense.id)))).scalar()
+        assert count == 0
+        assert (await service.get(message.id)).status == "processing"
+
+    @pytest.fixture
+    def callback_client(self):
+        mock_client = MagicMock()
+        mock_client.__aenter__ = AsyncMock(return_value=mock_client)
+        mock_client.__aexit__ = AsyncMock(return_value=False)
+        mock_client.post = AsyncMock(return_value=MagicMock())
+        with patch('app.services.ingest.httpx.AsyncClient', return_value=mock_client), \
+                patch('app.services.ingest.INGEST_CALLBACK_URL', "http://connector/callbacks/expenses"), \
+                patch('app.services.ingest.INGEST_CALLBACK_SECRET', "secret"):
+            yield mock_client
+
+    @pytest.mark.asyncio
+    async def test_callback_is_notified(self, test_user, callback_client):
+        service = IngestService()
+        message, _ = await service.accept(ingest_request(chat_id="1"))
+
+        await service.process(message.id)
+
+        url = callback_client.post.call_args[0][0]
+        body = callback_client.post.call_args[1]["content"]
+        headers = callback_client.post.call_args[1]["headers"]
+        payload = json.loads(body)
+        assert url == "http://connector/callbacks/expenses"
+        assert payload["chat_id"] == "1"
+        assert payload["status"] == "done"
+        assert payload["expense"]["category"] == "Food"
+        assert payload["expense"]["amount"] == 20.0
+        expected = hmac.new(b"secret", headers["X-Signature-Timestamp"].encode() + b"." + body, hashlib.sha256)
+        assert headers["X-Signature"] == "sha256=" + expected.hexdigest()
+        callback_client.post.return_value.raise_for_status.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_callback_url_from_request_is_ignored(self, test_user, callback_client):
+        """Test a client-supplied URL is never called (SSRF)"""
+        service = IngestService()
+        message, _ = await service.accept(ExpenseIngestRequest(
+            telegram_id="123456789", telegram_message_id="42", text="Pizza 20",
+            callback_url="http://169.254.169.254/latest/meta-data",
+        ))
+
+        await service.process(message.id)
+
+        callback_client.post.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_no_callback_without_secret(self, test_user, callback_client):
+        service = IngestService()
+        message, _ = await service.accept(ingest_request(chat_id="1"))
+
+        with patch('app.services.ingest.INGEST_CALLBACK_SECRET', None):
+            await service.process(message.id)
+
+        callback_client.post.assert_not_called()
+
+    def test_ingest_task_registered(self):
+        from app.tasks.ingest import process_ingest_message
+
+        assert process_ingest_message.name == "process_ingest_message"
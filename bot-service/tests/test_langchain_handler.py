@@ -3,6 +3,8 @@ from app.handlers.langchain_handler import categorize_expense
 from unittest.mock import patch, MagicMock
 import json
 
+pytestmark = pytest.mark.usefixtures("llm_only")
+
 class TestLangchainHandler:
     """Unit tests for langchain expense categorization"""
     
@@ -0,0 +1,144 @@
+import pytest
+import asyncio
+import json
+from unittest.mock import patch, MagicMock
+from app.handlers.llm_batcher import CategorizationBatcher
+from app.handlers.langchain_handler import categorize_expense
+
+
+def make_batcher(batch_results=None, batch_error=None, **kwargs):
+    calls = {"single": [], "batch": []}
+
+    async def single(text):
+        calls["single"].append(text)
+        return ("Other", 1.0, text)
+
+    async def batch(texts):
+        calls["batch"].append(list(texts))
+        if batch_error:
+            raise batch_error
+        if batch_results is not None:
+            return batch_results(texts)
+        return [("Food", float(i), text) for i, text in enumerate(texts)]
+
+    return CategorizationBatcher(single, batch, **kwargs), calls
+
+
+class TestCategorizationBatcher:
+    """Unit tests for the LLM micro-batching scheduler"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_requests_share_one_batch(self):
+        batcher, calls = make_batcher(max_batch_size=8, max_wait_ms=20)
+
+        results = await asyncio.gather(*(batcher.submit(f"item {i}") for i in range(3)))
+
+        assert calls["batch"] == [["item 0", "item 1", "item 2"]]
+        assert calls["single"] == []
+        assert [r[2] for r in results] == ["item 0", "item 1", "item 2"]
+        assert batcher.metrics()["avg_batch_size"] == 3
+
+    @pytest.mark.asyncio
+    async def test_flush_on_max_batch_size(self):
+        batcher, calls = make_batcher(max_batch_size=2, max_wait_ms=10000)
+
+        await asyncio.wait_for(
+            asyncio.gather(*(batcher.submit(f"item {i}") for i in range(4))),
+            timeout=1,
+        )
+
+        assert calls["batch"] == [["item 0", "item 1"], ["item 2", "item 3"]]
+
+    @pytest.mark.asyncio
+    async def test_single_item_uses_single_call(self):
+        batcher, calls = make_batcher(max_batch_size=8, max_wait_ms=1)
+
+        result = await batcher.submit("alone 1")
+
+        assert result == ("Other", 1.0, "alone 1")
+        assert calls["batch"] == []
+
+    @pytest.mark.asyncio
+    async def test_fallback_when_batch_fails(self):
+        batcher, calls = make_batcher(batch_error=ValueError("bad json"), max_batch_size=8, max_wait_ms=5)
+
+        results = await asyncio.gather(batcher.submit("a 1"), batcher.submit("b 2"))
+
+        assert results == [("Other", 1.0, "a 1"), ("Other", 1.0, "b 2")]
+        assert sorted(calls["single"]) == ["a 1", "b 2"]
+        assert batcher.metrics()["batch_fallbacks"] == 2
+
+    @pytest.mark.asyncio
+    async def test_fallback_only_for_unparsed_items(self):
+        batcher, calls = make_batcher(
+            batch_results=lambda texts: [("Food", 1.0, texts[0]), None],
+            max_batch_size=8,
+            max_wait_ms=5,
+        )
+
+        results = await asyncio.gather(batcher.submit("a 1"), batcher.submit("b 2"))
+
+        assert results == [("Food", 1.0, "a 1"), ("Other", 1.0, "b 2")]
+        assert calls["single"] == ["b 2"]
+
+    @pytest.mark.asyncio
+    async def test_disabled_when_batch_size_is_one(self):
+        batcher, calls = make_batcher(max_batch_size=1)
+
+        await asyncio.gather(batcher.submit("a 1"), batcher.submit("b 2"))
+
+        assert calls["batch"] == []
+        assert calls["single"] == ["a 1", "b 2"]
+
+
+class TestBatchedCategorization:
+    """Integration of the batcher with categorize_expense"""
+
+    @pytest.mark.asyncio
+    async def test_burst_uses_one_completion(self, llm_only):
+        with patch('app.handlers.langchain_handler.client') as mock_client:
+            mock_response = MagicMock()
+            mock_response.choices = [MagicMock()]
+            mock_response.choices[0].message.content = json.dumps([
+                {"id": 1, "category": "Entertainment", "amount": 12, "description": "Cinema"},
+                {"id": 2, "category": "Food", "amount": 8, "description": "Pizza"},
+            ])
+            mock_client.chat.completions.create.return_value = mock_response
+
+            results = await asyncio.gather(
+                categorize_expense("cinema 12"),
+                categorize_expense("pizza 8"),
+            )
+
+            assert results == [("Entertainment", 12.0, "Cinema"), ("Food", 8.0, "Pizza")]
+            mock_client.chat.completions.create.assert_called_once()
+            prompt = mock_client.chat.completions.create.call_args[1]['messages'][0]['content']
+            assert '1. "cinema 12"' in prompt
+            assert '2. "pizza 8"' in prompt
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("ids,mismatched", [
+        (["1", "2"], False),
+        (["2", "1"], False),
+        (["a", "b"], True),
+    ])
+    async def test_answer_ids_are_normalized(self, llm_only, ids, mismatched):
+        """Test string ids match by value, and unusable ids fall back to answer order"""
+        from app.handlers.langchain_handler import _llm_categorize_batch, llm_batcher
+        cinema = {"category": "Entertainment", "amount": 12, "description": "Cinema"}
+        pizza = {"category": "Food", "amount": 8, "description": "Pizza"}
+        answers = [pizza, cinema] if ids == ["2", "1"] else [cinema, pizza]
+        with patch('app.handlers.langchain_handler.client') as mock_client:
+            mock_response = MagicMock()
+            mock_response.choices = [MagicMock()]
+            mock_response.choices[0].message.content = json.dumps(
+                [{"id": i, **answer} for i, answer in zip(ids, answers)]
+            )
+            mock_client.chat.completions.create.return_value = mock_response
+            mismatches = llm_batcher.id_mismatches
+
+            results = await _llm_categorize_batch(["cinema 12", "pizza 8"])
+
+        assert results == [("Entertainment", 12.0, "Cinema"), ("Food", 8.0, "Pizza")]
+        assert llm_batcher.id_mismatches - mismatches == int(mismatched)
+        assert "id_mismatches" in llm_batcher.metrics()
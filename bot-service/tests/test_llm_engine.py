@@ -0,0 +1,86 @@
+import pytest
+import asyncio
+import time
+from app.handlers.llm_engine import AsyncLLMEngine, LLMTimeoutError
+
+class TestAsyncLLMEngine:
+    """Unit tests for the bounded LLM call engine"""
+
+    @pytest.mark.asyncio
+    async def test_run_does_not_block_event_loop(self):
+        """Test that a slow blocking call lets other coroutines progress"""
+        engine = AsyncLLMEngine(max_concurrency=2, timeout=5)
+        ticks = []
+
+        async def ticker():
+            for _ in range(5):
+                ticks.append(time.perf_counter())
+                await asyncio.sleep(0.01)
+
+        await asyncio.gather(engine.run(time.sleep, 0.2), ticker())
+
+        assert len(ticks) == 5
+        assert ticks[-1] - ticks[0] < 0.2
+
+    @pytest.mark.asyncio
+    async def test_concurrency_cap(self):
+        """Test that no more than max_concurrency calls run at once"""
+        engine = AsyncLLMEngine(max_concurrency=2, timeout=5)
+
+        await asyncio.gather(*(engine.run(time.sleep, 0.05) for _ in range(6)))
+
+        metrics = engine.metrics()
+        assert metrics["peak_in_flight"] == 2
+        assert metrics["total"] == 6
+        assert metrics["succeeded"] == 6
+        assert metrics["in_flight"] == 0
+
+    @pytest.mark.asyncio
+    async def test_timeout(self):
+        """Test that slow calls raise LLMTimeoutError and are counted"""
+        engine = AsyncLLMEngine(max_concurrency=1, timeout=0.05)
+
+        with pytest.raises(LLMTimeoutError):
+            await engine.run(time.sleep, 0.3)
+
+        metrics = engine.metrics()
+        assert metrics["timed_out"] == 1
+        # The abandoned call still occupies its thread and slot until it returns
+        assert metrics["in_flight"] == 1
+        await asyncio.sleep(0.35)
+        assert engine.metrics()["in_flight"] == 0
+
+    @pytest.mark.asyncio
+    async def test_timed_out_call_keeps_its_slot(self):
+        """Test a new call waits for the abandoned thread's slot, not under its own timeout"""
+        engine = AsyncLLMEngine(max_concurrency=1, timeout=0.05)
+        running = []
+
+        def call(duration):
+            running.append(1)
+            peak = len(running)
+            time.sleep(duration)
+            running.pop()
+            return peak
+
+        with pytest.raises(LLMTimeoutError):
+            await engine.run(call, 0.2)
+        engine.timeout = 0.1
+        started = time.perf_counter()
+
+        assert await engine.run(call, 0) == 1
+        assert time.perf_counter() - started >= 0.1
+        assert engine.metrics()["peak_in_flight"] == 1
+
+    @pytest.mark.asyncio
+    async def test_errors_are_propagated(self):
+        """Test that exceptions from the call reach the caller"""
+        engine = AsyncLLMEngine(max_concurrency=1, timeout=1)
+
+        def boom():
+            raise ValueError("API Error")
+
+        with pytest.raises(ValueError):
+            await engine.run(boom)
+
+        assert engine.metrics()["failed"] == 1
@@ -0,0 +1,147 @@
+import pytest
+from datetime import date, datetime
+from sqlalchemy import inspect, text, tuple_
+from sqlalchemy.ext.asyncio import create_async_engine
+from app.core.db import engine
+from app.core.migrations import MIGRATIONS, run_migrations
+from app.repositories.analytics import analytics_snapshot_query
+from app.models.expense import Expense
+from app.repositories.expense import expense_response_query
+
+
+async def explain(query) -> str:
+    sql = str(query.compile(engine.sync_engine, compile_kwargs={"literal_binds": True}))
+    async with engine.connect() as conn:
+        rows = (await conn.execute(text("EXPLAIN QUERY PLAN " + sql))).all()
+    return "\n".join(row[-1] for row in rows)
+
+
+def expense_indexes(conn):
+    return {index["name"] for index in inspect(conn).get_indexes("expenses")}
+
+
+class TestMigrations:
+    """Unit tests for the startup schema migrations"""
+
+    @pytest.mark.asyncio
+    async def test_applies_once(self, tmp_path):
+        """Test migrations run in order and are recorded"""
+        fresh = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/fresh.db")
+        try:
+            assert await run_migrations(fresh) == [m.version for m in MIGRATIONS]
+            assert await run_migrations(fresh) == []
+
+            async with fresh.connect() as conn:
+                versions = (await conn.execute(text("SELECT version FROM schema_migrations"))).scalars().all()
+                indexes = await conn.run_sync(expense_indexes)
+            assert sorted(versions) == [m.version for m in MIGRATIONS]
+            assert {"ix_expenses_user_added_at", "ix_expenses_user_added_at_category_amount"} <= indexes
+        finally:
+            await fresh.dispose()
+
+    @pytest.mark.asyncio
+    async def test_adds_indexes_to_existing_schema(self, tmp_path):
+        """Test a database created without indexes (init.sql) gets them"""
+        legacy = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/legacy.db")
+        try:
+            async with legacy.begin() as conn:
+                await conn.execute(text("CREATE TABLE users (id VARCHAR PRIMARY KEY, telegram_id VARCHAR UNIQUE)"))
+                await conn.execute(text(
+                    "CREATE TABLE expenses (id INTEGER PRIMARY KEY, user_id VARCHAR NOT NULL, "
+                    "description TEXT NOT NULL, amount NUMERIC(10,2) NOT NULL, category TEXT NOT NULL, "
+                    "added_at TIMESTAMP NOT NULL)"
+                ))
+                await conn.execute(text("INSERT INTO users VALUES ('1', '123')"))
+
+            await run_migrations(legacy)
+
+            async with legacy.connect() as conn:
+                indexes = await conn.run_sync(expense_indexes)
+                users = (await conn.execute(text("SELECT count(*) FROM users"))).scalar()
+            assert "ix_expenses_user_added_at_category_amount" in indexes
+            assert users == 1
+        finally:
+            await legacy.dispose()
+
+    @pytest.mark.asyncio
+    async def test_adds_ingest_columns(self, tmp_path):
+        """Test an ingest_messages table from an older version gets the new columns"""
+        legacy = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/legacy.db")
+        try:
+            async with legacy.begin() as conn:
+                await conn.execute(text(
+                    "CREATE TABLE ingest_messages (id INTEGER PRIMARY KEY, telegram_id VARCHAR NOT NULL, "
+                    "telegram_message_id VARCHAR NOT NULL, text TEXT NOT NULL, received_at TIMESTAMP NOT NULL, "
+                    "status VARCHAR NOT NULL, expense_id INTEGER, callback_url TEXT, error TEXT, processed_at TIMESTAMP)"
+                ))
+
+            await run_migrations(legacy)
+
+            async with legacy.connect() as conn:
+                columns = await conn.run_sync(
+                    lambda sync_conn: {c["name"] for c in inspect(sync_conn).get_columns("ingest_messages")}
+                )
+            assert {"chat_id", "claimed_at"} <= columns
+        finally:
+            await legacy.dispose()
+
+    @pytest.mark.asyncio
+    async def test_analytics_snapshot_uses_covering_index(self, test_expenses):
+        """Test the analytics query is answered from the covering index"""
+        plan = await explain(analytics_snapshot_query(
+            "test_user_123", date(2024, 1, 1), date(2024, 2, 28), current_month=date(2024, 2, 1)
+        ))
+
+        assert "USING COVERING INDEX ix_expenses_user_added_at_category_amount" in plan
+        assert "added_at>" in plan
+
+    @pytest.mark.asyncio
+    async def test_analytics_all_time_uses_index(self, test_expenses):
+        """Test the open-ended range still seeks on user_id"""
+        plan = await explain(analytics_snapshot_query("test_user_123", date.min, date.max))
+
+        assert "USING COVERING INDEX ix_expenses_user_added_at_category_amount (user_id=?" in plan
+
+    @pytest.mark.asyncio
+    async def test_keyset_listing_avoids_sort(self, test_expenses):
+        """Test cursor pages are read in index order, without sorting"""
+        for query in (
+            expense_response_query(),
+            expense_response_query().where(Expense.user_id == "test_user_123"),
+        ):
+            query = (
+                query.where(tuple_(Expense.added_at, Expense.id) > tuple_(datetime(2024, 1, 15), 1))
+                .order_by(Expense.added_at, Expense.id)
+                .limit(3)
+            )
+            plan = await explain(query)
+            assert "USE TEMP B-TREE FOR ORDER BY" not in plan
+            assert "ix_expenses_" in plan
+
+    @pytest.mark.asyncio
+    async def test_user_listing_by_amount_uses_index(self, test_expenses):
+        """Test the per-user amount sort reads ix_expenses_user_amount in order"""
+        query = (
+            expense_response_query()
+            .where(Expense.user_id == "test_user_123")
+            .order_by(Expense.amount.desc(), Expense.id.desc())
+            .limit(50)
+        )
+        plan = await explain(query)
+
+        assert "ix_expenses_user_amount (user_id=?)" in plan
+        assert "USE TEMP B-TREE FOR ORDER BY" not in plan
+
+    @pytest.mark.asyncio
+    async def test_user_listing_by_category_uses_index(self, test_expenses):
+        """Test the category filter seeks on (user_id, category)"""
+        query = (
+            expense_response_query()
+            .where(Expense.user_id == "test_user_123", Expense.category == "Food")
+            .order_by(Expense.added_at.desc(), Expense.id.desc())
+            .limit(50)
+        )
+        plan = await explain(query)
+
+        assert "ix_expenses_user_category_added_at (user_id=? AND category=?)" in plan
+        assert "USE TEMP B-TREE FOR ORDER BY" not in plan
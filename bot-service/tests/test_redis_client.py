@@ -0,0 +1,156 @@
+import pytest
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+from redis.exceptions import ConnectionError
+import app.core.redis_client as redis_client
+from app.core.redis_client import (
+    SharedConnectionPool,
+    get_many,
+    get_redis,
+    get_redis_pool_status,
+    init_redis,
+    redis_dependency,
+    set_many,
+)
+from tests.test_analytics_cache import FakeRedis
+
+
+class FakeConnection:
+    """Connection stand-in so the pool can be exercised without a server"""
+
+    def __init__(self, **kwargs):
+        self.connects = 0
+
+    async def connect(self):
+        self.connects += 1
+
+    async def can_read_destructive(self):
+        return False
+
+    async def disconnect(self):
+        pass
+
+
+class CountingRedis(FakeRedis):
+    def __init__(self):
+        super().__init__()
+        self.round_trips = 0
+
+    def pipeline(self, transaction=True):
+        pipe = super().pipeline(transaction)
+        execute = pipe.execute
+
+        async def counted():
+            self.round_trips += 1
+            return await execute()
+        pipe.execute = counted
+        return pipe
+
+
+class TestSharedClient:
+    """Unit tests for the per-loop shared client and its pool"""
+
+    @pytest.mark.asyncio
+    async def test_one_client_per_loop(self):
+        client = get_redis()
+
+        assert get_redis() is client
+        assert isinstance(client.connection_pool, SharedConnectionPool)
+        assert client.connection_pool.max_connections == redis_client.REDIS_MAX_CONNECTIONS
+        assert await redis_dependency() is client
+        # A Celery task loop in another thread gets its own client
+        async def task_loop_client():
+            return get_redis()
+        other = await asyncio.to_thread(asyncio.run, task_loop_client())
+        assert other is not client
+
+    @pytest.mark.asyncio
+    async def test_backing_off(self):
+        with patch.object(redis_client, "_unavailable_until", float("inf")):
+            assert get_redis() is None
+            assert await redis_dependency() is None
+            assert get_redis_pool_status()["backing_off"]
+
+    @pytest.mark.asyncio
+    async def test_pool_reuses_connections(self):
+        """Test sequential commands reuse one connection and the pool is bounded"""
+        pool = SharedConnectionPool(connection_class=FakeConnection, max_connections=2, timeout=0.05)
+        opened = redis_client._pool_counters["connections_opened"]
+
+        for _ in range(10):
+            await pool.release(await pool.get_connection("GET"))
+        first, second = await pool.get_connection("GET"), await pool.get_connection("GET")
+        with pytest.raises(ConnectionError):
+            await pool.get_connection("GET")
+
+        assert redis_client._pool_counters["connections_opened"] - opened == 2
+        assert first is not second
+
+    @pytest.mark.asyncio
+    async def test_waits_for_free_connection(self):
+        pool = SharedConnectionPool(connection_class=FakeConnection, max_connections=1, timeout=1)
+        held = await pool.get_connection("GET")
+
+        waiter = asyncio.ensure_future(pool.get_connection("GET"))
+        await asyncio.sleep(0.01)
+        assert not waiter.done()
+        await pool.release(held)
+
+        assert await asyncio.wait_for(waiter, 1) is held
+
+    @pytest.mark.asyncio
+    async def test_refused_connection_fails_fast(self):
+        """Test a failed connect is raised at once and frees its slot"""
+        class RefusedConnection(FakeConnection):
+            async def connect(self):
+                raise ConnectionError("Error 111 connecting")
+
+        pool = SharedConnectionPool(connection_class=RefusedConnection, max_connections=1, timeout=5)
+
+        for _ in range(3):
+            with pytest.raises(ConnectionError, match="111"):
+                await asyncio.wait_for(pool.get_connection("GET"), 1)
+
+        assert not pool._in_use_connections
+
+    @pytest.mark.asyncio
+    async def test_init_backs_off_when_down(self):
+        client = MagicMock()
+        client.ping = AsyncMock(side_effect=ConnectionError("refused"))
+        with patch("app.core.redis_client.get_redis", return_value=client), \
+                patch("app.core.redis_client.mark_redis_unavailable") as mark:
+            await init_redis()
+
+        mark.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_pool_status(self):
+        get_redis()
+        status = get_redis_pool_status()
+
+        assert status["in_use"] == 0
+        assert {"max_connections", "connections_opened", "checkouts", "idle"} <= set(status)
+
+
+class TestPipelineHelpers:
+    """Multi-key helpers batch commands into few round trips"""
+
+    @pytest.mark.asyncio
+    async def test_get_many(self):
+        fake = CountingRedis()
+        fake.store = {f"k{i}": str(i) for i in range(5)}
+
+        values = await get_many(fake, ["k0", "k4", "missing", "k2", "k1"], chunk_size=2)
+
+        assert values == ["0", "4", None, "2", "1"]
+        assert fake.round_trips == 1
+        assert await get_many(fake, []) == []
+
+    @pytest.mark.asyncio
+    async def test_set_many(self):
+        fake = CountingRedis()
+
+        await set_many(fake, {f"k{i}": i for i in range(5)}, ex=60, chunk_size=2)
+
+        assert fake.store == {f"k{i}": i for i in range(5)}
+        assert fake.round_trips == 3
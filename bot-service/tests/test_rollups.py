@@ -0,0 +1,87 @@
+import pytest
+from datetime import date, datetime
+from decimal import Decimal
+from sqlalchemy import select
+from app.core.db import AsyncSessionLocal
+from app.models.rollup import ExpenseRollup
+from app.repositories.analytics import AnalyticsRepository
+from app.repositories.expense import ExpenseRepository
+from app.repositories.rollup import RollupRepository
+
+
+async def rollups(user_id: str):
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(
+            select(ExpenseRollup)
+            .where(ExpenseRollup.user_id == user_id)
+            .order_by(ExpenseRollup.day, ExpenseRollup.category)
+        )
+        return [(r.day, r.category, r.total, r.count) for r in result.scalars().all()]
+
+
+class TestExpenseRollups:
+    """Unit tests for incrementally maintained expense rollups"""
+
+    @pytest.mark.asyncio
+    async def test_insert_updates_rollup(self, test_user):
+        repo = ExpenseRepository()
+
+        await repo.insert_categorized_expense(test_user.telegram_id, "Pizza", 20, "Food", datetime(2024, 3, 1, 9))
+        await repo.insert_categorized_expense(test_user.telegram_id, "Cafe", 5.5, "Food", datetime(2024, 3, 1, 18))
+        await repo.insert_categorized_expense(test_user.telegram_id, "Taxi", 12, "Transportation", datetime(2024, 3, 2))
+
+        assert await rollups(test_user.id) == [
+            (date(2024, 3, 1), "Food", Decimal("25.50"), 2),
+            (date(2024, 3, 2), "Transportation", Decimal("12.00"), 1),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_update_moves_rollup(self, test_user):
+        repo = ExpenseRepository()
+        expense = await repo.insert_categorized_expense(test_user.telegram_id, "Pizza", 20, "Food", datetime(2024, 3, 1))
+
+        await repo.update_expense(expense.id, "Cine", 30, "Entertainment")
+
+        assert await rollups(test_user.id) == [(date(2024, 3, 1), "Entertainment", Decimal("30.00"), 1)]
+
+    @pytest.mark.asyncio
+    async def test_delete_removes_rollup(self, test_user):
+        repo = ExpenseRepository()
+        first = await repo.insert_categorized_expense(test_user.telegram_id, "Pizza", 20, "Food", datetime(2024, 3, 1))
+        await repo.insert_categorized_expense(test_user.telegram_id, "Cafe", 5, "Food", datetime(2024, 3, 1))
+
+        await repo.delete_expense(first.id)
+        assert await rollups(test_user.id) == [(date(2024, 3, 1), "Food", Decimal("5.00"), 1)]
+
+    @pytest.mark.asyncio
+    async def test_backfill_matches_incremental(self, test_user):
+        repo = ExpenseRepository()
+        for day, amount in [(1, 10), (1, 15), (2, 7)]:
+            await repo.insert_categorized_expense(test_user.telegram_id, "Item", amount, "Food", datetime(2024, 3, day, 12))
+        incremental = await rollups(test_user.id)
+
+        rows = await RollupRepository().backfill(test_user.id)
+
+        assert rows == 2
+        assert await rollups(test_user.id) == incremental
+
+    @pytest.mark.asyncio
+    async def test_snapshot_from_rollups_matches_expenses(self, test_user, test_expenses):
+        args = (test_user.id, date(2024, 1, 1), date(2024, 2, 28), date(2024, 2, 1))
+
+        from_rollups = await AnalyticsRepository(use_rollups=True).get_analytics_snapshot(*args)
+        from_expenses = await AnalyticsRepository(use_rollups=False).get_analytics_snapshot(*args)
+
+        assert from_rollups == from_expenses
+        assert from_rollups.total == Decimal("70.50")
+
+    @pytest.mark.asyncio
+    async def test_rollup_range_includes_end_day(self, test_user):
+        repo = ExpenseRepository()
+        await repo.insert_categorized_expense(test_user.telegram_id, "Cena", 40, "Food", datetime(2024, 1, 31, 21))
+
+        snapshot = await AnalyticsRepository(use_rollups=True).get_analytics_snapshot(
+            test_user.id, date(2024, 1, 1), date(2024, 1, 31)
+        )
+
+        assert snapshot.total == Decimal("40.00")
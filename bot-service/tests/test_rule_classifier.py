@@ -0,0 +1,49 @@
+import pytest
+from unittest.mock import patch
+from app.handlers.rule_classifier import RuleClassifier, KEYWORDS
+from app.handlers.langchain_handler import categorize_expense, CATEGORIES
+from app.handlers.stage_stats import categorization_stats
+
+class TestRuleClassifier:
+    """Unit tests for the deterministic categorization fast path"""
+
+    def test_keywords_map_to_known_categories(self):
+        assert set(KEYWORDS.values()) <= set(CATEGORIES)
+
+    @pytest.mark.parametrize("text,expected", [
+        ("cafe 3", ("Food", 3.0, "Cafe")),
+        ("nafta 45", ("Transportation", 45.0, "Nafta")),
+        ("subte 1.2", ("Transportation", 1.2, "Subte")),
+        ("Café $3,50", ("Food", 3.5, "Cafe")),
+        ("alquiler 250000 pesos", ("Housing", 250000.0, "Alquiler")),
+        ("tarjeta de crédito 3000", ("Debt", 3000.0, "Tarjeta de credito")),
+    ])
+    def test_confident_matches(self, text, expected):
+        assert RuleClassifier().classify(text) == expected
+
+    @pytest.mark.parametrize("text", [
+        "regalo 20",                          # unknown word
+        "pizza y cerveza 20",                 # conflicting categories
+        "2 cafes 6",                          # ambiguous amount
+        "fui al super y compre cosas 40",     # too long to be a simple pair
+        "cafe",                               # no amount
+    ])
+    def test_low_confidence_falls_through(self, text):
+        assert RuleClassifier().classify(text) is None
+
+    def test_disabled(self):
+        assert RuleClassifier(enabled=False).classify("cafe 3") is None
+
+    @pytest.mark.asyncio
+    async def test_categorize_expense_skips_llm(self):
+        """Test that confident messages never reach the LLM"""
+        categorization_stats.reset()
+        with patch('app.handlers.langchain_handler.client') as mock_client:
+            result = await categorize_expense("nafta 45")
+
+            assert result == ("Transportation", 45.0, "Nafta")
+            mock_client.chat.completions.create.assert_not_called()
+
+        metrics = categorization_stats.metrics()
+        assert metrics["stages"]["rules"]["count"] == 1
+        assert metrics["llm_avoided_rate"] == 1.0
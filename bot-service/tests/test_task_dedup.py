@@ -0,0 +1,155 @@
+import pytest
+import asyncio
+import threading
+from unittest.mock import MagicMock, patch
+from app.handlers.task_dedup import TaskDeduplicator
+from tests.test_analytics_cache import FakeRedis
+
+PAYLOAD = {"user_id": "u1", "start_date": "2024-01-01", "end_date": "2024-01-31", "engine": "sql"}
+
+
+def task_state(state: str):
+    return patch("app.handlers.task_dedup.AsyncResult", return_value=MagicMock(state=state))
+
+
+class TestTaskDeduplicator:
+    """Unit tests for deduplicated task submission"""
+
+    @pytest.fixture
+    def fake(self):
+        fake = FakeRedis()
+        with patch("app.handlers.task_dedup.get_redis", return_value=fake), \
+                patch("app.handlers.task_dedup.celery_app"):
+            yield fake
+
+    def test_task_key(self):
+        """Test the key ignores field order but not values or the data version"""
+        key = TaskDeduplicator.task_key("t", PAYLOAD, 3)
+
+        assert key == TaskDeduplicator.task_key("t", dict(reversed(list(PAYLOAD.items()))), 3)
+        assert key != TaskDeduplicator.task_key("t", {**PAYLOAD, "end_date": "2024-02-29"}, 3)
+        assert key != TaskDeduplicator.task_key("t", PAYLOAD, 4)
+
+    @pytest.mark.asyncio
+    async def test_duplicates_share_in_flight_task(self, fake):
+        dedup = TaskDeduplicator(enabled=True)
+        send = MagicMock()
+
+        first, state = await dedup.submit("t", PAYLOAD, 1, send)
+        with task_state("STARTED"):
+            second, second_state = await dedup.submit("t", PAYLOAD, 1, send)
+
+        assert (second, second_state) == (first, "STARTED")
+        assert state is None
+        send.assert_called_once_with(first)
+        assert dedup.metrics()["deduplicated"] == 1
+
+    @pytest.mark.asyncio
+    async def test_state_read_off_the_event_loop(self, fake):
+        """Test the result backend is queried in a worker thread, not on the loop"""
+        dedup = TaskDeduplicator(enabled=True)
+        threads = []
+
+        class Result:
+            @property
+            def state(self):
+                threads.append(threading.get_ident())
+                return "STARTED"
+
+        await dedup.submit("t", PAYLOAD, 1, MagicMock())
+        with patch("app.handlers.task_dedup.AsyncResult", return_value=Result()):
+            await dedup.submit("t", PAYLOAD, 1, MagicMock())
+
+        assert threads and threads[0] != threading.get_ident()
+
+    @pytest.mark.asyncio
+    async def test_concurrent_submissions(self, fake):
+        """Test a burst of identical clicks enqueues a single task"""
+        dedup = TaskDeduplicator(enabled=True)
+        send = MagicMock()
+
+        with task_state("SENT"):
+            results = await asyncio.gather(*(dedup.submit("t", PAYLOAD, 1, send) for _ in range(20)))
+
+        assert len({task_id for task_id, _ in results}) == 1
+        assert send.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_queued_task_is_recorded_before_send(self, fake):
+        """Test the task is marked queued in the result backend, reported as PENDING"""
+        dedup = TaskDeduplicator(enabled=True)
+        with patch("app.handlers.task_dedup.celery_app") as celery_app:
+            send = MagicMock(side_effect=lambda _: celery_app.backend.store_result.assert_called_once())
+            first, _ = await dedup.submit("t", PAYLOAD, 1, send)
+            with task_state("SENT"):
+                second, state = await dedup.submit("t", PAYLOAD, 1, send)
+
+        assert celery_app.backend.store_result.call_args_list[0].args == (first, None, "SENT")
+        assert (second, state) == (first, "PENDING")
+        send.assert_called_once_with(first)
+
+    @pytest.mark.asyncio
+    async def test_lost_task_is_replaced(self, fake):
+        """Test a key whose task the backend has no record of (PENDING) gets a new task"""
+        dedup = TaskDeduplicator(enabled=True)
+        send = MagicMock()
+        first, _ = await dedup.submit("t", PAYLOAD, 1, send)
+
+        with task_state("PENDING"):
+            second, state = await dedup.submit("t", PAYLOAD, 1, send)
+
+        assert second != first and state is None
+        assert send.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_new_data_version_is_new_work(self, fake):
+        dedup = TaskDeduplicator(enabled=True)
+        send = MagicMock()
+
+        first, _ = await dedup.submit("t", PAYLOAD, 1, send)
+        second, state = await dedup.submit("t", PAYLOAD, 2, send)
+
+        assert first != second and state is None
+        assert send.call_count == 2
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("state,version,reused", [
+        ("SUCCESS", 1, True),
+        ("SUCCESS", None, False),
+        ("FAILURE", 1, False),
+    ])
+    async def test_finished_tasks(self, fake, state, version, reused):
+        """Test a finished task is reused only if it succeeded on known-current data"""
+        dedup = TaskDeduplicator(enabled=True)
+        send = MagicMock()
+        first, _ = await dedup.submit("t", PAYLOAD, version, send)
+
+        with task_state(state):
+            second, _ = await dedup.submit("t", PAYLOAD, version, send)
+        with task_state("SENT"):
+            third, _ = await dedup.submit("t", PAYLOAD, version, send)
+
+        assert (second == first) is reused
+        # A replacement task takes the key over for later duplicates
+        assert third == second
+
+    @pytest.mark.asyncio
+    async def test_failed_send_releases_key(self, fake):
+        dedup = TaskDeduplicator(enabled=True)
+
+        with pytest.raises(ConnectionError):
+            await dedup.submit("t", PAYLOAD, 1, MagicMock(side_effect=ConnectionError("broker down")))
+
+        assert fake.store == {}
+
+    @pytest.mark.asyncio
+    async def test_without_redis(self):
+        dedup = TaskDeduplicator(enabled=True)
+        send = MagicMock()
+
+        with patch("app.handlers.task_dedup.get_redis", return_value=None):
+            first, _ = await dedup.submit("t", PAYLOAD, None, send)
+            second, _ = await dedup.submit("t", PAYLOAD, None, send)
+
+        assert first != second
+        assert send.call_count == 2
@@ -0,0 +1,129 @@
+import pytest
+import asyncio
+import json
+from unittest.mock import MagicMock, patch
+from fastapi.testclient import TestClient
+from app.handlers.task_events import CHANNEL_PREFIX, TaskEventBroker, publish_task_event, task_event_broker
+from app.main import app
+from app.tasks.analytics import run_analytics_task
+
+
+def event(task_id: str, status: str, **fields) -> str:
+    return json.dumps({"task_id": task_id, "status": status, **fields})
+
+
+@pytest.fixture
+def no_reader():
+    """Keep brokers from connecting to Redis; tests dispatch events by hand"""
+    with patch.object(TaskEventBroker, "_ensure_reader"):
+        yield
+
+
+def current_state(status: str, **fields):
+    return patch("app.handlers.task_events.task_state",
+                 side_effect=lambda task_id: {"task_id": task_id, "status": status, **fields})
+
+
+class TestTaskEventPublishing:
+    """Worker side: task signals publish state changes"""
+
+    def test_publish(self):
+        publisher = MagicMock()
+        with patch("app.handlers.task_events._publisher", publisher):
+            publish_task_event("t1", "SUCCESS", result={"total_expenses": 1.5})
+
+        channel, data = publisher.publish.call_args.args
+        assert channel == CHANNEL_PREFIX + "t1"
+        assert json.loads(data) == {"task_id": "t1", "status": "SUCCESS", "result": {"total_expenses": 1.5}}
+
+    def test_publish_errors_are_swallowed(self):
+        publisher = MagicMock()
+        publisher.publish.side_effect = ConnectionError("down")
+        with patch("app.handlers.task_events._publisher", publisher):
+            publish_task_event("t1", "STARTED")
+
+    def test_task_signals(self):
+        """Test running an analytics task publishes STARTED then SUCCESS"""
+        result = MagicMock()
+        result.model_dump.return_value = {"total_expenses": 2.0}
+        with patch("app.tasks.analytics.worker_loop.run", return_value=result), \
+                patch("app.handlers.task_events.publish_task_event") as publish:
+            run_analytics_task.apply(args=[{"user_id": "u1"}], task_id="t1")
+
+        assert [c.args for c in publish.call_args_list] == [("t1", "STARTED"), ("t1", "SUCCESS")]
+        assert publish.call_args.kwargs == {"result": {"total_expenses": 2.0}}
+
+
+class TestTaskEventBroker:
+    """API side: one subscription fanned out to waiting clients"""
+
+    @pytest.mark.asyncio
+    async def test_streams_until_finished(self, no_reader):
+        broker = TaskEventBroker()
+        received = []
+
+        async def consume():
+            async for item in broker.stream("t1"):
+                received.append(item)
+
+        with current_state("PENDING"):
+            consumer = asyncio.ensure_future(consume())
+            await asyncio.sleep(0.01)
+            for data in (event("t2", "STARTED"), event("t1", "STARTED"), event("t1", "STARTED"),
+                         event("t1", "SUCCESS", result={"total_expenses": 3.0})):
+                broker.dispatch(data)
+            await asyncio.wait_for(consumer, 1)
+
+        assert [e["status"] for e in received] == ["PENDING", "STARTED", "SUCCESS"]
+        assert received[-1]["result"] == {"total_expenses": 3.0}
+        assert broker.metrics()["subscribers"] == 0
+
+    @pytest.mark.asyncio
+    async def test_fan_out(self, no_reader):
+        """Test every subscriber of a task gets its events"""
+        broker = TaskEventBroker()
+        queues = [broker.subscribe("t1") for _ in range(3)]
+
+        broker.dispatch(event("t1", "SUCCESS"))
+        broker.dispatch(b"not json")
+
+        assert all(q.get_nowait()["status"] == "SUCCESS" for q in queues)
+        assert broker.metrics()["events_delivered"] == 3
+
+    @pytest.mark.asyncio
+    async def test_already_finished(self, no_reader):
+        """Test a finished task yields its final state without waiting"""
+        with current_state("SUCCESS", result={"total_expenses": 1.0}):
+            events = [e async for e in TaskEventBroker().stream("t1")]
+
+        assert events == [{"task_id": "t1", "status": "SUCCESS", "result": {"total_expenses": 1.0}}]
+
+    @pytest.mark.asyncio
+    async def test_heartbeat_and_timeout(self, no_reader):
+        broker = TaskEventBroker(heartbeat=0.01, timeout=0.035)
+
+        with current_state("PENDING"):
+            events = [e async for e in broker.stream("t1")]
+
+        assert events[0]["status"] == "PENDING"
+        assert None in events
+        assert events[-1] == {"task_id": "t1", "status": "TIMEOUT"}
+
+
+class TestTaskEventEndpoints:
+    """SSE and WebSocket endpoints"""
+
+    @pytest.mark.asyncio
+    async def test_sse(self, async_client, no_reader):
+        with current_state("FAILED", error="boom"):
+            response = await async_client.get("/api/analytics/events/t1")
+
+        assert response.headers["content-type"].startswith("text/event-stream")
+        assert response.text == 'event: failed\ndata: {"task_id": "t1", "status": "FAILED", "error": "boom"}\n\n'
+
+    def test_websocket(self, no_reader):
+        with current_state("PENDING"), patch.object(task_event_broker, "timeout", 0.05):
+            with TestClient(app).websocket_connect("/api/analytics/ws/t1") as websocket:
+                messages = [websocket.receive_json(), websocket.receive_json()]
+
+        assert [m["status"] for m in messages] == ["PENDING", "TIMEOUT"]
@@ -0,0 +1,203 @@
+import pytest
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from unittest.mock import patch
+from app.handlers.analytics_cache import analytics_cache
+from app.handlers.vector_analytics import VectorAnalyticsEngine, vector_analytics
+from app.models.expense import Expense
+from app.repositories.analytics import AnalyticsRepository
+from app.repositories.expense import ExpenseRepository
+from app.schemas.analytics import AnalyticsRequest
+from app.services.analytics import AnalyticsService
+
+
+class TestVectorAnalyticsEngine:
+    """Unit tests for the in-memory NumPy analytics engine"""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("start,end,month", [
+        (date(2024, 1, 1), date(2024, 2, 29), date(2024, 2, 1)),
+        (date(2024, 1, 15), date(2024, 1, 20), date(2024, 1, 1)),
+        (date.min, date.max, None),
+    ])
+    async def test_matches_sql_snapshot(self, test_user, test_expenses, start, end, month):
+        """Test the vector snapshot equals the rollup snapshot (end day included)"""
+        expected = await AnalyticsRepository(use_rollups=True).get_analytics_snapshot(test_user.id, start, end, month)
+
+        result = await VectorAnalyticsEngine().get_analytics_snapshot(test_user.id, start, end, month)
+
+        assert result == expected
+
+    @pytest.mark.asyncio
+    async def test_loads_once(self, test_user, test_expenses, assert_max_queries):
+        """Test later requests are answered from memory without queries"""
+        engine = VectorAnalyticsEngine()
+        await engine.get_analytics_snapshot(test_user.id, date(2024, 1, 1), date(2024, 1, 31))
+
+        with assert_max_queries(0):
+            snapshot = await engine.get_analytics_snapshot(test_user.id, date(2024, 2, 1), date(2024, 2, 29))
+
+        assert snapshot.total == Decimal("30.00")
+        assert (engine.loads, engine.hits) == (1, 1)
+
+    @pytest.mark.asyncio
+    async def test_insert_appends(self, test_user, test_expenses):
+        """Test an expense added through the repository is appended in place"""
+        columns = await vector_analytics.columns(test_user.id)
+        loads = vector_analytics.loads
+
+        await ExpenseRepository().insert_categorized_expense(
+            test_user.telegram_id, "Cine", 12.35, "Entertainment", datetime(2024, 1, 18)
+        )
+
+        assert vector_analytics._users[test_user.id] is columns
+        assert [str(c) for c in columns.added_at.astype("datetime64[D]")] == [
+            "2024-01-15", "2024-01-18", "2024-01-20", "2024-02-10"
+        ]
+        snapshot = await vector_analytics.get_analytics_snapshot(test_user.id, date(2024, 1, 1), date(2024, 1, 31))
+        assert {c.category: c.total for c in snapshot.categories}["Entertainment"] == Decimal("12.35")
+        assert vector_analytics.loads == loads
+
+    @pytest.mark.asyncio
+    async def test_delete_discards(self, test_user, test_expenses):
+        """Test a deleted expense forces a reload"""
+        await vector_analytics.columns(test_user.id)
+        loads = vector_analytics.loads
+
+        await ExpenseRepository().delete_expense(test_expenses[0].id)
+
+        snapshot = await vector_analytics.get_analytics_snapshot(test_user.id, date(2024, 1, 1), date(2024, 12, 31))
+        assert snapshot.total == Decimal("45.00")
+        assert vector_analytics.loads == loads + 1
+
+    @pytest.mark.asyncio
+    async def test_version_change_reloads(self, test_user, test_expenses, db_session):
+        """Test a write made by another process (version bump) triggers a reload"""
+        engine = VectorAnalyticsEngine()
+        versions = iter([1, 1, 2])
+        with patch.object(analytics_cache, "current_version", side_effect=lambda _: next(versions)):
+            await engine.get_analytics_snapshot(test_user.id, date.min, date.max)
+            await engine.get_analytics_snapshot(test_user.id, date.min, date.max)
+            db_session.add(Expense(user_id=test_user.id, description="x", amount=Decimal("5"),
+                                   category="Food", added_at=datetime(2024, 3, 1)))
+            await db_session.commit()
+            snapshot = await engine.get_analytics_snapshot(test_user.id, date.min, date.max)
+
+        assert snapshot.total == Decimal("75.50")
+        assert (engine.loads, engine.hits) == (2, 1)
+
+    @pytest.mark.asyncio
+    async def test_skipped_version_drops_columns(self, test_user, test_expenses):
+        """Test a local insert that skips a version discards instead of appending"""
+        engine = VectorAnalyticsEngine()
+        with patch.object(analytics_cache, "current_version", return_value=3):
+            await engine.columns(test_user.id)
+
+        engine.record_insert(test_user.id, datetime(2024, 3, 1), "Food", 1, new_version=4)
+        assert engine._users[test_user.id].version == 4
+        engine.record_insert(test_user.id, datetime(2024, 3, 2), "Food", 1, new_version=6)
+        assert test_user.id not in engine._users
+
+    @pytest.mark.asyncio
+    async def test_ttl_without_versions(self, test_user, test_expenses):
+        """Test columns expire after ttl when Redis versions are unavailable"""
+        engine = VectorAnalyticsEngine(ttl=0)
+        await engine.columns(test_user.id)
+        await engine.columns(test_user.id)
+
+        assert engine.loads == 2
+
+    @pytest.mark.asyncio
+    async def test_lru_eviction(self, test_user, test_user_2, test_expenses):
+        """Test only max_users users are kept in memory"""
+        engine = VectorAnalyticsEngine(max_users=1)
+        await engine.columns(test_user.id)
+        await engine.columns(test_user_2.id)
+
+        assert list(engine._users) == [test_user_2.id]
+        assert engine.evictions == 1
+
+    @pytest.mark.asyncio
+    async def test_distribution(self, test_user, db_session):
+        """Test percentiles of amounts and rolling daily means"""
+        for day in range(40):
+            db_session.add(Expense(user_id=test_user.id, description="x", amount=Decimal(day + 1),
+                                   category="Food", added_at=datetime(2024, 1, 1) + timedelta(days=day)))
+        await db_session.commit()
+
+        percentiles, rolling = await VectorAnalyticsEngine().get_distribution(test_user.id, date.min, date.max)
+
+        assert percentiles == {"p50": 20.5, "p90": 36.1, "p99": 39.61}
+        # Last 7 days are 34..40, last 30 are 11..40
+        assert rolling == {"7d": 37.0, "30d": 25.5}
+
+    @pytest.mark.asyncio
+    async def test_distribution_short_range(self, test_user, test_expenses):
+        """Test rolling means need a full window inside the range"""
+        percentiles, rolling = await VectorAnalyticsEngine().get_distribution(
+            test_user.id, date(2024, 1, 15), date(2024, 1, 20)
+        )
+
+        assert percentiles["p50"] == 20.25
+        assert rolling == {}
+
+    @pytest.mark.asyncio
+    async def test_empty_user(self, db_session):
+        """Test a user without expenses yields empty results"""
+        engine = VectorAnalyticsEngine()
+
+        snapshot = await engine.get_analytics_snapshot("nobody", date.min, date.max, date(2024, 1, 1))
+
+        assert (snapshot.categories, snapshot.total) == ([], Decimal("0"))
+        assert await engine.get_distribution("nobody", date.min, date.max) == ({}, {})
+
+
+class TestVectorAnalyticsService:
+    """The engine selected through AnalyticsRequest"""
+
+    @pytest.mark.asyncio
+    async def test_same_result_as_sql(self, test_user, test_expenses):
+        """Test both engines agree and only vector adds the distribution"""
+        service = AnalyticsService()
+        request = dict(user_id=test_user.id, start_date=date(2024, 1, 1), end_date=date(2024, 2, 29))
+
+        sql = await service.get_expense_analytics(AnalyticsRequest(**request))
+        vector = await service.get_expense_analytics(AnalyticsRequest(**request, engine="vector"))
+
+        assert (sql.engine, vector.engine) == ("sql", "vector")
+        assert vector.total_expenses == sql.total_expenses
+        assert vector.category_breakdown == sql.category_breakdown
+        assert vector.average_by_category == sql.average_by_category
+        assert vector.monthly_variation_percentage == sql.monthly_variation_percentage
+        assert sql.amount_percentiles == {}
+        assert vector.amount_percentiles == {"p50": 25.5, "p90": 29.1, "p99": 29.91}
+        assert vector.daily_rolling_mean == {"7d": 4.29, "30d": 2.35}
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("use_rollups", [False, True])
+    async def test_same_range_boundaries_as_sql(self, test_user, use_rollups):
+        """Test both engines count the same expenses on and around the boundary days"""
+        repo = ExpenseRepository()
+        for added_at, amount in [
+            (datetime(2024, 2, 29, 23, 59, 59), 1),      # the day before start_date
+            (datetime(2024, 3, 1), 2),                   # start_date at midnight
+            (datetime(2024, 3, 31, 18, 45), 4),          # end_date after midnight
+            (datetime(2024, 3, 31, 23, 59, 59, 999999), 8),
+            (datetime(2024, 4, 1), 16),                  # the day after end_date
+        ]:
+            await repo.insert_categorized_expense(test_user.telegram_id, "Pizza", amount, "Food", added_at)
+        service = AnalyticsService()
+        service.repo = AnalyticsRepository(use_rollups=use_rollups)
+        request = dict(user_id=test_user.id, start_date=date(2024, 3, 1), end_date=date(2024, 3, 31))
+
+        sql = await service.get_expense_analytics(AnalyticsRequest(**request))
+        vector = await service.get_expense_analytics(AnalyticsRequest(**request, engine="vector"))
+
+        assert sql.total_expenses == vector.total_expenses == 14
+        assert vector.category_breakdown == sql.category_breakdown
+        assert vector.monthly_variation_percentage == sql.monthly_variation_percentage
+
+    def test_rejects_unknown_engine(self):
+        """Test only sql and vector are accepted"""
+        with pytest.raises(ValueError):
+            AnalyticsRequest(user_id="u", engine="gpu")
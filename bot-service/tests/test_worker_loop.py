@@ -0,0 +1,82 @@
+import pytest
+import asyncio
+import threading
+from sqlalchemy import text
+from sqlalchemy.pool import NullPool
+from app.core.db import AsyncSessionLocal, engine
+from app.core.worker_loop import WorkerLoop
+
+
+async def current_loop():
+    return asyncio.get_running_loop()
+
+
+async def select_one():
+    async with AsyncSessionLocal() as session:
+        return (await session.execute(text("SELECT 1"))).scalar()
+
+
+@pytest.fixture
+def worker(event_loop):
+    """A WorkerLoop whose loops don't replace the test session's loop"""
+    # Return the test loop's pooled connections before the worker takes the engine over
+    event_loop.run_until_complete(engine.dispose())
+    worker = WorkerLoop(reuse=True)
+    yield worker
+    worker.stop()
+    asyncio.set_event_loop(event_loop)
+
+
+class TestWorkerLoop:
+    """Unit tests for the per-process Celery event loop"""
+
+    def test_reuses_loop_and_pool(self, worker):
+        """Test tasks share one loop and stop opening DB connections"""
+        worker.start()
+
+        first = worker.run("task", current_loop)
+        assert worker.run("task", select_one) == 1
+        assert worker.run("task", select_one) == 1
+
+        assert worker.run("task", current_loop) is first
+        # SQLite file databases get a NullPool: one connection per session
+        assert worker.connections_opened == (2 if isinstance(engine.pool, NullPool) else 1)
+        assert worker.metrics()["reused"] == 4
+
+    def test_stop_closes_loop(self, worker):
+        """Test shutdown disposes the pool and closes the loop"""
+        worker.start()
+        loop = worker.run("task", current_loop)
+
+        worker.stop()
+
+        assert loop.is_closed()
+        assert not worker.running
+
+    def test_fallback_without_worker_loop(self, worker):
+        """Test tasks still run (one loop each) when no loop was started"""
+        loops = [worker.run("task", current_loop) for _ in range(2)]
+
+        assert loops[0] is not loops[1]
+        assert all(loop.is_closed() for loop in loops)
+        assert (worker.tasks, worker.reused) == (2, 0)
+
+    def test_other_threads_fall_back(self, worker):
+        """Test a thread other than the one owning the loop gets its own"""
+        worker.start()
+        own = worker.run("task", current_loop)
+        other = []
+        thread = threading.Thread(target=lambda: other.append(worker.run("task", current_loop)))
+        thread.start()
+        thread.join()
+
+        assert other[0] is not own
+        assert not own.is_closed()
+
+    def test_disabled(self, worker):
+        """Test CELERY_REUSE_EVENT_LOOP=false keeps the loop-per-task behaviour"""
+        worker.reuse = False
+        worker.start()
+
+        assert not worker.running
+        assert worker.run("task", select_one) == 1
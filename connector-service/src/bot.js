@@ -36,6 +36,11 @@ class ExpenseBot {
     logger.info(`Message from ${telegramId}: ${messageText}`);
 
     try {
+      if (config.botService.ingestMode) {
+        await this.sendToIngest(chatId, telegramId, msg.message_id, messageText);
+        return;
+      }
+
       const response = await this.sendToBotService(telegramId, messageText);
       logger.info(`Response from bot service: ${JSON.stringify(response)}`);
       logger.info(`Response status: ${response.status}`);
@@ -82,6 +87,41 @@ class ExpenseBot {
     throw new Error(`BOT_SERVICE_ERROR: ${detail}`);
   }
 
+  async sendToIngest(chatId, telegramId, messageId, messageText) {
+    const url = `${config.botService.url}/api/expenses/ingest`;
+
+    const payload = {
+      telegram_id: telegramId,
+      telegram_message_id: messageId.toString(),
+      text: messageText,
+      received_at: new Date().toISOString(),
+      chat_id: chatId.toString()
+    };
+
+    const response = await fetch(url, {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify(payload)
+    });
+
+    if (!response.ok) {
+      const errorData = await response.json().catch(() => ({}));
+      throw new Error(`BOT_SERVICE_ERROR: ${errorData.detail || "Unknown error"}`);
+    }
+    const data = await response.json();
+    logger.info(`Message ${messageId} accepted for user ${telegramId} (ingest ${data.ingest_id})`);
+  }
+
+  async handleIngestCallback(chatId, result) {
+    if (result.status === "done" && result.expense) {
+      await this.bot.sendMessage(chatId, `Expense added: ${result.expense.description} $${result.expense.amount}`);
+      logger.info(`Expense processed for user ${result.telegram_id}`);
+    } else {
+      await this.bot.sendMessage(chatId, "Expense could not be processed.");
+      logger.warn(`Unsuccessful processing for user ${result.telegram_id}: ${result.error}`);
+    }
+  }
+
   async handleError(chatId, error) {
     const message = error.message || error.toString();
 
@@ -8,9 +8,14 @@ export const config = {
   },
   botService: {
     url: process.env.BOT_SERVICE_URL || "http://localhost:8001",
+    ingestMode: process.env.BOT_SERVICE_INGEST_MODE === "true",
   },
   server: {
-    port: process.env.PORT || 3000
+    port: process.env.PORT || 3000,
+  },
+  callbacks: {
+    // Shared with the bot-service (INGEST_CALLBACK_SECRET); callbacks are rejected without it
+    secret: process.env.INGEST_CALLBACK_SECRET,
   },
   environment: process.env.NODE_ENV || "development",
 }
@@ -22,4 +27,9 @@ for (const envVar of requiredEnvVars) {
     console.error(`Missing required environment variable: ${envVar}`)
     process.exit(1)
   }
+}
+
+if (config.botService.ingestMode && !config.callbacks.secret) {
+  console.error("INGEST_CALLBACK_SECRET is required with BOT_SERVICE_INGEST_MODE=true")
+  process.exit(1)
 }
\ No newline at end of file
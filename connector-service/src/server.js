@@ -2,10 +2,12 @@ import express from "express"
 import { config } from "./config.js"
 import { logger } from "./utils/logger.js"
 import { ExpenseBot } from "./bot.js";
+import { verifyCallback } from "./utils/signature.js"
 
 const app = express()
 
-app.use(express.json())
+// Keep the raw body: callback signatures are computed over the exact bytes sent
+app.use(express.json({ verify: (req, res, buf) => { req.rawBody = buf } }))
 
 app.get("/health", (req, res) => {
   res.json({
@@ -15,11 +17,38 @@ app.get("/health", (req, res) => {
   })
 })
 
+const bot = new ExpenseBot();
+
+app.post("/callbacks/expenses", async (req, res) => {
+  const signed = verifyCallback(
+    config.callbacks.secret,
+    req.get("X-Signature-Timestamp"),
+    req.get("X-Signature"),
+    req.rawBody,
+  )
+  if (!signed) {
+    logger.warn("Rejected unsigned or invalid ingest callback")
+    return res.status(401).json({ detail: "Invalid signature" })
+  }
+
+  const chatId = req.body.chat_id
+  if (!chatId) {
+    return res.status(400).json({ detail: "chat_id is required" })
+  }
+
+  try {
+    await bot.handleIngestCallback(chatId, req.body)
+    res.json({ status: "ok" })
+  } catch (error) {
+    logger.error(`Error handling ingest callback: ${error.message}`)
+    res.status(500).json({ detail: "Callback failed" })
+  }
+})
+
 const server = app.listen(config.server.port, () => {
   logger.info(`Connector service listening on port ${config.server.port}`)
 })
 
-const bot = new ExpenseBot();
 bot.start();
 
 process.on("SIGTERM", () => {
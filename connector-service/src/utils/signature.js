@@ -0,0 +1,19 @@
+import crypto from "crypto"
+
+// Callbacks older (or newer) than this are rejected, so a captured request can't be replayed later
+const MAX_SKEW_SECONDS = 300
+
+export function signCallback(secret, timestamp, rawBody) {
+  const digest = crypto.createHmac("sha256", secret).update(`${timestamp}.`).update(rawBody).digest("hex")
+  return `sha256=${digest}`
+}
+
+export function verifyCallback(secret, timestamp, signature, rawBody, now = Date.now()) {
+  if (!secret || !timestamp || !signature || !rawBody) return false
+  const sentAt = Number(timestamp)
+  if (!Number.isFinite(sentAt) || Math.abs(now / 1000 - sentAt) > MAX_SKEW_SECONDS) return false
+
+  const expected = Buffer.from(signCallback(secret, timestamp, rawBody))
+  const received = Buffer.from(signature)
+  return expected.length === received.length && crypto.timingSafeEqual(expected, received)
+}
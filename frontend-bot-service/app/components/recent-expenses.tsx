@@ -5,7 +5,7 @@ import { Card, CardContent, CardHeader, CardTitle } from "./ui/card"
 import { Badge } from "./ui/badge"
 import { Avatar, AvatarFallback } from "./ui/avatar"
 import { Clock, DollarSign } from "lucide-react"
-import { apiClient, type Expense } from "@/lib/api"
+import { api, type Expense } from "@/lib/api"
 
 const categoryIcons: Record<string, string> = {
   Housing: "🏠",
@@ -45,12 +45,9 @@ export function RecentExpenses() {
       try {
         setLoading(true)
         // Using mock user ID - in real app, get from auth context
-        const data = await apiClient.getExpenses(1)
-        // Sort by date and take the 5 most recent
-        const sortedExpenses = data
-          .sort((a, b) => new Date(b.added_at).getTime() - new Date(a.added_at).getTime())
-          .slice(0, 5)
-        setExpenses(sortedExpenses)
+        // The API sorts and limits, so only the 5 most recent are transferred
+        const data = await api.getExpenses(1, { sort: "date_desc", limit: 5 })
+        setExpenses(data)
       } catch (err) {
         setError(err instanceof Error ? err.message : "Failed to fetch expenses")
       } finally {
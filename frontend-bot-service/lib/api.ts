@@ -6,8 +6,18 @@ export interface Expense {
   amount: number
   description: string
   category: string
-  date: string
-  created_at: string
+  added_at: string
+}
+
+export interface ExpenseFilters {
+  category?: string
+  min_amount?: number
+  max_amount?: number
+  start_date?: string
+  end_date?: string
+  sort?: "date_asc" | "date_desc" | "amount_asc" | "amount_desc"
+  limit?: number
+  cursor?: string
 }
 
 export interface ExpenseCreate {
@@ -33,6 +43,14 @@ export interface CategorySummary {
   count: number
 }
 
+export interface MonthlyTrend {
+  period: string
+  total: number
+  count: number
+  categories: Record<string, number>
+  variation_percentage: number
+}
+
 class ApiError extends Error {
   constructor(
     public status: number,
@@ -71,8 +89,13 @@ async function apiRequest<T>(endpoint: string, options: RequestInit = {}): Promi
 
 export const api = {
   // Expenses
-  async getExpenses(userId = 1): Promise<Expense[]> {
-    return apiRequest<Expense[]>(`/api/expenses/user/${userId}`)
+  async getExpenses(userId = 1, filters: ExpenseFilters = {}): Promise<Expense[]> {
+    const params = new URLSearchParams()
+    for (const [key, value] of Object.entries(filters)) {
+      if (value !== undefined) params.set(key, String(value))
+    }
+    const query = params.toString()
+    return apiRequest<Expense[]>(`/api/expenses/user/${userId}${query ? `?${query}` : ""}`)
   },
 
   async createExpense(expense: ExpenseCreate, userId = "1"): Promise<Expense> {
@@ -97,8 +120,8 @@ export const api = {
     return apiRequest<CategorySummary[]>(`/api/analytics/category-summary/${userId}`)
   },
 
-  async getMonthlyTrends(userId = 1): Promise<any[]> {
-    return apiRequest<any[]>(`/api/analytics/monthly-trends/${userId}`)
+  async getMonthlyTrends(userId = 1): Promise<MonthlyTrend[]> {
+    return apiRequest<MonthlyTrend[]>(`/api/analytics/monthly-trends/${userId}`)
   },
 
   // Health check
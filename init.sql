@@ -17,6 +17,23 @@ CREATE TABLE IF NOT EXISTS expenses (
   FOREIGN KEY (user_id) REFERENCES users(id)
 );
 
+-- Analytics and listings filter by user and added_at range
+CREATE INDEX IF NOT EXISTS ix_expenses_user_added_at ON expenses (user_id, added_at);
+CREATE INDEX IF NOT EXISTS ix_expenses_user_added_at_category_amount ON expenses (user_id, added_at, category, amount);
+CREATE INDEX IF NOT EXISTS ix_expenses_added_at_id ON expenses (added_at, id);
+CREATE INDEX IF NOT EXISTS ix_expenses_user_category_added_at ON expenses (user_id, category, added_at);
+CREATE INDEX IF NOT EXISTS ix_expenses_user_amount ON expenses (user_id, amount);
+
+-- Per-day, per-category totals kept in sync by the bot-service
+CREATE TABLE IF NOT EXISTS expense_rollups (
+  user_id VARCHAR(255) NOT NULL REFERENCES users(id),
+  day DATE NOT NULL,
+  category TEXT NOT NULL,
+  total DECIMAL(14,2) NOT NULL DEFAULT 0,
+  count INTEGER NOT NULL DEFAULT 0,
+  PRIMARY KEY (user_id, day, category)
+);
+
 -- Add test users
 INSERT INTO users (id, telegram_id)
 VALUES 